@@ -1,11 +1,20 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 
 from .config import settings
 from .db import init_models
 from .logging import setup_logging
-from .routers import telnyx_incoming, telnyx_stream, ws, transcribe, analyze, suggest, audio
+from .middleware import SelectiveGZipMiddleware
+from .routers import telnyx_incoming, telnyx_stream, ws, transcribe, analyze, suggest
+from .services.analysis_scheduler import analysis_scheduler
+from .services.asr_scheduler import asr_scheduler
+from .services.live_anonymizer import live_anonymizer
+from .services.playbook import objection_playbook
+from .services.post_call import post_call_queue
+from .services.traffic_light import local_traffic_light
+from .state.live_store import live_store
 
 log = setup_logging()
 
@@ -19,7 +28,8 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    app.add_middleware(GZipMiddleware, minimum_size=512)
+    # SSE-Routen ungepackt, sonst puffert zlib die Events
+    app.add_middleware(SelectiveGZipMiddleware, minimum_size=512, exclude_paths=analyze.SSE_PATHS)
 
     app.include_router(telnyx_incoming.router)
     app.include_router(telnyx_stream.router)
@@ -27,10 +37,31 @@ def create_app() -> FastAPI:
     app.include_router(transcribe.router)
     app.include_router(analyze.router)
     app.include_router(suggest.router)
-    app.include_router(audio.router)
 
     @app.on_event("startup")
     async def _startup():
         await init_models()
+        await asr_scheduler.start()
+        await post_call_queue.start()
+        # neuer Live-Text → entprellte Analyse pro Call
+        live_store.add_listener(analysis_scheduler.on_text)
+        # erkannte Einwände → freigegebene Antworten sofort
+        live_store.add_listener(objection_playbook.on_text)
+        # anonymisierter Spiegel für Snapshots
+        live_store.add_listener(live_anonymizer.on_text)
+        if settings.LOCAL_TRAFFIC_LIGHT:
+            asyncio.create_task(_train_traffic_light())
+
+    async def _train_traffic_light():
+        try:
+            await local_traffic_light.train_from_db()
+        except Exception as e:
+            # ohne Modell laufen nur die Regeln
+            log.warning("traffic_light: training failed: %s", e)
+
+    @app.on_event("shutdown")
+    async def _shutdown():
+        await post_call_queue.close()
+        await asr_scheduler.close()
 
     return app
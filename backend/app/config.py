@@ -12,12 +12,62 @@ class Settings(BaseSettings):
     TL_TIMEOUT: float = 15.0
     TRANSCRIBE_MODEL: str = "whisper-1"
     TRANSCRIBE_LANG: str = "de"
+    ASR_TIMEOUT: float = 60.0
+    ASR_MAX_CONNECTIONS: int = 20
+    ASR_BACKEND: str = "openai"  # "openai" | "local" (deterministischer Offline-Ersatz)
+    ASR_CONCURRENCY: int = 8  # global, über alle Calls
+    ASR_RATE_PER_SEC: float = 5.0
+    ASR_BURST: int = 10
+    ASR_MAX_RETRIES: int = 3
+    ASR_CACHE_MAX_ENTRIES: int = 2048
+    ASR_CACHE_DIR: Optional[str] = None  # gesetzt → Cache-Einträge überleben Restarts
     LOG_LEVEL: str = "INFO"
     WS_BASE: str
     PUBLIC_BASE: str
     STORE_MODE: str = "on_demand"  # "always" | "on_demand" | "never"
     EXTERNAL_CALL_ID: str
     AUDIO_DIR: str
+    LIVE_DIR: str = "./live_store"  # live_store: eine JSON-Zeile pro Call
+    AUDIO_WRITER_THREADS: int = 2
+    AUDIO_QUEUE_MAX_FRAMES: int = 500  # pro Call, 20-ms-Frames → 10 s Puffer
+    VAD_HANGOVER_MS: int = 400
+    VAD_MIN_SPEECH_MS: int = 250
+    VAD_MAX_SEGMENT_SEC: float = 15.0
+    LIVE_TRANSCRIBE: bool = True
+    LIVE_ASR_CONCURRENCY: int = 2
+    SNAPSHOT_CHUNKED: bool = True
+    SNAPSHOT_CHUNK_MAX_SEC: float = 120.0
+    SNAPSHOT_ASR_CONCURRENCY: int = 4
+    AUTO_ANALYZE: bool = True  # neuer Live-Text löst (entprellt) eine Analyse aus
+    ANALYSIS_DEBOUNCE_SEC: float = 1.5
+    ANALYSIS_MAX_DELAY_SEC: float = 6.0
+    ANALYSIS_MIN_NEW_CHARS: int = 20
+    ANALYSIS_TAIL_CHARS: int = 4000
+    SUGGEST_CACHE_MAX_ENTRIES: int = 1024
+    SUGGEST_CACHE_TTL_SEC: float = 600.0
+    SUGGEST_CACHE_TAIL_CHARS: int = 600
+    LOCAL_TRAFFIC_LIGHT: bool = True  # Sofort-Ampel (Regeln + n-Gramm-Modell) vor dem LLM-Urteil
+    TL_TAIL_CHARS: int = 300
+    TL_MIN_CONFIDENCE: float = 0.6
+    TL_TRAIN_MAX_ROWS: int = 5000
+    ANONYMIZE_NAME_PASS: str = "llm"  # llm | rules | off – Personennamen nach der lokalen PII-Maskierung
+    ANONYMIZE_CHUNK_CHARS: int = 2000  # LLM-Namensdurchgang: Stückgröße (Satzgrenzen)
+    ANONYMIZE_CONCURRENCY: int = 4  # parallele database_agent-Läufe pro Text
+    LIVE_ANONYMIZE: bool = True  # Live-Text im Hintergrund maskieren; Snapshots speichern nur den Spiegel
+    LIVE_ANONYMIZE_HOLD_CHARS: int = 48  # Ende offen lassen (Nummern über Segmentgrenzen)
+    LIVE_ANONYMIZE_IDLE_SEC: float = 2.0
+    LIVE_ANONYMIZE_NAME_PASS: Optional[str] = None  # None = ANONYMIZE_NAME_PASS
+    PLAYBOOK_ENABLED: bool = True  # erkannte Einwände → freigegebene Antworten sofort an den Client
+    PLAYBOOK_COOLDOWN_SEC: float = 30.0
+    TL_MODEL_PATH: Optional[str] = None  # .npz; None = nur im Speicher, beim Start neu trainiert
+    HANGUP_FULL_RETRANSCRIBE: bool = False  # Qualitätsmodus: ganze Aufnahme statt nur Lücken neu transkribieren
+    HANGUP_MIN_GAP_SEC: float = 1.0
+    HANGUP_STREAM_WAIT_SEC: float = 15.0
+    POSTCALL_WORKERS: int = 2  # Nachbearbeitung nach Hangup (Job-Queue in post_call_jobs)
+    POSTCALL_MAX_ATTEMPTS: int = 5
+    POSTCALL_BACKOFF_SEC: float = 5.0
+    POSTCALL_BACKOFF_MAX_SEC: float = 300.0
+    POSTCALL_LEASE_SEC: float = 120.0  # "running" ohne Lebenszeichen so lange → Job gilt als verwaist
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,23 @@
+# app/middleware.py
+from typing import Iterable
+
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class SelectiveGZipMiddleware:
+    """
+    GZip wie GZipMiddleware, aber nicht für `exclude_paths` (exakte Pfade).
+    Für Server-Sent-Event-Routen: zlib puffert, bis genug Daten da sind → Events kämen erst gesammelt an.
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = (), minimum_size: int = 500):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await self.gzip(scope, receive, send)
@@ -1,15 +1,22 @@
+import asyncio
 import json
-import time
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Header
+from fastapi import APIRouter, HTTPException, Header, Query
+from fastapi.responses import StreamingResponse
 
-from ..agents import runner, main_agent, traffic_light_agent, combo_agent
 from ..config import settings
+from ..logging import setup_logging
 from ..schemas import ChatMessage, AnalyzeResponse
-from ..utils import system_date_message, with_timeout
+from ..services import analyze as analyze_service
+from ..services.analyze_stream import stream_analyze_fast
+from ..services.suggestion_cache import suggestion_cache
+from ..utils import system_date_message
 
+log = setup_logging()
 router = APIRouter()
+# Server-Sent-Event-Routen: werden von der GZip-Middleware ausgenommen (app/middleware.py)
+SSE_PATHS = ("/analyze_fast/stream",)
 
 
 @router.post("/analyze", response_model=AnalyzeResponse)
@@ -17,27 +24,11 @@ async def analyze(
         messages: List[ChatMessage],
         x_conversation_id: Optional[str] = Header(default=None, convert_underscores=False),
 ):
-    t0 = time.perf_counter()
     try:
-        payload = [m.dict() for m in messages] + [system_date_message()]
-        ask_task = with_timeout(runner.run(main_agent, payload), timeout=settings.ASK_TIMEOUT, label="ask")
-        tl_task = with_timeout(runner.run(traffic_light_agent, payload), timeout=settings.TL_TIMEOUT,
-                               label="trafficLight")
-
-        ask_res, tl_res = await asyncio.gather(ask_task, tl_task)  # type: ignore
-
-        dt = time.perf_counter() - t0
-        suggestions = getattr(ask_res, "final_output", None)
-        tl_value = getattr(tl_res, "final_output", "yellow")
-
-        return {
-            "suggestions": suggestions,
-            "trafficLight": {"response": tl_value},
-            "durations": {"total": dt},
-            "conversation_id": x_conversation_id,
-        }
+        data = await analyze_service.analyze([m.dict() for m in messages])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"analyze failed: {e}") from e
+    return {**data, "conversation_id": x_conversation_id}
 
 
 @router.post("/analyze_fast", response_model=AnalyzeResponse)
@@ -45,26 +36,46 @@ async def analyze_fast(
         messages: List[ChatMessage],
         x_conversation_id: Optional[str] = Header(default=None, convert_underscores=False),
 ):
-    t0 = time.perf_counter()
     try:
-        short = messages[-6:] if len(messages) > 6 else messages
-        payload = [m.dict() for m in short] + [system_date_message()]
+        data = await analyze_service.analyze_fast([m.dict() for m in messages])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"analyze_fast failed: {e}") from e
+    return {**data, "conversation_id": x_conversation_id}
 
-        res = await with_timeout(runner.run(combo_agent, payload), timeout=min(settings.ASK_TIMEOUT, 12),
-                                 label="analyze_fast")
-        raw = getattr(res, "final_output", "") or "{}"
-        data = json.loads(raw)
 
-        tl = str(data.get("trafficLight", "yellow")).lower()
-        if tl not in ("green", "yellow", "red"):
-            tl = "yellow"
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-        dt = time.perf_counter() - t0
-        return {
-            "suggestions": data.get("suggestions", []),
-            "trafficLight": {"response": tl},
-            "durations": {"total": dt},
-            "conversation_id": x_conversation_id,
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"analyze_fast failed: {e}") from e
+
+@router.post("/analyze_fast/stream")
+async def analyze_fast_stream(
+        messages: List[ChatMessage],
+        x_conversation_id: Optional[str] = Header(default=None, convert_underscores=False),
+        call_id: Optional[str] = Query(default=None),
+):
+    """
+    Wie /analyze_fast, aber als Server-Sent Events: `suggestion` (je Vorschlag, sobald fertig),
+    `trafficLight`, zum Schluss `done` mit dem kompletten Ergebnis. Mit call_id (sonst
+    x-conversation-id) gehen dieselben Events auch an die /ws/client-Room des Calls.
+    """
+    short = messages[-6:] if len(messages) > 6 else messages
+    payload = [m.dict() for m in short] + [system_date_message()]
+    room = call_id or x_conversation_id
+
+    async def _events():
+        try:
+            async for ev in stream_analyze_fast(payload, room, timeout=min(settings.ASK_TIMEOUT, 12)):
+                yield _sse(ev["type"], ev)
+        except asyncio.TimeoutError:
+            yield _sse("error", {"detail": "analyze_fast timed out"})
+        except Exception as e:
+            log.warning("analyze_fast_stream failed call=%s: %s", room, e)
+            yield _sse("error", {"detail": f"analyze_fast failed: {e}"})
+
+    return StreamingResponse(_events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.get("/analyze/cache_stats")
+async def analyze_cache_stats():
+    return suggestion_cache.stats()
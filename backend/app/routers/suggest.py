@@ -1,16 +1,20 @@
+import asyncio
 import glob
 import os
 
-import httpx
 from fastapi import APIRouter, Query, Header, HTTPException
 
 from ..config import settings
+from ..logging import setup_logging
+from ..services.analysis_scheduler import analysis_scheduler
+from ..services.analyze import analyze_fast
+from ..services.asr_cache import asr_cache
+from ..services.recording import open_recording
 from ..services.snapshot import save_snapshot
 from ..state.live_store import live_store
 
+log = setup_logging()
 router = APIRouter()
-ANALYZE_URL = f"{settings.PUBLIC_BASE}/analyze_fast"
-TRANSCRIBE_URL = f"{settings.PUBLIC_BASE}/transcribe?store=0"
 AUDIO_DIR = settings.AUDIO_DIR
 
 
@@ -22,13 +26,15 @@ async def suggest(call_id: str = Query(...), save: bool = Query(default=True),
     text = (live_store.full_text(call_id) or "").strip()
     if not text:
         raise HTTPException(404, "no transcript in memory for call_id")
-    payload = [{"role": "user", "content": text}]
-    headers = {"Content-Type": "application/json", "x-conversation-id": x_conversation_id or call_id}
-    async with httpx.AsyncClient(timeout=30.0, headers=headers) as c:
-        r = await c.post(ANALYZE_URL, json=payload);
-        r.raise_for_status();
-        data = r.json()
-    return {"suggestions": data.get("suggestions", []), "trafficLight": data.get("trafficLight", {})}
+    # läuft schon eine (Auto-)Analyse auf aktuellem Stand, wird deren Ergebnis geteilt
+    try:
+        data = await analysis_scheduler.request(call_id)
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "analyze timed out")
+    except Exception as e:
+        raise HTTPException(502, f"analyze failed: {e}")
+    return {"suggestions": data.get("suggestions", []), "trafficLight": data.get("trafficLight", {}),
+            "offset": data.get("offset")}
 
 
 def _latest_audio_for_ext_id(ext_id: str) -> str | None:
@@ -39,27 +45,31 @@ def _latest_audio_for_ext_id(ext_id: str) -> str | None:
 
 @router.post("/suggest_audio")
 async def suggest_audio(ext_id: str = Query(...), x_conversation_id: str | None = Header(default=None),
-                        path: str | None = Query(default=None), timeout_s: int = Query(default=300)):
+                        path: str | None = Query(default=None), timeout_s: int = Query(default=300),
+                        last_s: float | None = Query(default=None, gt=0)):
     audio_path = path or _latest_audio_for_ext_id(ext_id)
     if not audio_path or not os.path.isfile(audio_path):
         raise HTTPException(404, "no audio for ext_id")
     try:
-        with open(audio_path, "rb") as f:
-            files = {"file": (os.path.basename(audio_path), f, "audio/wav")}
-            async with httpx.AsyncClient(timeout=timeout_s) as c:
-                tr = await c.post(TRANSCRIBE_URL, files=files, headers={"x-conversation-id": ext_id})
-                tr.raise_for_status()
-                tj = tr.json() if tr.headers.get("content-type", "").startswith("application/json") else {}
-                text = (tj.get("text") or "").strip()
-    except Exception:
+        rec = open_recording(audio_path)
+        if last_s is not None:
+            # nur die letzten N Sekunden (schnelle Einschätzung der aktuellen Situation)
+            pcm = memoryview(rec.last(last_s)).cast("B")
+            job = asr_cache.transcribe_range(pcm, 0, len(pcm), rec.rate, label=ext_id)
+        else:
+            # nur der seit dem letzten Klick neu aufgenommene Tail geht an die ASR
+            pcm = memoryview(rec.samples()).cast("B")
+            job = asr_cache.transcribe_growing(audio_path, pcm, rec.rate, label=ext_id)
+        text = (await asyncio.wait_for(job, timeout=timeout_s)).strip()
+    except Exception as e:
+        log.warning("suggest_audio: transcription failed ext_id=%s: %s", ext_id, e)
         raise HTTPException(502, "transcription failed")
     if not text:
         raise HTTPException(422, "empty transcript")
-    payload = [{"role": "user", "content": text}]
-    headers = {"Content-Type": "application/json", "x-conversation-id": x_conversation_id or ext_id}
-    async with httpx.AsyncClient(timeout=60.0, headers=headers) as c:
-        r = await c.post(ANALYZE_URL, json=payload);
-        r.raise_for_status();
-        data = r.json()
+    try:
+        data = await analyze_fast([{"role": "user", "content": text}])
+    except Exception as e:
+        log.warning("suggest_audio: analyze failed ext_id=%s: %s", ext_id, e)
+        raise HTTPException(502, f"analyze failed: {e}")
     return {"suggestions": data.get("suggestions", []), "trafficLight": data.get("trafficLight", {}),
             "source": {"ext_id": ext_id, "audio": os.path.basename(audio_path)}}
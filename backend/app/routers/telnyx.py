@@ -1,56 +1,30 @@
 # backend/app/routers/telnyx.py
 import base64
-import io
 import os
 import uuid
-import wave
 
 import httpx
-import numpy as np
 from fastapi import APIRouter, Request, WebSocket, WebSocketDisconnect
 
 from ..logging import setup_logging
+from ..services.analysis_scheduler import analysis_scheduler
+from ..services import mulaw
+from ..services.live_audio import close_live_audio
+from ..services.stitch import TranscriptStitcher
+from ..services.transcribe import transcribe_pcm
+from ..services.vad import vad_from_settings
 
 log = setup_logging()
 router = APIRouter()
 
 TELNYX_API_KEY = os.getenv("TELNYX_API_KEY", "")
-PUBLIC_BASE = os.getenv("PUBLIC_BASE", "https://example.com")
 WS_BASE = os.getenv("WS_BASE", "wss://example.com")
-TRANSCRIBE_URL = os.getenv("TRANSCRIBE_URL", f"{PUBLIC_BASE}/transcribe")
-ANALYZE_URL = os.getenv("ANALYZE_URL", f"{PUBLIC_BASE}/analyze_fast")
 
 _rooms = {}
 
 
 def mu_law_to_linear16(ulaw_bytes: bytes) -> bytes:
-    u = np.frombuffer(ulaw_bytes, dtype=np.uint8).astype(np.int16)
-    u = ~u
-    mag = ((u & 0x0F) << 3) + 0x84
-    mag = (mag << ((u & 0x70) >> 4)).astype(np.int32)
-    sign = (u & 0x80) != 0
-    lin = (mag - 0x84)
-    lin = np.where(sign, -lin, lin).astype(np.int16)
-    return lin.tobytes()
-
-
-def pcm16_8k_to_wav_16k_bytes(pcm16_8k: bytes) -> bytes:
-    x = np.frombuffer(pcm16_8k, dtype=np.int16).astype(np.float32)
-    buf = io.BytesIO()
-    with wave.open(buf, "wb") as w:
-        w.setnchannels(1)
-        w.setsampwidth(2)
-        w.setframerate(16000)
-        if x.size == 0:
-            w.writeframes(b"")
-            return buf.getvalue()
-        x_next = np.concatenate([x[1:], x[-1:]])
-        mid = ((x + x_next) * 0.5).astype(np.int16)
-        up = np.empty(x.size * 2, dtype=np.int16)
-        up[0::2] = x.astype(np.int16)
-        up[1::2] = mid
-        w.writeframes(up.tobytes())
-    return buf.getvalue()
+    return mulaw.decode(ulaw_bytes)
 
 
 async def _broadcast(call_id: str, payload: dict):
@@ -176,25 +150,52 @@ async def telnyx_stream(ws: WebSocket):
     await ws.accept()
     q = dict(p.split("=") for p in (ws.url.query or "").split("&") if p)
     call_id = q.get("call_id") or str(uuid.uuid4())
-    room = _rooms.setdefault(call_id, {"buf": bytearray(), "clients": set(), "agg_text": ""})
-    throttle = 0
-
-    async def flush_chunk(pcm: bytes):
-        wav_bytes = pcm16_8k_to_wav_16k_bytes(pcm)
-        files = {"file": ("chunk.wav", wav_bytes, "audio/wav")}
-        async with httpx.AsyncClient(timeout=60.0) as c:
-            tr = await c.post(TRANSCRIBE_URL, files=files, headers={"x-conversation-id": call_id})
-            text = tr.json().get("text", "").strip()
-        if not text:
-            return
-        room["agg_text"] += (" " + text) if room["agg_text"] else text
-        msgs = [{"role": "user", "content": room["agg_text"][-4000:]}]
-        async with httpx.AsyncClient(timeout=30.0) as c:
-            az = await c.post(ANALYZE_URL, json=msgs, headers={"x-conversation-id": call_id})
-            data = az.json()
-        await _broadcast(call_id, {"type": "update", "call_id": call_id, "text": room["agg_text"],
-                                   "trafficLight": data.get("trafficLight", {}),
-                                   "suggestions": data.get("suggestions", [])})
+    room = _rooms.setdefault(call_id, {"clients": set(), "agg_text": "", "stitch": TranscriptStitcher()})
+    # nur Sprachsegmente gehen an die ASR, Grenzen kommen aus der VAD
+    vad = vad_from_settings()
+
+    # ASR läuft parallel, übernommen wird strikt in Segment-Reihenfolge (wie LiveTranscriber._commit)
+    order = {"next": 0, "commit": 0, "done": {}, "tasks": set()}
+
+    async def flush_chunk(idx: int, seg):
+        text = ""
+        try:
+            # Segmente (PCM16 LE, 8 kHz) direkt im Prozess an die ASR – kein Umweg über PUBLIC_BASE/transcribe
+            text = (await transcribe_pcm(seg.pcm, 8000)).strip()
+        except Exception as e:
+            log.warning("telnyx: chunk transcription failed call_id=%s: %s", call_id, e)
+        finally:
+            order["done"][idx] = (text, seg)
+            commit()
+
+    def commit():
+        changed = False
+        while order["commit"] in order["done"]:
+            text, seg = order["done"].pop(order["commit"])
+            order["commit"] += 1
+            # nur nach hartem VAD-Schnitt überlappen Segmente → nur dann doppelte Wörter an der Kante entfernen
+            text = room["stitch"].add(text, overlap=seg.overlap_samples > 0)
+            if text:
+                room["agg_text"] += (" " + text) if room["agg_text"] else text
+                changed = True
+        if changed:
+            # Analyse entprellt & single-flight pro Call statt eines analyze_fast-Requests pro Chunk
+            analysis_scheduler.trigger(call_id)
+
+    def dispatch(seg):
+        idx = order["next"]
+        order["next"] += 1
+        task = asyncio.create_task(flush_chunk(idx, seg))
+        order["tasks"].add(task)
+        task.add_done_callback(order["tasks"].discard)
+
+    async def publish(cid: str, ev: dict):
+        if ev.get("type") == "done":
+            await _broadcast(cid, {"type": "update", "call_id": cid, "text": room["agg_text"],
+                                   "offset": ev["offset"], "trafficLight": ev.get("trafficLight", {}),
+                                   "suggestions": ev.get("suggestions", [])})
+
+    analysis_scheduler.register(call_id, get_text=lambda: room["agg_text"], publish=publish)
 
     try:
         while True:
@@ -203,20 +204,20 @@ async def telnyx_stream(ws: WebSocket):
             t = evt.get("event")
             if t == "media":
                 b = base64.b64decode(evt["payload"]["payload"])
-                room["buf"].extend(mu_law_to_linear16(b))
-                throttle += 1
-                if len(room["buf"]) >= 8000 * 2 or throttle >= 50:
-                    chunk = bytes(room["buf"])
-                    room["buf"].clear()
-                    throttle = 0
-                    asyncio.create_task(flush_chunk(chunk))
+                for seg in vad.feed(mu_law_to_linear16(b)):
+                    dispatch(seg)
             elif t == "stop":
-                if room["buf"]:
-                    chunk = bytes(room["buf"])
-                    room["buf"].clear()
-                    await flush_chunk(chunk)
+                for seg in vad.flush():
+                    dispatch(seg)
+                # laufende Segmente noch übernehmen, bevor der Scheduler geschlossen wird
+                if order["tasks"]:
+                    await asyncio.wait(set(order["tasks"]), timeout=60.0)
                 break
     finally:
+        for task in list(order["tasks"]):
+            task.cancel()
+        close_live_audio(call_id)
+        analysis_scheduler.close(call_id)
         await ws.close()
 
 
@@ -5,7 +5,10 @@ from fastapi import APIRouter, Request
 
 from ..config import settings
 from ..logging import setup_logging
-from ..services.snapshot_audio import save_snapshot_from_audio
+from ..services.analysis_scheduler import analysis_scheduler
+from ..services.live_anonymizer import live_anonymizer
+from ..services.playbook import objection_playbook
+from ..services.post_call import post_call_queue
 from ..state.live_store import live_store
 
 log = setup_logging()
@@ -43,17 +46,17 @@ async def telnyx_incoming(req: Request):
             pass
 
     if et == "call.hangup" and sess_id:
+        analysis_scheduler.close(sess_id)
+        objection_playbook.close(sess_id)
+        live_anonymizer.close(sess_id)
         try:
-            # WICHTIG: zuerst Audio schließen/flushen
-            await close_audio_for_session(sess_id)
             await live_store.mark_ended(sess_id)
-
-            # Danach komplette WAV transkribieren & speichern
-            await save_snapshot_from_audio(sess_id, reason="hangup")
-        except Exception:
-            pass
+            # Lücken-ASR → anonymisieren → speichern läuft im Job-Worker; live_store räumt der Job ab
+            await post_call_queue.enqueue(sess_id, "hangup", live_store.full_text(sess_id),
+                                          live_store.audio_spans(sess_id))
+        except Exception as e:
+            log.warning("telnyx_incoming: hangup enqueue failed call_id=%s: %s", sess_id, e)
         finally:
-            live_store.clear(sess_id)
             answered_sessions.discard(sess_id)
 
     return {"ok": True}
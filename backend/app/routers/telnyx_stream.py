@@ -1,12 +1,13 @@
 # app/routes/telnyx_stream.py
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import os
 import time
 
-import audioop
+import numpy as np
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from models import LiveCall  # dein ORM-Modell
 from sqlalchemy import select
@@ -14,18 +15,28 @@ from sqlalchemy import select
 from ..config import settings
 from ..db import SessionLocal
 from ..logging import setup_logging
+from ..services import mulaw
+from ..services.analysis_scheduler import analysis_scheduler
 from ..services.audio_sink import audio_sinks
+from ..services.finalize import stream_finished, stream_started
+from ..services.jitter import JitterBuffer
+from ..services.live_audio import close_live_audio
+from ..services.live_anonymizer import live_anonymizer
+from ..services.live_transcribe import live_transcribers
+from ..services.playbook import objection_playbook
 from ..state.live_store import live_store
 
 log = setup_logging()
 router = APIRouter()
 
 
+# Telnyx schickt 20-ms-Frames (160 B); großzügig für gebündelte Pakete
+DECODE_BUF_SAMPLES = 8000
+
+
 def mulaw_to_lin16(mu: bytes) -> bytes:
     """Telnyx µ-law @8k → PCM16 (mono, 8 kHz)."""
-    if not mu:
-        return b""
-    return audioop.ulaw2lin(mu, 2)
+    return mulaw.decode(mu)
 
 
 def _get_audio_b64(evt: dict) -> str | None:
@@ -33,9 +44,20 @@ def _get_audio_b64(evt: dict) -> str | None:
     return pl.get("payload") or pl.get("data")
 
 
-def _wav_path_for_call(call_id: str) -> str:
-    base = getattr(settings, "AUDIO_DIR", "./audio")
-    return os.path.join(base, f"{call_id}.wav")
+def _int_or_none(v) -> int | None:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def _get_seq_ts(evt: dict) -> tuple[int | None, int | None]:
+    """Media-Chunk-Nummer (sonst sequence_number) und Timestamp in ms aus dem Telnyx-Event."""
+    pl = evt.get("media") or evt.get("payload") or {}
+    seq = _int_or_none(pl.get("chunk"))
+    if seq is None:
+        seq = _int_or_none(evt.get("sequence_number"))
+    return seq, _int_or_none(pl.get("timestamp"))
 
 
 @router.websocket("/telnyx/stream")
@@ -45,9 +67,16 @@ async def telnyx_stream(ws: WebSocket):
     call_id = ws.query_params.get("call_id") or "unknown"
     ext_id = ws.query_params.get("ext_id") or settings.EXTERNAL_CALL_ID
 
+    stream_started(call_id)
+    # Live-Listener reagieren nur auf angemeldete Calls; der Hangup meldet wieder ab
+    analysis_scheduler.register(call_id)
+    objection_playbook.open(call_id)
+    live_anonymizer.open(call_id)
     # File-Sink öffnen (schreibt schnell & hält Filehandle offen)
     sink = audio_sinks.open(call_id, getattr(settings, "AUDIO_DIR", "./audio"), ext_id)
     await live_store.set_ext_id(call_id, ext_id)
+    # Live-ASR hängt am selben (jitter-bereinigten) Frame-Strom wie der Sink
+    transcriber = live_transcribers.open(call_id) if settings.LIVE_TRANSCRIBE else None
 
     # Metriken / Qualität
     packet_count = 0
@@ -60,7 +89,12 @@ async def telnyx_stream(ws: WebSocket):
     min_bytes = 10 ** 9
     max_bytes = 0
 
-    log.info("telnyx_stream: START call=%s ext=%s sink=%s", call_id, ext_id, _wav_path_for_call(call_id))
+    # Decode-Puffer pro Verbindung, wird für jedes Paket wiederverwendet
+    pcm_buf = np.empty(DECODE_BUF_SAMPLES, dtype=np.int16)
+    # Reihenfolge/Lücken nach Telnyx-Sequenz; hält max. 1 Frame zurück
+    jitter = JitterBuffer(rate=8000, frame_ms=20)
+
+    log.info("telnyx_stream: START call=%s ext=%s sink=%s", call_id, ext_id, sink.path)
 
     try:
         while True:
@@ -82,10 +116,12 @@ async def telnyx_stream(ws: WebSocket):
                 except Exception:
                     continue
 
-                pcm8k = mulaw_to_lin16(mu)
-                # Sicherheit: nur gerade Bytezahl (16-bit)
-                if not pcm8k or (len(pcm8k) & 1):
+                if not mu:
                     continue
+                if len(mu) > len(pcm_buf):
+                    pcm_buf = np.empty(len(mu), dtype=np.int16)
+                # View auf pcm_buf – nur bis zum nächsten Paket gültig, der Sink kopiert
+                pcm8k = memoryview(mulaw.decode_into(mu, pcm_buf)).cast("B")
 
                 # Metriken
                 now = time.monotonic()
@@ -106,19 +142,23 @@ async def telnyx_stream(ws: WebSocket):
                     max_bytes = b
                 last_pkt_t = now
 
-                # *** Hot-Loop: nur schnelles File-Append, KEINE DB-Transaktion! ***
-                try:
-                    sink.append_pcm8k_lin16(pcm8k)
-                except Exception as e:
-                    log.warning("telnyx_stream: sink append failed call=%s err=%s", call_id, e)
+                # *** Hot-Loop: nur einreihen – geschrieben wird im Writer-Pool, KEINE DB-Transaktion! ***
+                seq, ts_ms = _get_seq_ts(evt)
+                for frame in jitter.push(seq, ts_ms, pcm8k):
+                    audio_sinks.write(call_id, frame)
+                    if transcriber is not None:
+                        transcriber.feed(frame)
 
                 # Alle 50 Pakete mal loggen
                 if (packet_count % 50) == 0:
                     expected_sec = packet_count * 0.02  # 20ms Frames
                     elapsed = now - start_t
+                    ws_stats = audio_sinks.stats(call_id) or {}
                     log.info(
-                        "telnyx_stream: call=%s pkts=%d exp=%.2fs elapsed=%.2fs bytes8k=%d minB=%d maxB=%d maxGap=%.3fs",
-                        call_id, packet_count, expected_sec, elapsed, bytes_total, min_bytes, max_bytes, max_gap
+                        "telnyx_stream: call=%s pkts=%d exp=%.2fs elapsed=%.2fs bytes8k=%d minB=%d maxB=%d maxGap=%.3fs "
+                        "queue=%d dropped=%d",
+                        call_id, packet_count, expected_sec, elapsed, bytes_total, min_bytes, max_bytes, max_gap,
+                        ws_stats.get("queue_depth", 0), ws_stats.get("dropped_frames", 0)
                     )
 
                 continue
@@ -138,24 +178,58 @@ async def telnyx_stream(ws: WebSocket):
         except Exception:
             pass
 
-        # File sink sauber schließen (Header finalisieren)
+        # zurückgehaltenen Frame noch mitnehmen
+        for frame in jitter.flush():
+            audio_sinks.write(call_id, frame)
+            if transcriber is not None:
+                transcriber.feed(frame)
+        jitter_stats = jitter.stats()
+
+        # letzte Sprachfenster noch transkribieren, bevor der Call finalisiert wird
+        asr_stats = {}
         try:
-            audio_sinks.close(call_id)
-        except Exception:
-            pass
+            asr_stats = await live_transcribers.close(call_id) or {}
+        except Exception as e:
+            log.warning("telnyx_stream: live asr close failed call=%s err=%s", call_id, e)
+
+        # Queue leerschreiben + File sink sauber schließen (Header finalisieren) – im Thread, nicht im Loop
+        writer_stats = {}
+        try:
+            writer_stats = await asyncio.to_thread(audio_sinks.close, call_id) or {}
+        except Exception as e:
+            log.warning("telnyx_stream: sink close failed call=%s err=%s", call_id, e)
+        try:
+            # Writer aus append_audio_chunk (falls benutzt) schließen → RIFF/data-Header final
+            await asyncio.to_thread(close_live_audio, call_id)
+        except Exception as e:
+            log.warning("telnyx_stream: live audio close failed call=%s err=%s", call_id, e)
 
         media_window = (last_pkt_t - first_pkt_t) if first_pkt_t and last_pkt_t else 0.0
         expected_sec = packet_count * 0.02
-        wav_path = _wav_path_for_call(call_id)
+        wav_path = sink.path
         file_size = os.path.getsize(wav_path) if os.path.exists(wav_path) else 0
         # Datenbereich (grob) ohne Header (~44B)
         data_bytes_on_disk = max(0, file_size - 44)
 
         log.info(
-            "telnyx_stream: END call=%s pkts=%d media_window=%.2fs expected=%.2fs bytes8k=%d on_disk=%d minB=%d maxB=%d maxGap=%.3fs",
+            "telnyx_stream: END call=%s pkts=%d media_window=%.2fs expected=%.2fs bytes8k=%d on_disk=%d minB=%d maxB=%d maxGap=%.3fs "
+            "writer=%s jitter=%s asr=%s",
             call_id, packet_count, media_window, expected_sec, bytes_total, data_bytes_on_disk,
-            min_bytes if min_bytes != 10 ** 9 else 0, max_bytes, max_gap
+            min_bytes if min_bytes != 10 ** 9 else 0, max_bytes, max_gap, writer_stats, jitter_stats, asr_stats
         )
+        call_meta = {
+            "source": "telnyx",
+            "min_bytes": min_bytes if min_bytes != 10 ** 9 else 0,
+            "max_bytes": max_bytes,
+            "max_gap_sec": round(max_gap, 3),
+            "media_window_sec": round(media_window, 3),
+            "expected_sec": round(expected_sec, 3),
+            "writer_dropped_frames": writer_stats.get("dropped_frames", 0),
+            "writer_queue_max_depth": writer_stats.get("queue_max_depth", 0),
+            "writer_writes": writer_stats.get("writes", 0),
+            **jitter_stats,
+            **asr_stats,
+        }
 
         # *** DB-Finalisierung EINMAL am Ende ***
         try:
@@ -171,14 +245,7 @@ async def telnyx_stream(ws: WebSocket):
                     row.audio_path = wav_path
                     row.updated_at = row.updated_at  # ORM hält Zeit; ggf. DB default nutzen
                     meta = dict(row.meta or {})
-                    meta.update({
-                        "source": "telnyx",
-                        "min_bytes": min_bytes if min_bytes != 10 ** 9 else 0,
-                        "max_bytes": max_bytes,
-                        "max_gap_sec": round(max_gap, 3),
-                        "media_window_sec": round(media_window, 3),
-                        "expected_sec": round(expected_sec, 3),
-                    })
+                    meta.update(call_meta)
                     row.meta = meta
                     await db.commit()
                 else:
@@ -189,16 +256,11 @@ async def telnyx_stream(ws: WebSocket):
                         audio_path=wav_path,
                         chunk_count=packet_count,
                         audio_bytes_total=data_bytes_on_disk,
-                        meta={
-                            "source": "telnyx",
-                            "min_bytes": min_bytes if min_bytes != 10 ** 9 else 0,
-                            "max_bytes": max_bytes,
-                            "max_gap_sec": round(max_gap, 3),
-                            "media_window_sec": round(media_window, 3),
-                            "expected_sec": round(expected_sec, 3),
-                        },
+                        meta=call_meta,
                     )
                     db.add(new_row)
                     await db.commit()
         except Exception as e:
             log.warning("telnyx_stream: finalize metrics failed call=%s err=%s", call_id, e)
+        # Hangup-Finalizer darf jetzt Aufnahme + Live-Transkript übernehmen
+        stream_finished(call_id, wav_path)
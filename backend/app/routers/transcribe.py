@@ -1,77 +1,65 @@
+import asyncio
 import time
-import wave
-from io import BytesIO
 
-import audioop
 import openai
-from fastapi import APIRouter, HTTPException, File, UploadFile, Header
+from fastapi import APIRouter, HTTPException, File, UploadFile, Header, Request
 
 from ..config import settings
 from ..logging import setup_logging
+from ..services.asr_backends import AsrRateLimited
+from ..services.asr_scheduler import PRIORITY_LIVE
+from ..services.ingest import AudioIngest
+from ..services.transcribe import too_short, transcribe_ingest
 
 log = setup_logging()
 router = APIRouter()
 
-TARGET_SR = 16000
-
-
-def _to_wav16k_mono_with_padding(raw_wav: bytes, pad_ms: int = 250) -> bytes:
-    try:
-        bio = BytesIO(raw_wav)
-        with wave.open(bio, "rb") as r:
-            ch = r.getnchannels()
-            sw = r.getsampwidth()
-            sr = r.getframerate()
-            frames = r.readframes(r.getnframes())
-        if ch == 2:
-            frames = audioop.tomono(frames, sw, 0.5, 0.5)
-            ch = 1
-        if sr != TARGET_SR:
-            frames = audioop.ratecv(frames, sw, ch, sr, TARGET_SR, None)[0]
-            sr = TARGET_SR
-        pad_bytes = int(pad_ms * TARGET_SR / 1000) * 2
-        silence = b"\x00" * pad_bytes
-        frames = silence + frames + silence
-        out = BytesIO()
-        with wave.open(out, "wb") as w:
-            w.setnchannels(1)
-            w.setsampwidth(2)
-            w.setframerate(TARGET_SR)
-            w.writeframes(frames)
-        return out.getvalue()
-    except Exception as e:
-        log.warning("normalize/pad failed: %s", e)
-        return raw_wav
+UPLOAD_CHUNK = 64 * 1024
 
 
 @router.post("/transcribe")
 async def transcribe(
-        file: UploadFile = File(...),
+        request: Request,
+        file: UploadFile | None = File(None),
         x_conversation_id: str | None = Header(default=None),
 ):
+    """
+    Audio → Text. Akzeptiert multipart (Feld `file`, WAV) oder den rohen Body:
+    audio/wav, audio/basic (µ-law, `;rate=8000`), audio/L16 (`;rate=…;channels=…;endianness=…`),
+    auch als chunked Upload. Der Body wird beim Eintreffen dekodiert, nicht erst komplett gelesen.
+    """
     t0 = time.perf_counter()
-    raw = await file.read()
-    if not raw:
-        raise HTTPException(status_code=422, detail="No audio payload")
-    wav_bytes = _to_wav16k_mono_with_padding(raw, pad_ms=250)
     try:
-        with wave.open(BytesIO(wav_bytes), "rb") as r:
-            if r.getnframes() < int(0.8 * TARGET_SR):
-                return {"text": "", "duration": time.perf_counter() - t0, "conversation_id": x_conversation_id,
-                        "note": "too short for reliable ASR"}
-    except Exception as e:
-        raise HTTPException(400, f"Invalid WAV: {e}")
-    lang = getattr(settings, "TRANSCRIBE_LANG", None) or "de"
+        if file is not None:
+            ing = AudioIngest.for_content_type(file.content_type, size_hint=file.size or 0)
+            while chunk := await file.read(UPLOAD_CHUNK):
+                ing.feed(chunk)
+        else:
+            size = int(request.headers.get("content-length") or 0)
+            ing = AudioIngest.for_content_type(request.headers.get("content-type"), size_hint=size)
+            async for chunk in request.stream():
+                if chunk:
+                    ing.feed(chunk)
+        if not ing.bytes_in:
+            raise HTTPException(status_code=422, detail="No audio payload")
+    except ValueError as e:
+        raise HTTPException(400, f"Invalid audio: {e}")
     try:
-        tr = openai.audio.transcriptions.create(
-            file=("chunk.wav", BytesIO(wav_bytes), "audio/wav"),
-            model=settings.TRANSCRIBE_MODEL,
-            language=lang,
-        )
-        text = (getattr(tr, "text", "") or "").strip()
-        return {"text": text, "duration": time.perf_counter() - t0, "conversation_id": x_conversation_id}
+        # /transcribe bedienen Live-Chunks und interaktive Clients → Live-Priorität
+        text = await transcribe_ingest(ing, priority=PRIORITY_LIVE)
+    except ValueError as e:
+        raise HTTPException(400, f"Invalid audio: {e}")
     except openai.BadRequestError as e:
         raise HTTPException(status_code=400, detail=f"OpenAI rejected audio: {e}") from e
+    except AsrRateLimited as e:
+        raise HTTPException(status_code=429, detail=f"ASR rate limited: {e}",
+                            headers={"Retry-After": str(int(e.retry_after or 1))}) from e
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"transcribe timed out after {settings.ASR_TIMEOUT}s") from e
     except Exception as e:
         log.exception("transcribe failed: %s", e)
         raise HTTPException(status_code=500, detail=f"transcribe failed: {e}") from e
+    if too_short(ing):
+        return {"text": "", "duration": time.perf_counter() - t0, "conversation_id": x_conversation_id,
+                "note": "too short for reliable ASR"}
+    return {"text": text, "duration": time.perf_counter() - t0, "conversation_id": x_conversation_id}
@@ -1,17 +1,15 @@
-import json
-from collections import defaultdict
-
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
+from ..services.ws_rooms import join, leave
+
 router = APIRouter()
-_rooms = defaultdict(set)
 
 
 @router.websocket("/ws/client")
 async def ws_client(ws: WebSocket):
     await ws.accept()
     call_id = ws.query_params.get("call_id") or "default"
-    _rooms[call_id].add(ws)
+    join(call_id, ws)
     try:
         while True:
             # optional: pings lesen, aber nichts erwarten
@@ -19,15 +17,4 @@ async def ws_client(ws: WebSocket):
     except WebSocketDisconnect:
         pass
     finally:
-        _rooms[call_id].discard(ws)
-
-
-async def broadcast(call_id: str, payload: dict):
-    dead = []
-    for w in list(_rooms[call_id]):
-        try:
-            await w.send_text(json.dumps(payload))
-        except Exception:
-            dead.append(w)
-    for w in dead:
-        _rooms[call_id].discard(w)
+        leave(call_id, ws)
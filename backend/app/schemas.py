@@ -24,4 +24,5 @@ class AnalyzeResponse(BaseModel):
     suggestions: Any = Field(..., description="JSON-Array oder Modell-Output für Vorschläge")
     trafficLight: Dict[str, str]
     durations: Dict[str, float]
+    cached: bool = False  # Antwort aus dem Antwort-Cache, kein LLM-Lauf
     conversation_id: Optional[str] = None
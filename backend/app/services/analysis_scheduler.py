@@ -0,0 +1,256 @@
+# app/services/analysis_scheduler.py
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..logging import setup_logging
+from ..state.live_store import live_store
+from ..utils import system_date_message
+from .analyze_stream import stream_analyze_fast
+from .traffic_light import local_traffic_light
+from .ws_rooms import broadcast
+
+log = setup_logging()
+
+Publish = Callable[[str, dict], Awaitable[None]]
+
+
+class _Call:
+    __slots__ = ("call_id", "get_text", "publish", "timer", "dirty_since", "task", "task_offset", "pending",
+                 "published_offset", "last_result", "waiters", "tl", "triggers", "runs", "cancelled", "stale",
+                 "local_tl_pushed")
+
+    def __init__(self, call_id: str, get_text: Callable[[], str], publish: Publish):
+        self.call_id = call_id
+        self.get_text = get_text
+        self.publish = publish
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.dirty_since: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.task_offset = 0
+        self.pending = False
+        self.published_offset = -1
+        self.last_result: Optional[dict] = None
+        self.waiters: List[Tuple[int, asyncio.Future]] = []
+        self.tl: Optional[str] = None  # zuletzt gepushte Ampel (lokal oder LLM)
+        # Zähler
+        self.triggers = 0
+        self.runs = 0
+        self.cancelled = 0
+        self.stale = 0
+        self.local_tl_pushed = 0
+
+
+class AnalysisScheduler:
+    """
+    Eine Analyse-Pipeline pro Call statt Ad-hoc-Aufrufen:
+    - trigger() (neuer Transkript-Text, Chunk fertig) wird entprellt: Lauf erst nach `debounce` Ruhe,
+      spätestens `max_delay` nach dem ersten unbearbeiteten Trigger
+    - höchstens EIN Lauf pro Call gleichzeitig; Trigger währenddessen → genau ein Folgelauf danach
+    - request() (Button) wartet auf ein Ergebnis, das den aktuellen Text abdeckt; ein laufender Lauf
+      auf älterem Stand wird dafür abgebrochen
+    - jedes Ergebnis trägt den Transkript-Offset, den es abdeckt; veröffentlicht wird nur, was neuer
+      ist als das zuletzt veröffentlichte Ergebnis
+    """
+
+    def __init__(self, debounce: Optional[float] = None, max_delay: Optional[float] = None,
+                 min_new_chars: Optional[int] = None, tail_chars: Optional[int] = None):
+        self.debounce = debounce if debounce is not None else settings.ANALYSIS_DEBOUNCE_SEC
+        self.max_delay = max_delay if max_delay is not None else settings.ANALYSIS_MAX_DELAY_SEC
+        self.min_new_chars = min_new_chars if min_new_chars is not None else settings.ANALYSIS_MIN_NEW_CHARS
+        self.tail_chars = tail_chars or settings.ANALYSIS_TAIL_CHARS
+        self._calls: Dict[str, _Call] = {}
+
+    # ---- Registrierung ----
+
+    def register(self, call_id: str, get_text: Optional[Callable[[], str]] = None,
+                 publish: Optional[Publish] = None) -> None:
+        """
+        Call anmelden, Textquelle/Ausgabe festlegen (Default: live_store + /ws/client-Room).
+        Nur hier entsteht Zustand; on_text/trigger für unbekannte oder geschlossene Calls sind No-ops.
+        """
+        st = self._calls.get(call_id)
+        if st is None:
+            st = self._calls[call_id] = self._new(call_id)
+        if get_text is not None:
+            st.get_text = get_text
+        if publish is not None:
+            st.publish = publish
+
+    @staticmethod
+    def _new(call_id: str) -> _Call:
+        return _Call(call_id, lambda: live_store.full_text(call_id), broadcast)
+
+    def close(self, call_id: str) -> Optional[dict]:
+        """Call beendet: Timer/Lauf abbrechen, wartende request()s bekommen das letzte Ergebnis."""
+        st = self._calls.pop(call_id, None)
+        if st is None:
+            return None
+        if st.timer is not None:
+            st.timer.cancel()
+        if st.task is not None:
+            st.task.cancel()
+        for _, fut in st.waiters:
+            if not fut.done():
+                fut.cancel()
+        return self._stats(st)
+
+    # ---- Auslöser ----
+
+    def on_text(self, call_id: str, offset: int) -> None:
+        """Listener für live_store.add_text."""
+        if settings.LOCAL_TRAFFIC_LIGHT:
+            self.push_local(call_id)
+        if settings.AUTO_ANALYZE:
+            self.trigger(call_id)
+
+    def push_local(self, call_id: str) -> None:
+        """Sofort-Ampel aus dem lokalen Klassifikator; gepusht nur bei Wechsel, das LLM-Urteil verfeinert später."""
+        st = self._calls.get(call_id)
+        if st is None:
+            return
+        text = st.get_text() or ""
+        guess = local_traffic_light.classify(text)
+        if guess.response == st.tl:
+            return
+        st.tl = guess.response
+        st.local_tl_pushed += 1
+        asyncio.create_task(st.publish(call_id, {
+            "type": "trafficLight", "response": guess.response, "source": "local",
+            "confidence": guess.confidence, "call_id": call_id, "offset": len(text),
+        }))
+
+    def trigger(self, call_id: str) -> None:
+        st = self._calls.get(call_id)
+        if st is None:
+            # Call nicht angemeldet oder schon beendet (Segmente nach dem Hangup) → keine Analyse mehr
+            return
+        st.triggers += 1
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        if st.dirty_since is None:
+            st.dirty_since = now
+        delay = max(0.0, min(self.debounce, st.dirty_since + self.max_delay - now))
+        if st.timer is not None:
+            st.timer.cancel()
+        st.timer = loop.call_later(delay, self._fire, call_id)
+
+    async def request(self, call_id: str, timeout: Optional[float] = None) -> dict:
+        """
+        Ergebnis für den aktuellen Textstand (Cache, laufender Lauf oder sofortiger neuer Lauf).
+        Nicht angemeldeter Call (z. B. nach dem Hangup) → einmaliger Lauf, ohne Zustand zu hinterlassen.
+        """
+        st = self._calls.get(call_id) or self._new(call_id)
+        offset = len(st.get_text() or "")
+        if st.last_result is not None and st.last_result["offset"] >= offset:
+            return st.last_result
+        fut = asyncio.get_running_loop().create_future()
+        st.waiters.append((offset, fut))
+        if st.task is not None and st.task_offset < offset:
+            # läuft auf älterem Stand → verwerfen, sofort neu
+            st.task.cancel()
+            st.cancelled += 1
+            st.pending = True
+        elif st.task is None:
+            self._start(st)
+        return await asyncio.wait_for(fut, timeout or settings.ASK_TIMEOUT)
+
+    # ---- Ablauf ----
+
+    def _fire(self, call_id: str) -> None:
+        st = self._calls.get(call_id)
+        if st is None:
+            return
+        st.timer = None
+        if st.task is not None:
+            st.pending = True
+            return
+        text = st.get_text() or ""
+        if len(text) - max(st.published_offset, 0) < self.min_new_chars and not st.waiters:
+            st.dirty_since = None
+            return
+        self._start(st)
+
+    def _start(self, st: _Call) -> None:
+        if st.timer is not None:
+            st.timer.cancel()
+            st.timer = None
+        st.dirty_since = None
+        st.pending = False
+        text = st.get_text() or ""
+        st.task_offset = len(text)
+        st.runs += 1
+        st.task = asyncio.create_task(self._run(st, text[-self.tail_chars:], st.task_offset))
+        st.task.add_done_callback(lambda t, s=st: self._done(s, t))
+
+    async def _run(self, st: _Call, text: str, offset: int) -> dict:
+        payload = [{"role": "user", "content": text}, system_date_message()]
+        result = None
+        async for ev in stream_analyze_fast(payload, None, timeout=min(settings.ASK_TIMEOUT, 12), local_first=False):
+            ev = {**ev, "call_id": st.call_id, "offset": offset}
+            if ev["type"] == "done":
+                result = ev
+            if offset > st.published_offset:
+                if ev["type"] == "trafficLight":
+                    st.tl = ev["response"]
+                await st.publish(st.call_id, ev)
+            else:
+                st.stale += 1
+        if result is not None and offset > st.published_offset:
+            st.published_offset = offset
+        return result
+
+    def _done(self, st: _Call, task: asyncio.Task) -> None:
+        if st.task is task:
+            st.task = None
+        if task.cancelled():
+            err, result = None, None
+        else:
+            err = task.exception()
+            result = None if err else task.result()
+        if err is not None:
+            log.warning("analysis: run failed call=%s: %s", st.call_id, err)
+        if result is not None:
+            if st.last_result is None or result["offset"] >= st.last_result["offset"]:
+                st.last_result = result
+            keep = []
+            for off, fut in st.waiters:
+                if fut.done():
+                    continue
+                if off <= result["offset"]:
+                    fut.set_result(result)
+                else:
+                    keep.append((off, fut))
+            st.waiters = keep
+        elif err is not None:
+            # Button-Aufrufer nicht hängen lassen
+            for _, fut in st.waiters:
+                if not fut.done():
+                    fut.set_exception(err)
+            st.waiters = []
+        if self._calls.get(st.call_id) is not st:
+            return
+        if st.waiters:
+            self._start(st)
+        elif st.pending:
+            self._fire(st.call_id)
+
+    # ---- Metriken ----
+
+    @staticmethod
+    def _stats(st: _Call) -> dict:
+        return {
+            "analysis_triggers": st.triggers,
+            "analysis_runs": st.runs,
+            "analysis_cancelled": st.cancelled,
+            "analysis_stale_dropped": st.stale,
+            "analysis_offset": st.published_offset,
+            "local_traffic_light_pushed": st.local_tl_pushed,
+        }
+
+    def stats(self, call_id: str) -> Optional[dict]:
+        st = self._calls.get(call_id)
+        return self._stats(st) if st is not None else None
+
+
+analysis_scheduler = AnalysisScheduler()
@@ -0,0 +1,60 @@
+# app/services/analyze.py
+import asyncio
+import json
+import time
+from typing import Dict, List
+
+from ..agents import runner, main_agent, traffic_light_agent, combo_agent
+from ..config import settings
+from ..utils import system_date_message, with_timeout
+from .partial_json import normalize_traffic_light
+from .suggestion_cache import suggestion_cache
+
+
+async def _cached_output(agent, payload, timeout: float, label: str, default=None):
+    """final_output eines Agenten, über den Antwort-Cache (gleicher Kontext → kein neuer LLM-Lauf)."""
+
+    async def _run():
+        res = await with_timeout(runner.run(agent, payload), timeout=timeout, label=label)
+        return getattr(res, "final_output", default)
+
+    return await suggestion_cache.get_or_run(suggestion_cache.key(agent.name, payload), _run)
+
+
+async def analyze(messages: List[Dict[str, str]]) -> dict:
+    """main_agent + traffic_light_agent parallel → Format von /analyze (ohne conversation_id)."""
+    t0 = time.perf_counter()
+    payload = list(messages) + [system_date_message()]
+    ask_task = _cached_output(main_agent, payload, settings.ASK_TIMEOUT, "ask")
+    tl_task = _cached_output(traffic_light_agent, payload, settings.TL_TIMEOUT, "trafficLight", "yellow")
+
+    (suggestions, ask_hit), (tl_value, tl_hit) = await asyncio.gather(ask_task, tl_task)
+    return {
+        "suggestions": suggestions,
+        "trafficLight": {"response": tl_value},
+        "durations": {"total": time.perf_counter() - t0},
+        "cached": ask_hit and tl_hit,
+    }
+
+
+async def analyze_fast(messages: List[Dict[str, str]]) -> dict:
+    """Ein combo_agent-Lauf auf den letzten 6 Nachrichten → Format von /analyze_fast (ohne conversation_id)."""
+    t0 = time.perf_counter()
+    short = messages[-6:] if len(messages) > 6 else messages
+    payload = list(short) + [system_date_message()]
+
+    async def _run():
+        res = await with_timeout(runner.run(combo_agent, payload), timeout=min(settings.ASK_TIMEOUT, 12),
+                                 label="analyze_fast")
+        data = json.loads(getattr(res, "final_output", "") or "{}")
+        # gleiches Format wie stream_analyze_fast → beide teilen sich die Cache-Einträge
+        return {"suggestions": data.get("suggestions", []),
+                "trafficLight": normalize_traffic_light(data.get("trafficLight"))}
+
+    data, hit = await suggestion_cache.get_or_run(suggestion_cache.key(combo_agent.name, payload), _run)
+    return {
+        "suggestions": list(data["suggestions"]),
+        "trafficLight": {"response": data["trafficLight"]},
+        "durations": {"total": time.perf_counter() - t0},
+        "cached": hit,
+    }
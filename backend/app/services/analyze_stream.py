@@ -0,0 +1,128 @@
+# app/services/analyze_stream.py
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, List, Optional
+
+from agents import RawResponsesStreamEvent
+from openai.types.responses import ResponseTextDeltaEvent
+
+from ..agents import runner, combo_agent
+from ..config import settings
+from ..logging import setup_logging
+from .partial_json import SuggestionStreamParser, normalize_traffic_light
+from .suggestion_cache import suggestion_cache
+from .traffic_light import local_traffic_light
+from .ws_rooms import broadcast
+
+log = setup_logging()
+
+
+def _final_fallback(parser: SuggestionStreamParser) -> tuple:
+    """Nach Stream-Ende: was der inkrementelle Parser nicht erkannt hat, per json.loads nachholen."""
+    raw = parser.text().strip()
+    start, end = raw.find("{"), raw.rfind("}")
+    try:
+        data = json.loads(raw[start:end + 1]) if start >= 0 < end else {}
+    except ValueError:
+        data = {}
+    sugg = [str(s).strip() for s in (data.get("suggestions") or []) if str(s).strip()]
+    return sugg, data.get("trafficLight")
+
+
+async def stream_analyze_fast(
+        payload: List[Dict[str, str]],
+        call_id: Optional[str] = None,
+        timeout: float = 12.0,
+        local_first: bool = True,
+) -> AsyncIterator[dict]:
+    """
+    combo_agent im Streaming-Modus: jeder fertige Vorschlag und die Ampel werden sofort geliefert
+    (und, falls call_id gesetzt, an die /ws/client-Room gepusht). Zum Schluss kommt ein "done"-Event
+    mit dem kompletten Ergebnis im Format von /analyze_fast.
+    local_first: vor dem LLM-Lauf die lokale Sofort-Ampel (source="local") ausgeben.
+    """
+    t0 = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    parser = SuggestionStreamParser()
+    first_at: Optional[float] = None
+
+    async def _emit(ev: dict) -> dict:
+        if call_id:
+            await broadcast(call_id, {**ev, "call_id": call_id})
+        return ev
+
+    key = suggestion_cache.key(combo_agent.name, payload)
+    cached = suggestion_cache.lookup(key)
+    if cached is not None:
+        # gleicher Kontext schon beantwortet → sofort ausspielen, kein LLM-Lauf
+        t = round(time.perf_counter() - t0, 3)
+        for i, s in enumerate(cached["suggestions"]):
+            yield await _emit({"type": "suggestion", "index": i, "text": s, "t": t})
+        yield await _emit({"type": "trafficLight", "response": cached["trafficLight"], "source": "cache", "t": t})
+        yield await _emit({
+            "type": "done",
+            "suggestions": list(cached["suggestions"]),
+            "trafficLight": {"response": cached["trafficLight"]},
+            "durations": {"total": time.perf_counter() - t0, "first_suggestion": t},
+            "cached": True,
+            "conversation_id": call_id,
+        })
+        return
+
+    if local_first and settings.LOCAL_TRAFFIC_LIGHT:
+        text = " ".join(m.get("content", "") for m in payload if m.get("role") != "system")
+        guess = local_traffic_light.classify(text)
+        yield await _emit({"type": "trafficLight", "response": guess.response, "source": "local",
+                           "confidence": guess.confidence, "t": round(time.perf_counter() - t0, 3)})
+
+    result = runner.run_streamed(combo_agent, payload)
+    events = result.stream_events().__aiter__()
+    try:
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            try:
+                ev = await asyncio.wait_for(events.__anext__(), remaining)
+            except StopAsyncIteration:
+                break
+            if not isinstance(ev, RawResponsesStreamEvent) or not isinstance(ev.data, ResponseTextDeltaEvent):
+                continue
+            for item in parser.feed(ev.data.delta):
+                t = round(time.perf_counter() - t0, 3)
+                if item[0] == "suggestion":
+                    if first_at is None:
+                        first_at = t
+                    yield await _emit({"type": "suggestion", "index": item[1], "text": item[2], "t": t})
+                else:
+                    yield await _emit({"type": "trafficLight", "response": item[1], "source": "llm", "t": t})
+    finally:
+        if not result.is_complete:
+            result.cancel()
+
+    suggestions, tl = list(parser.suggestions), parser.traffic_light
+    if len(suggestions) < 3 or tl is None:
+        fb_sugg, fb_tl = _final_fallback(parser)
+        t = round(time.perf_counter() - t0, 3)
+        for i, s in enumerate(fb_sugg[len(suggestions):], start=len(suggestions)):
+            suggestions.append(s)
+            yield await _emit({"type": "suggestion", "index": i, "text": s, "t": t})
+        if tl is None:
+            tl = normalize_traffic_light(fb_tl)
+            yield await _emit({"type": "trafficLight", "response": tl, "source": "llm", "t": t})
+
+    if suggestions:
+        suggestion_cache.put(key, {"suggestions": list(suggestions), "trafficLight": tl})
+    dt = time.perf_counter() - t0
+    log.info("analyze_stream: call=%s suggestions=%d first=%.3fs total=%.3fs", call_id, len(suggestions),
+             first_at or -1.0, dt)
+    yield await _emit({
+        "type": "done",
+        "suggestions": suggestions,
+        "trafficLight": {"response": tl},
+        "durations": {"total": dt, "first_suggestion": first_at if first_at is not None else dt},
+        "cached": False,
+        "conversation_id": call_id,
+    })
@@ -1,9 +1,9 @@
 import logging
 import time
 
-from ..agents import runner, database_agent
 from ..db import SessionLocal
 from ..utils import add_message
+from .pii import anonymize_text
 
 log = logging.getLogger("app")
 
@@ -12,8 +12,8 @@ async def anonymize_and_store(text: str, mime: str, name: str, x_conversation_id
     t0 = time.perf_counter()
     anonym_text = ""
     try:
-        da_out = await runner.run(database_agent, [{"role": "user", "content": text}])
-        anonym_text = (getattr(da_out, "final_output", "") or "").strip()
+        # lokal maskiert; LLM höchstens noch für Personennamen (ANONYMIZE_NAME_PASS)
+        anonym_text = (await anonymize_text(text) or "").strip()
     except Exception as e:
         log.warning("anonymize failed: %s", e)
 
@@ -21,12 +21,19 @@ async def anonymize_and_store(text: str, mime: str, name: str, x_conversation_id
         log.info("anonymize_and_store: empty anonym_text -> skip persist")
         return
 
+    if await store_anonymized(anonym_text, mime, name, x_conversation_id):
+        log.info("anonymize_and_store done in %.3fs", time.perf_counter() - t0)
+
+
+async def store_anonymized(anonym_text: str, mime: str, name: str, x_conversation_id: str | None) -> bool:
+    """Bereits anonymisierten Text als Message speichern."""
     try:
         async with SessionLocal() as db:
             await add_message(
                 db, x_conversation_id, role="user", content=anonym_text, source="transcribe",
                 meta={"mime": mime, "filename": name},
             )
-        log.info("anonymize_and_store done in %.3fs", time.perf_counter() - t0)
+        return True
     except Exception as e:
         log.exception("persist failed: %s", e)
+        return False
@@ -0,0 +1,67 @@
+# app/services/asr.py
+import asyncio
+from typing import Optional
+
+import numpy as np
+
+from ..config import settings
+from ..logging import setup_logging
+from .asr_scheduler import PRIORITY_BATCH, asr_scheduler
+from .resample import resample_int16
+from .vad import silence_cut_points
+from .wav_writer import wav_header
+
+log = setup_logging()
+
+ASR_RATE = 16000
+
+
+def pcm16_to_wav(pcm: bytes, rate: int, pad_ms: int = 250) -> bytes:
+    """PCM16 mono → 16-kHz-WAV mit Stille-Padding (wie /transcribe), ohne Zwischen-WAV."""
+    x = np.frombuffer(pcm, dtype="<i2")
+    if rate != ASR_RATE:
+        x = resample_int16(x, rate, ASR_RATE)
+    pad = np.zeros(int(pad_ms * ASR_RATE / 1000), dtype=np.int16)
+    body = np.concatenate((pad, x, pad)).tobytes()
+    return wav_header(len(body), ASR_RATE) + body
+
+
+async def transcribe_wav(
+        wav_bytes: bytes,
+        filename: str = "chunk.wav",
+        language: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: int = PRIORITY_BATCH,
+) -> str:
+    """Ein WAV transkribieren – läuft über den zentralen Scheduler (Priorität, Limits, 429-Handling)."""
+    return await asr_scheduler.submit(wav_bytes, filename=filename, language=language, timeout=timeout,
+                                      priority=priority)
+
+
+async def transcribe_pcm_chunked(
+        x: np.ndarray,
+        rate: int,
+        max_chunk_sec: float,
+        concurrency: int,
+        label: str = "chunk",
+        priority: int = PRIORITY_BATCH,
+) -> str:
+    """
+    Lange Aufnahme an Sprechpausen in Stücke <= max_chunk_sec schneiden, parallel (begrenzt)
+    transkribieren und in Original-Reihenfolge zusammensetzen. Latenz ~ längstes Stück statt Call-Länge.
+    """
+    cuts = silence_cut_points(x, rate, max_chunk_sec)
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(i: int, a: int, b: int) -> str:
+        async with sem:
+            try:
+                return await transcribe_wav(pcm16_to_wav(x[a:b].tobytes(), rate), filename=f"{label}_{i}.wav",
+                                            priority=priority)
+            except Exception as e:
+                log.warning("asr: chunk %d (%.1fs-%.1fs) failed: %s", i, a / rate, b / rate, e)
+                return ""
+
+    parts = await asyncio.gather(*(_one(i, a, b) for i, (a, b) in enumerate(zip(cuts, cuts[1:]))))
+    log.info("asr: chunked %d pieces (max %.0fs, concurrency %d)", len(parts), max_chunk_sec, concurrency)
+    return " ".join(p for p in parts if p)
@@ -0,0 +1,149 @@
+# app/services/asr_backends.py
+import asyncio
+import hashlib
+import struct
+import time
+from io import BytesIO
+from typing import Optional
+
+import httpx
+import openai
+
+from ..config import settings
+
+
+class AsrRateLimited(Exception):
+    """Backend meldet 429; retry_after in Sekunden (falls vom Provider mitgeschickt)."""
+
+    def __init__(self, retry_after: Optional[float] = None, detail: str = ""):
+        super().__init__(detail or f"rate limited (retry_after={retry_after})")
+        self.retry_after = retry_after
+
+
+class AsrBackend:
+    """Schnittstelle für ASR-Provider. transcribe() bekommt ein fertiges WAV."""
+
+    name = "base"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def transcribe(self, wav_bytes: bytes, filename: str, language: str, timeout: float) -> str:
+        raise NotImplementedError
+
+
+def _retry_after(headers) -> Optional[float]:
+    try:
+        v = headers.get("retry-after-ms")
+        if v is not None:
+            return float(v) / 1000.0
+        v = headers.get("retry-after")
+        return float(v) if v is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenAIAsrBackend(AsrBackend):
+    """
+    AsyncOpenAI mit eigenem, gepooltem httpx-Client (Keep-Alive).
+    Retries macht der Scheduler (max_retries=0), damit 429er nicht doppelt wiederholt werden.
+    """
+
+    name = "openai"
+
+    def __init__(self):
+        self._http: Optional[httpx.AsyncClient] = None
+        self._client: Optional[openai.AsyncOpenAI] = None
+
+    async def start(self):
+        if self._client is not None:
+            return
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.ASR_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.ASR_MAX_CONNECTIONS,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(settings.ASR_TIMEOUT, connect=10.0),
+        )
+        self._client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=self._http, max_retries=0)
+
+    async def close(self):
+        client, http = self._client, self._http
+        self._client, self._http = None, None
+        if client is not None:
+            await client.close()
+        if http is not None:
+            await http.aclose()
+
+    async def transcribe(self, wav_bytes: bytes, filename: str, language: str, timeout: float) -> str:
+        if self._client is None:
+            await self.start()
+        try:
+            tr = await asyncio.wait_for(
+                self._client.audio.transcriptions.create(
+                    file=(filename, BytesIO(wav_bytes), "audio/wav"),
+                    model=settings.TRANSCRIBE_MODEL,
+                    language=language,
+                    timeout=timeout,
+                ),
+                timeout=timeout + 5.0,
+            )
+        except openai.RateLimitError as e:
+            raise AsrRateLimited(_retry_after(e.response.headers), str(e)) from e
+        return (getattr(tr, "text", "") or "").strip()
+
+
+class LocalAsrBackend(AsrBackend):
+    """
+    Deterministischer Offline-Ersatz für Lasttests:
+    - Text = Dauer + Hash des Audios (gleiches Audio → gleicher Text)
+    - Latenz = base + per_audio_sec * Audiodauer
+    - simuliert ein Provider-Limit (Requests/s) und antwortet darüber mit 429 + Retry-After
+    """
+
+    name = "local"
+
+    def __init__(self, base_latency: float = 0.05, per_audio_sec: float = 0.02, limit_per_sec: float = 0.0):
+        self.base_latency = base_latency
+        self.per_audio_sec = per_audio_sec
+        self.limit_per_sec = limit_per_sec
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.calls = 0
+        self.rejected = 0
+
+    @staticmethod
+    def _duration(wav_bytes: bytes) -> float:
+        if len(wav_bytes) < 44:
+            return 0.0
+        rate = struct.unpack("<I", wav_bytes[24:28])[0] or 1
+        block = struct.unpack("<H", wav_bytes[32:34])[0] or 2
+        return (len(wav_bytes) - 44) / float(rate * block)
+
+    async def transcribe(self, wav_bytes: bytes, filename: str, language: str, timeout: float) -> str:
+        self.calls += 1
+        if self.limit_per_sec > 0:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self._window_count > self.limit_per_sec:
+                self.rejected += 1
+                raise AsrRateLimited(retry_after=max(0.05, 1.0 - (now - self._window_start)))
+        dur = self._duration(wav_bytes)
+        await asyncio.wait_for(asyncio.sleep(self.base_latency + self.per_audio_sec * dur), timeout)
+        digest = hashlib.sha1(wav_bytes).hexdigest()[:8]
+        return f"[{language} {dur:.1f}s {digest}]"
+
+
+def make_backend(name: Optional[str] = None) -> AsrBackend:
+    name = (name or settings.ASR_BACKEND or "openai").lower()
+    if name == "openai":
+        return OpenAIAsrBackend()
+    if name == "local":
+        return LocalAsrBackend()
+    raise ValueError(f"unknown ASR_BACKEND {name!r}")
@@ -0,0 +1,200 @@
+# app/services/asr_cache.py
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from ..config import settings
+from ..logging import setup_logging
+from .asr import transcribe_pcm_chunked
+from .asr_scheduler import PRIORITY_BATCH, PRIORITY_LIVE
+from .vad import last_pause
+
+log = setup_logging()
+
+# Fingerprint einer Aufnahme bis offset: Anfang + die letzten Bytes vor offset (statt alles zu hashen)
+FP_BYTES = 64 * 1024
+# kürzere Reste werden nicht transkribiert (Whisper halluziniert auf Schnipseln)
+MIN_TAIL_SEC = 0.5
+# Tail wird an der letzten Sprechpause festgeschrieben, der Rest danach bleibt vorläufig
+COMMIT_MIN_SEC = 1.0
+# ohne erkennbare Pause wird spätestens ab dieser Tail-Länge trotzdem festgeschrieben
+COMMIT_FORCE_SEC = 30.0
+
+
+def _join(*parts: str) -> str:
+    return " ".join(p for p in parts if p)
+
+
+class _Progress:
+    __slots__ = ("offset", "fp", "text", "rate")
+
+    def __init__(self, offset: int, fp: str, text: str, rate: int):
+        self.offset = offset
+        self.fp = fp
+        self.text = text
+        self.rate = rate
+
+
+class AsrCache:
+    """
+    Inhaltsadressierter Cache für ASR-Ergebnisse:
+    - Schlüssel = sha256(PCM des Byte-Bereichs) + Bereich; LRU mit max_entries, optional zusätzlich auf Platte
+    - transcribe_growing(): merkt sich pro Quelle (Datei), bis wohin schon transkribiert ist, und schickt bei
+      wachsender Aufnahme nur den neuen Tail an die ASR. Ändert sich der Anfang (andere Datei), fängt es neu an.
+    """
+
+    def __init__(self, max_entries: int = 2048, cache_dir: Optional[str] = None):
+        self.max_entries = max(1, max_entries)
+        self.cache_dir = cache_dir
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._progress: Dict[str, _Progress] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        # Zähler
+        self.hits = 0
+        self.misses = 0
+        self.tail_resumes = 0
+        self.audio_sec_total = 0.0
+        self.audio_sec_asr = 0.0
+
+    @staticmethod
+    def key(data, start: int, end: int) -> str:
+        return f"{hashlib.sha256(data[start:end]).hexdigest()}_{start}_{end}"
+
+    def _disk_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name + ".json")
+
+    def _disk_get(self, name: str) -> Optional[dict]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _disk_put(self, name: str, obj: dict):
+        if not self.cache_dir:
+            return
+        path = self._disk_path(name)
+        try:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(obj, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+        except OSError as e:
+            log.warning("asr_cache: disk write failed %s: %s", path, e)
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._items.get(key)
+        if text is not None:
+            self._items.move_to_end(key)
+            return text
+        obj = self._disk_get(key)
+        if obj is None:
+            return None
+        text = obj.get("text", "")
+        self._remember(key, text)
+        return text
+
+    def _remember(self, key: str, text: str):
+        self._items[key] = text
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def put(self, key: str, text: str):
+        self._remember(key, text)
+        self._disk_put(key, {"text": text})
+
+    async def transcribe_range(self, data, start: int, end: int, rate: int, label: str = "range",
+                               priority: int = PRIORITY_BATCH) -> str:
+        """PCM16-mono-Bereich data[start:end] transkribieren, Ergebnis aus dem Cache, falls schon bekannt."""
+        if end - start < int(MIN_TAIL_SEC * rate) * 2:
+            return ""
+        key = self.key(data, start, end)
+        text = self.get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+        self.misses += 1
+        self.audio_sec_asr += (end - start) / (2.0 * rate)
+        x = np.frombuffer(data[start:end], dtype="<i2")
+        text = await transcribe_pcm_chunked(x, rate, settings.SNAPSHOT_CHUNK_MAX_SEC,
+                                            settings.SNAPSHOT_ASR_CONCURRENCY, label=label, priority=priority)
+        self.put(key, text)
+        return text
+
+    @staticmethod
+    def _fingerprint(data, offset: int) -> str:
+        h = hashlib.sha256(data[:min(offset, FP_BYTES)])
+        h.update(data[max(0, offset - FP_BYTES):offset])
+        return f"{h.hexdigest()}_{offset}"
+
+    def _progress_name(self, source: str) -> str:
+        return "progress_" + hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+    def _load_progress(self, source: str) -> Optional[_Progress]:
+        prog = self._progress.get(source)
+        if prog is None:
+            obj = self._disk_get(self._progress_name(source))
+            if obj:
+                prog = _Progress(int(obj["offset"]), obj["fp"], obj.get("text", ""), int(obj["rate"]))
+                self._progress[source] = prog
+        return prog
+
+    def _save_progress(self, source: str, prog: _Progress):
+        self._progress[source] = prog
+        self._disk_put(self._progress_name(source),
+                       {"offset": prog.offset, "fp": prog.fp, "text": prog.text, "rate": prog.rate})
+
+    async def transcribe_growing(self, source: str, data, rate: int, label: str = "tail",
+                                 priority: int = PRIORITY_LIVE) -> str:
+        """
+        Volltext einer (evtl. noch wachsenden) PCM16-mono-Aufnahme.
+        Bereits festgeschriebener Anfang kommt aus dem Fortschritt, transkribiert wird nur der neue Tail:
+        bis zur letzten Sprechpause festgeschrieben, der Rest dahinter vorläufig (beim nächsten Aufruf neu).
+        """
+        lock = self._locks.setdefault(source, asyncio.Lock())
+        async with lock:
+            n = len(data) - (len(data) & 1)
+            self.audio_sec_total += n / (2.0 * rate)
+            start, prefix = 0, ""
+            prog = self._load_progress(source)
+            if prog is not None and prog.rate == rate and prog.offset <= n \
+                    and prog.fp == self._fingerprint(data, prog.offset):
+                start, prefix = prog.offset, prog.text
+                self.tail_resumes += 1
+
+            tail = np.frombuffer(data[start:n], dtype="<i2")
+            cut = last_pause(tail, rate, min_keep_sec=COMMIT_MIN_SEC)
+            if not cut and len(tail) >= COMMIT_FORCE_SEC * rate:
+                cut = len(tail)
+            commit_end = start + 2 * cut
+
+            committed, provisional = await asyncio.gather(
+                self.transcribe_range(data, start, commit_end, rate, label=f"{label}_c", priority=priority),
+                self.transcribe_range(data, commit_end, n, rate, label=f"{label}_p", priority=priority),
+            )
+            if cut:
+                prefix = _join(prefix, committed)
+                self._save_progress(source, _Progress(commit_end, self._fingerprint(data, commit_end), prefix, rate))
+            return _join(prefix, provisional)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "tail_resumes": self.tail_resumes,
+            "audio_sec_total": round(self.audio_sec_total, 1),
+            "audio_sec_asr": round(self.audio_sec_asr, 1),
+        }
+
+
+asr_cache = AsrCache(max_entries=settings.ASR_CACHE_MAX_ENTRIES, cache_dir=settings.ASR_CACHE_DIR)
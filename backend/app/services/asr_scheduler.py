@@ -0,0 +1,190 @@
+# app/services/asr_scheduler.py
+import asyncio
+import itertools
+import time
+from typing import List, Optional
+
+from ..config import settings
+from ..logging import setup_logging
+from .asr_backends import AsrBackend, AsrRateLimited, make_backend
+
+log = setup_logging()
+
+# kleinere Zahl = höhere Priorität
+PRIORITY_LIVE = 0
+PRIORITY_BATCH = 10
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self._t = time.monotonic()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self._t) * self.rate)
+            self._t = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+
+class _Job:
+    __slots__ = ("wav", "filename", "language", "timeout", "priority", "future", "attempts", "enqueued_at")
+
+    def __init__(self, wav, filename, language, timeout, priority, future):
+        self.wav = wav
+        self.filename = filename
+        self.language = language
+        self.timeout = timeout
+        self.priority = priority
+        self.future = future
+        self.attempts = 0
+        self.enqueued_at = time.monotonic()
+
+
+class AsrScheduler:
+    """
+    Zentrale Warteschlange vor dem ASR-Backend (Live-Streaming und Hangup-Snapshots teilen sie sich):
+    - Priorität: Live vor Batch, innerhalb einer Priorität FIFO
+    - globale Obergrenze paralleler Requests (= Anzahl Worker) + Token-Bucket (Requests/s)
+    - 429 mit Retry-After pausiert ALLE Worker bis dahin (kein Retry-Sturm), Job wird neu eingereiht
+    """
+
+    def __init__(self, backend: Optional[AsrBackend] = None, concurrency: Optional[int] = None,
+                 rate_per_sec: Optional[float] = None, burst: Optional[int] = None,
+                 max_retries: Optional[int] = None):
+        self._backend = backend
+        self.concurrency = concurrency or settings.ASR_CONCURRENCY
+        self._bucket = _TokenBucket(
+            rate_per_sec if rate_per_sec is not None else settings.ASR_RATE_PER_SEC,
+            burst if burst is not None else settings.ASR_BURST,
+        )
+        self.max_retries = max_retries if max_retries is not None else settings.ASR_MAX_RETRIES
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        # Zähler
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rate_limited = 0
+        self.retried = 0
+
+    @property
+    def backend(self) -> AsrBackend:
+        if self._backend is None:
+            self._backend = make_backend()
+        return self._backend
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    async def start(self):
+        if self._workers:
+            return
+        await self.backend.start()
+        self._queue = asyncio.PriorityQueue()
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        log.info("asr_scheduler: started backend=%s concurrency=%d rate=%.1f/s", self.backend.name,
+                 self.concurrency, self._bucket.rate)
+
+    async def close(self):
+        workers, self._workers = self._workers, []
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if self._queue is not None:
+            while not self._queue.empty():
+                job = self._queue.get_nowait()[2]
+                if not job.future.done():
+                    job.future.cancel()
+        if self._backend is not None:
+            await self._backend.close()
+
+    async def submit(self, wav_bytes: bytes, filename: str = "chunk.wav", language: Optional[str] = None,
+                     timeout: Optional[float] = None, priority: int = PRIORITY_BATCH) -> str:
+        if not self._workers:
+            await self.start()
+        fut = asyncio.get_running_loop().create_future()
+        lang = language or getattr(settings, "TRANSCRIBE_LANG", None) or "de"
+        job = _Job(wav_bytes, filename, lang, timeout or settings.ASR_TIMEOUT, priority, fut)
+        self._queue.put_nowait((priority, next(self._seq), job))
+        return await fut
+
+    def _requeue(self, job: _Job):
+        self._queue.put_nowait((job.priority, next(self._seq), job))
+
+    async def _worker(self, idx: int):
+        while True:
+            _, _, job = await self._queue.get()
+            if job.future.done():  # Aufrufer hat abgebrochen
+                continue
+            wait = self._paused_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            await self._bucket.acquire()
+            if job.future.done():
+                continue
+            await self._run(job)
+
+    async def _run(self, job: _Job):
+        job.attempts += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        run = asyncio.ensure_future(self.backend.transcribe(job.wav, job.filename, job.language, job.timeout))
+        # bricht der Aufrufer ab, wird auch der laufende Request abgebrochen
+        job.future.add_done_callback(lambda f: run.cancel() if f.cancelled() else None)
+        try:
+            text = await run
+            if not job.future.done():
+                job.future.set_result(text)
+            self.completed += 1
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.cancel()
+            # nur weiterreichen, wenn der Worker selbst gestoppt wird (nicht bei Abbruch durch den Aufrufer)
+            if asyncio.current_task().cancelling():
+                raise
+        except AsrRateLimited as e:
+            self.rate_limited += 1
+            backoff = e.retry_after if e.retry_after is not None else min(30.0, 0.5 * 2 ** job.attempts)
+            self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+            if job.attempts <= self.max_retries and not job.future.done():
+                self.retried += 1
+                log.info("asr_scheduler: 429, pause %.2fs, retry %d/%d (%s)", backoff, job.attempts,
+                         self.max_retries, job.filename)
+                self._requeue(job)
+            elif not job.future.done():
+                self.failed += 1
+                job.future.set_exception(e)
+        except Exception as e:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+            "retried": self.retried,
+        }
+
+
+asr_scheduler = AsrScheduler()
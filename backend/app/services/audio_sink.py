@@ -1,8 +1,12 @@
 # app/services/audio_sink.py
-import audioop
 import os
 import time
 import wave
+from typing import Iterable
+
+from ..config import settings
+from .audio_writer import AudioWriterPool
+from .resample import Resampler
 
 
 class AudioSink:
@@ -14,14 +18,24 @@ class AudioSink:
         self.w.setnchannels(1)
         self.w.setsampwidth(2)
         self.w.setframerate(16000)
+        # ein Resampler pro Call: Filterzustand bleibt über Paketgrenzen erhalten
+        self._rs = Resampler(8000, 16000)
 
     def append_pcm8k_lin16(self, pcm8k: bytes):
         if not pcm8k:
             return
-        out, _ = audioop.ratecv(pcm8k, 2, 1, 8000, 16000, None)
-        self.w.writeframes(out)
+        self.w.writeframes(self._rs.process(pcm8k))
+
+    def append_many_pcm8k_lin16(self, packets: Iterable[bytes]):
+        out = self._rs.process_many(packets)
+        if out:
+            self.w.writeframes(out)
 
     def close(self):
+        try:
+            self.w.writeframes(self._rs.flush())
+        except Exception:
+            pass
         try:
             self.w.close()
         except Exception:
@@ -29,23 +43,43 @@ class AudioSink:
 
 
 class AudioSinkStore:
+    """
+    Sinks pro Call. Schreiben läuft über den AudioWriterPool (Threads), nie auf dem Event-Loop:
+    write() reiht nur ein, close() schreibt die Queue leer und finalisiert die Datei.
+    """
+
     def __init__(self):
         self._sinks = {}
+        self.writers = AudioWriterPool(
+            max_workers=settings.AUDIO_WRITER_THREADS,
+            max_queue_frames=settings.AUDIO_QUEUE_MAX_FRAMES,
+        )
 
     def open(self, key: str, base_dir: str, file_id: str):
         if key in self._sinks:
             return self._sinks[key]
         sink = AudioSink(base_dir, file_id)
         self._sinks[key] = sink
+        self.writers.register(key, sink)
         return sink
 
     def get(self, key: str):
         return self._sinks.get(key)
 
+    def write(self, key: str, pcm8k) -> bool:
+        """Nicht blockierend; False, wenn der Frame verworfen wurde (Queue voll / Sink zu)."""
+        return self.writers.submit(key, pcm8k)
+
+    def stats(self, key: str):
+        return self.writers.stats(key)
+
     def close(self, key: str):
+        """Blockiert bis die Queue geschrieben ist → aus async Code per asyncio.to_thread aufrufen."""
+        stats = self.writers.close(key)
         sink = self._sinks.pop(key, None)
         if sink:
             sink.close()
+        return stats
 
 
 audio_sinks = AudioSinkStore()
@@ -0,0 +1,128 @@
+# app/services/audio_writer.py
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Optional
+
+log = logging.getLogger("app")
+
+
+class _CallQueue:
+    def __init__(self, key: str, sink, max_frames: int):
+        self.key = key
+        self.sink = sink
+        self.max_frames = max_frames
+        self.frames: Deque[bytes] = deque()
+        self.lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.scheduled = False
+        self.closed = False
+        # Zähler
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.writes = 0
+        self.max_depth = 0
+        self.errors = 0
+
+
+class AudioWriterPool:
+    """
+    Schreibt Audio-Frames abseits des Event-Loops:
+    - submit() legt einen Frame in die begrenzte Queue des Calls (nie blockierend; voll → Frame verworfen)
+    - ein kleiner Thread-Pool leert die Queues und schreibt alle wartenden Frames in EINEM Aufruf
+    - pro Call läuft höchstens ein Drain gleichzeitig → Sink braucht kein eigenes Locking
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue_frames: int = 500, coalesce_frames: int = 10):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="audio-writer")
+        self._max_queue_frames = max_queue_frames
+        self._coalesce_frames = coalesce_frames
+        self._queues: Dict[str, _CallQueue] = {}
+
+    def register(self, key: str, sink):
+        q = self._queues.get(key)
+        if q is None or q.closed:
+            q = _CallQueue(key, sink, self._max_queue_frames)
+            self._queues[key] = q
+        return q
+
+    def submit(self, key: str, pcm) -> bool:
+        q = self._queues.get(key)
+        if q is None or q.closed or not pcm:
+            return False
+        frame = bytes(pcm)  # Aufrufer darf seinen Puffer sofort wiederverwenden
+        with q.lock:
+            if len(q.frames) >= q.max_frames:
+                q.dropped += 1
+                return False
+            q.frames.append(frame)
+            q.enqueued += 1
+            depth = len(q.frames)
+            if depth > q.max_depth:
+                q.max_depth = depth
+            # erst ab ein paar Frames schreiben → weniger, größere Writes
+            if not q.scheduled and depth >= self._coalesce_frames:
+                self._schedule(q)
+        return True
+
+    def _schedule(self, q: _CallQueue):
+        q.scheduled = True
+        q.idle.clear()
+        self._executor.submit(self._drain, q)
+
+    def _drain(self, q: _CallQueue):
+        while True:
+            with q.lock:
+                if not q.frames:
+                    q.scheduled = False
+                    q.idle.set()
+                    return
+                batch = list(q.frames)
+                q.frames.clear()
+            try:
+                q.sink.append_many_pcm8k_lin16(batch)
+                q.written += len(batch)
+                q.writes += 1
+            except Exception as e:
+                q.errors += 1
+                log.warning("audio_writer: write failed key=%s frames=%d err=%s", q.key, len(batch), e)
+
+    def flush(self, key: str, timeout: Optional[float] = 10.0) -> bool:
+        """Wartet, bis alle bisher eingereihten Frames geschrieben sind (blockierend)."""
+        q = self._queues.get(key)
+        if q is None:
+            return True
+        with q.lock:
+            if q.frames and not q.scheduled:
+                self._schedule(q)
+        return q.idle.wait(timeout)
+
+    def close(self, key: str, timeout: Optional[float] = 10.0) -> Optional[dict]:
+        """Keine neuen Frames mehr annehmen, Rest schreiben, Queue entfernen; gibt die Zähler zurück."""
+        q = self._queues.get(key)
+        if q is None:
+            return None
+        q.closed = True
+        if not self.flush(key, timeout):
+            log.warning("audio_writer: flush timeout key=%s depth=%d", key, len(q.frames))
+        self._queues.pop(key, None)
+        return self._stats(q)
+
+    @staticmethod
+    def _stats(q: _CallQueue) -> dict:
+        return {
+            "queue_depth": len(q.frames),
+            "queue_max_depth": q.max_depth,
+            "frames_enqueued": q.enqueued,
+            "frames_written": q.written,
+            "dropped_frames": q.dropped,
+            "writes": q.writes,
+            "write_errors": q.errors,
+        }
+
+    def stats(self, key: str) -> Optional[dict]:
+        q = self._queues.get(key)
+        return self._stats(q) if q is not None else None
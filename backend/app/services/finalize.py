@@ -0,0 +1,138 @@
+# app/services/finalize.py
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import settings
+from ..logging import setup_logging
+from .asr import pcm16_to_wav, transcribe_wav
+from .asr_scheduler import PRIORITY_BATCH
+from .recording import forget_recording, open_recording
+from .snapshot_audio import MIN_SECONDS, find_audio_path, transcribe_recording
+from .vad import vad_from_settings
+
+log = setup_logging()
+
+# Stream-Ende pro Call: Hangup-Webhook und WebSocket-Ende kommen in beliebiger Reihenfolge
+_streams: Dict[str, asyncio.Event] = {}
+_paths: Dict[str, str] = {}
+_finished_at: Dict[str, float] = {}
+# so lange wartet ein beendeter Stream auf seinen Post-Call-Job; danach (kein Hangup-Webhook, Legacy-Stream)
+# wird aufgeräumt – ein späterer Job findet die Aufnahme weiter über find_audio_path
+FINISHED_TTL_SEC = 600.0
+
+
+def _prune(now: float):
+    for cid in [c for c, t in _finished_at.items() if now - t > FINISHED_TTL_SEC]:
+        _finished_at.pop(cid, None)
+        _streams.pop(cid, None)
+        _paths.pop(cid, None)
+
+
+def stream_started(call_id: str):
+    _prune(time.monotonic())
+    _finished_at.pop(call_id, None)
+    _streams[call_id] = asyncio.Event()
+
+
+def stream_finished(call_id: str, wav_path: Optional[str]):
+    """Vom Media-Stream nach dem Schließen von Sink + Live-ASR aufgerufen."""
+    now = time.monotonic()
+    _prune(now)
+    if wav_path:
+        _paths[call_id] = wav_path
+    ev = _streams.setdefault(call_id, asyncio.Event())
+    ev.set()
+    _finished_at[call_id] = now
+
+
+async def _wait_stream(call_id: str, timeout: float) -> Optional[str]:
+    ev = _streams.get(call_id)
+    if ev is not None and not ev.is_set():
+        try:
+            await asyncio.wait_for(ev.wait(), timeout)
+        except asyncio.TimeoutError:
+            log.warning("finalize: stream not closed after %.0fs call_id=%s", timeout, call_id)
+    _streams.pop(call_id, None)
+    _finished_at.pop(call_id, None)
+    return _paths.pop(call_id, None)
+
+
+def uncovered_gaps(spans: List[List[float]], duration: float, min_gap: float) -> List[Tuple[float, float]]:
+    """Abschnitte in [0, duration], die kein Live-Span abdeckt (kürzere als min_gap fallen weg)."""
+    gaps, pos = [], 0.0
+    for start, end in sorted((s[0], s[1]) for s in spans):
+        if start - pos >= min_gap:
+            gaps.append((pos, min(start, duration)))
+        pos = max(pos, end)
+    if duration - pos >= min_gap:
+        gaps.append((pos, duration))
+    return [(a, b) for a, b in gaps if b > a]
+
+
+async def _transcribe_gaps(call_id: str, x: np.ndarray, rate: int,
+                           gaps: List[Tuple[float, float]]) -> List[Tuple[float, str]]:
+    """Sprache in den Lücken (VAD wie live) transkribieren → [(start_sec, text)]. Reine Stille kostet nichts."""
+    segs = []
+    for a, b in gaps:
+        vad = vad_from_settings(rate)
+        offset = int(a * rate)
+        found = vad.feed(x[offset:int(b * rate)]) + vad.flush()
+        segs.extend((offset / rate + s.start_sec, s) for s in found)
+    sem = asyncio.Semaphore(max(1, settings.SNAPSHOT_ASR_CONCURRENCY))
+
+    async def _one(i: int, seg) -> str:
+        async with sem:
+            try:
+                return await transcribe_wav(pcm16_to_wav(seg.pcm, seg.rate), filename=f"{call_id}_gap_{i}.wav",
+                                            priority=PRIORITY_BATCH)
+            except Exception as e:
+                log.warning("finalize: gap asr failed call_id=%s seg=%d: %s", call_id, i, e)
+                return ""
+
+    texts = await asyncio.gather(*(_one(i, seg) for i, (_, seg) in enumerate(segs)))
+    return [(start, t) for (start, _), t in zip(segs, texts) if t]
+
+
+async def collect_final_text(call_id: str, live: Callable[[], Tuple[str, List[List[float]]]]) -> str:
+    """
+    Rohtext eines beendeten Calls (noch nicht anonymisiert):
+    - wartet, bis der Media-Stream Sink und Live-ASR geschlossen hat
+    - übernimmt das Live-Transkript und transkribiert nur die Teile der Aufnahme, die live nicht
+      abgedeckt wurden (fehlgeschlagene/abgebrochene Fenster, Calls ohne Live-ASR)
+    - HANGUP_FULL_RETRANSCRIBE=1: wie früher die komplette Aufnahme neu transkribieren (Qualitätsmodus)
+    live() → (Live-Text, Spans); erst NACH dem Stream-Ende abgefragt, damit späte Live-Segmente mitzählen
+    """
+    path = await _wait_stream(call_id, settings.HANGUP_STREAM_WAIT_SEC) or await find_audio_path(call_id)
+    try:
+        live_text, spans = live()
+        return await _collect(call_id, path, live_text, spans)
+    finally:
+        if path:
+            forget_recording(path)
+
+
+async def _collect(call_id: str, path: Optional[str], live_text: str, spans: List[List[float]]) -> str:
+    if settings.HANGUP_FULL_RETRANSCRIBE or not spans:
+        log.info("finalize: full transcription call_id=%s (spans=%d)", call_id, len(spans))
+        return await transcribe_recording(call_id, path)
+
+    parts = [(s[0], live_text[int(s[2]):int(s[3])]) for s in spans]
+    gap_sec = 0.0
+    if path:
+        try:
+            rec = open_recording(path)
+            x, rate = rec.samples(), rec.rate
+        except Exception as e:
+            log.warning("finalize: cannot read %s: %s", path, e)
+            x, rate = None, 0
+        if x is not None and len(x) >= MIN_SECONDS * rate:
+            gaps = uncovered_gaps(spans, len(x) / float(rate), settings.HANGUP_MIN_GAP_SEC)
+            gap_sec = sum(b - a for a, b in gaps)
+            parts += await _transcribe_gaps(call_id, x, rate, gaps)
+
+    text = " ".join(t.strip() for _, t in sorted(parts, key=lambda p: p[0]) if t.strip())
+    log.info("finalize: call_id=%s live_spans=%d gaps=%.1fs chars=%d", call_id, len(spans), gap_sec, len(text))
+    return text
@@ -0,0 +1,213 @@
+# app/services/ingest.py
+"""
+Inkrementelle Annahme von Audio-Bodys für die ASR: WAV, µ-law (audio/basic) und L16 (audio/L16).
+Body-Chunks werden beim Eintreffen dekodiert/resampelt und direkt in EINEN Ausgabepuffer geschrieben,
+der am Ende schon das fertige 16-kHz-WAV (Header + Padding) ist – kein Zwischen-WAV, kein Komplett-Read.
+"""
+import struct
+from typing import Optional, Tuple
+
+import numpy as np
+
+from . import mulaw
+from .asr import ASR_RATE
+from .resample import Resampler, pcm_to_int16
+from .wav_writer import HEADER_SIZE, wav_header
+
+# Header größer als das ist kein sinnvolles WAV
+MAX_WAV_HEADER = 64 * 1024
+
+_WAV_TYPES = ("audio/wav", "audio/x-wav", "audio/wave", "audio/vnd.wave")
+_ULAW_TYPES = ("audio/basic", "audio/pcmu", "audio/x-mulaw", "audio/mulaw")
+_L16_TYPES = ("audio/l16",)
+
+
+def parse_content_type(value: Optional[str]) -> Tuple[str, dict]:
+    """'audio/L16; rate=8000; channels=1' → ('audio/l16', {'rate': '8000', 'channels': '1'})"""
+    parts = [p.strip() for p in (value or "").split(";")]
+    params = {}
+    for p in parts[1:]:
+        if "=" in p:
+            k, v = p.split("=", 1)
+            params[k.strip().lower()] = v.strip().strip('"')
+    return parts[0].lower(), params
+
+
+def _parse_wav_header(buf) -> Optional[Tuple[int, int, int, int]]:
+    """→ (channels, sampwidth, rate, data_offset); None = noch zu wenig Bytes; ValueError = kein WAV."""
+    if len(buf) < 12:
+        return None
+    if bytes(buf[:4]) != b"RIFF" or bytes(buf[8:12]) != b"WAVE":
+        raise ValueError("not a RIFF/WAVE stream")
+    pos, fmt = 12, None
+    while True:
+        if pos + 8 > len(buf):
+            return None
+        cid, size = struct.unpack_from("<4sI", buf, pos)
+        pos += 8
+        if cid == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            return fmt + (pos,)
+        if cid == b"fmt ":
+            if pos + 16 > len(buf):
+                return None
+            tag, ch, rate, _, _, bits = struct.unpack_from("<HHIIHH", buf, pos)
+            if tag not in (1, 0xFFFE):
+                raise ValueError(f"unsupported WAV format tag {tag}")
+            fmt = (ch, bits // 8, rate)
+        pos += size + (size & 1)
+
+
+class AudioIngest:
+    """
+    Zustandsbehafteter Decoder für genau einen Request-Body.
+    - feed() nimmt beliebig geschnittene Chunks (auch mitten im Sample/Header), arbeitet auf memoryviews
+    - µ-law wird in einen wiederverwendeten Puffer dekodiert, Resampling läuft streamend mit
+    - finish() → bytearray mit fertigem WAV (16 kHz, mono, Stille-Padding vorne/hinten)
+    - bytes_copied zählt alle Bytes, die unterwegs geschrieben werden (Benchmark)
+    """
+
+    def __init__(self, kind: str, rate: int = 8000, channels: int = 1, big_endian: bool = False,
+                 pad_ms: int = 250, size_hint: int = 0):
+        if kind not in ("wav", "ulaw", "l16"):
+            raise ValueError(f"unsupported audio kind {kind!r}")
+        self.kind = kind
+        self.rate = rate
+        self.channels = max(1, channels)
+        self.sampwidth = 1 if kind == "ulaw" else 2
+        self.big_endian = big_endian
+        self.pad = int(pad_ms * ASR_RATE / 1000)
+        self._fmt_ready = kind != "wav"
+        self._head = bytearray()  # nur für WAV-Header bzw. angeschnittene Frames
+        self._rs: Optional[Resampler] = None
+        self._scratch = np.empty(0, dtype=np.int16)
+        self._out = bytearray()
+        self._n = 0  # geschriebene Ausgabe-Samples (ohne Padding)
+        self.bytes_in = 0
+        self.bytes_copied = 0
+        if self._fmt_ready:
+            self._setup(size_hint)
+
+    @classmethod
+    def for_content_type(cls, content_type: Optional[str], size_hint: int = 0, pad_ms: int = 250) -> "AudioIngest":
+        """Passenden Decoder zum Content-Type wählen; unbekannte Typen werden als WAV versucht."""
+        mime, params = parse_content_type(content_type)
+        rate = int(params.get("rate") or 8000)
+        channels = int(params.get("channels") or 1)
+        if mime in _ULAW_TYPES:
+            return cls("ulaw", rate=rate, channels=channels, pad_ms=pad_ms, size_hint=size_hint)
+        if mime in _L16_TYPES:
+            # RFC 3551: L16 ist big endian, außer explizit anders angegeben
+            big = params.get("endianness", "big-endian").lower() != "little-endian"
+            return cls("l16", rate=rate, channels=channels, big_endian=big, pad_ms=pad_ms, size_hint=size_hint)
+        return cls("wav", pad_ms=pad_ms, size_hint=size_hint)
+
+    @property
+    def frame_size(self) -> int:
+        return self.sampwidth * self.channels
+
+    @property
+    def samples(self) -> int:
+        return self._n
+
+    @property
+    def duration_sec(self) -> float:
+        return self._n / float(ASR_RATE)
+
+    def _setup(self, size_hint: int):
+        if self.rate != ASR_RATE:
+            self._rs = Resampler(self.rate, ASR_RATE)
+        # Ausgabe möglichst in einem Stück anlegen (Größe aus Content-Length geschätzt)
+        est = (size_hint // self.frame_size) * ASR_RATE // max(1, self.rate) + 64
+        self._reserve(est)
+
+    def _reserve(self, samples: int):
+        need = HEADER_SIZE + 2 * (self.pad + self._n + samples + self.pad)
+        if need <= len(self._out):
+            return
+        if self._out:
+            self.bytes_copied += HEADER_SIZE + 2 * (self.pad + self._n)
+        self._out.extend(bytes(max(need, 2 * len(self._out)) - len(self._out)))
+
+    def _write(self, y: np.ndarray):
+        if not len(y):
+            return
+        self._reserve(len(y))
+        off = HEADER_SIZE + 2 * (self.pad + self._n)
+        np.frombuffer(self._out, dtype=np.int16, count=len(y), offset=off)[:] = y
+        self._n += len(y)
+        self.bytes_copied += 2 * len(y)
+
+    def _decode(self, view: memoryview) -> np.ndarray:
+        if self.kind == "ulaw":
+            if len(self._scratch) < len(view):
+                self._scratch = np.empty(len(view), dtype=np.int16)
+            x = mulaw.decode_into(view, self._scratch)
+            self.bytes_copied += 2 * len(x)
+        elif self.sampwidth == 2:
+            x = np.frombuffer(view, dtype=">i2" if self.big_endian else "<i2")
+            if self.big_endian:
+                x = x.astype(np.int16)
+                self.bytes_copied += 2 * len(x)
+        else:
+            x = pcm_to_int16(view, self.sampwidth)
+            self.bytes_copied += 2 * len(x)
+        if self.channels > 1:
+            x = x.reshape(-1, self.channels).mean(axis=1).astype(np.int16)
+            self.bytes_copied += 2 * len(x)
+        return x
+
+    def _consume(self, view: memoryview):
+        x = self._decode(view)
+        if self._rs is not None:
+            x = self._rs.process_array(x)
+            self.bytes_copied += 2 * len(x)
+        self._write(x)
+
+    def feed(self, chunk) -> None:
+        view = memoryview(chunk).cast("B")
+        self.bytes_in += len(view)
+        if not self._fmt_ready:
+            self._head += view
+            self.bytes_copied += len(view)
+            fmt = _parse_wav_header(self._head)
+            if fmt is None:
+                if len(self._head) > MAX_WAV_HEADER:
+                    raise ValueError("WAV header too large")
+                return
+            self.channels, self.sampwidth, self.rate, off = fmt
+            if self.sampwidth not in (1, 2, 4) or not self.rate:
+                raise ValueError(f"unsupported WAV format {fmt}")
+            self._fmt_ready = True
+            self._setup(0)
+            rest, self._head = bytes(self._head[off:]), bytearray()
+            view = memoryview(rest)
+        if self._head:
+            # angeschnittener Frame vom letzten Chunk
+            need = self.frame_size - len(self._head)
+            self._head += view[:need]
+            self.bytes_copied += len(view[:need])
+            view = view[need:]
+            if len(self._head) < self.frame_size:
+                return
+            self._consume(memoryview(self._head))
+            self._head = bytearray()
+        usable = len(view) - len(view) % self.frame_size
+        if usable:
+            self._consume(view[:usable])
+        if usable < len(view):
+            self._head += view[usable:]
+            self.bytes_copied += len(view) - usable
+
+    def finish(self) -> bytearray:
+        if not self._fmt_ready:
+            raise ValueError("incomplete WAV header")
+        if self._rs is not None:
+            self._write(np.frombuffer(self._rs.flush(), dtype=np.int16))
+        self._reserve(0)
+        end = HEADER_SIZE + 2 * (self.pad + self._n + self.pad)
+        # Padding-Bereiche sind Nullen aus extend(); Header vorne einsetzen, Überhang abschneiden
+        self._out[:HEADER_SIZE] = wav_header(end - HEADER_SIZE, ASR_RATE)
+        del self._out[end:]
+        return self._out
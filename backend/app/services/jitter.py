@@ -0,0 +1,102 @@
+# app/services/jitter.py
+from typing import List, Optional, Tuple
+
+
+class JitterBuffer:
+    """
+    Minimaler Jitter-Buffer für Telnyx-Media-Frames (ein Call, PCM16 mono).
+    - sortiert nach Sequenznummer; hält höchstens EINEN Frame zurück (max. 1 Frame Zusatzlatenz)
+    - fehlt ein Frame auch nach dem nächsten noch, gilt er als verloren → Stille in passender Länge
+    - Lückenlänge kommt aus den Telnyx-Timestamps (ms), sonst aus der Sequenzdifferenz
+    - zu späte Frames (Sequenz schon geschrieben) werden verworfen und gezählt
+    """
+
+    def __init__(self, rate: int = 8000, frame_ms: int = 20, max_gap_ms: int = 2000):
+        self.rate = rate
+        self.frame_ms = frame_ms
+        self.max_gap_ms = max_gap_ms
+        self._next_seq: Optional[int] = None
+        self._next_ts: Optional[int] = None
+        self._held: Optional[Tuple[int, Optional[int], bytes]] = None
+        self._frame_bytes = rate * frame_ms // 1000 * 2
+        # Zähler
+        self.received = 0
+        self.reordered = 0
+        self.late = 0
+        self.lost = 0
+        self.silence_ms = 0
+
+    def push(self, seq: Optional[int], ts_ms: Optional[int], pcm) -> List[bytes]:
+        """Frame einreihen; gibt die jetzt schreibbaren Frames (inkl. Stille) in richtiger Reihenfolge zurück."""
+        self.received += 1
+        if seq is None:
+            # ohne Sequenz keine Ordnung möglich → durchreichen
+            return [bytes(pcm)]
+        if self._next_seq is None:
+            self._next_seq = seq
+        if seq < self._next_seq or (self._held is not None and seq == self._held[0]):
+            self.late += 1
+            return []
+
+        out: List[bytes] = []
+        if seq == self._next_seq:
+            self._emit(out, seq, ts_ms, pcm)
+            if self._held is not None and self._held[0] == self._next_seq:
+                # Lücke wurde nachträglich gefüllt
+                self.reordered += 1
+                held, self._held = self._held, None
+                self._emit(out, *held)
+            return out
+
+        if self._held is None:
+            # Lücke: diesen Frame einen Frame lang zurückhalten, vielleicht kommt der fehlende noch
+            self._held = (seq, ts_ms, bytes(pcm))
+            return out
+
+        # zweiter Frame hinter der Lücke → fehlende als verloren werten
+        frames = sorted([self._held, (seq, ts_ms, bytes(pcm))], key=lambda f: f[0])
+        self._held = None
+        for f in frames:
+            self._emit(out, *f)
+        return out
+
+    def flush(self) -> List[bytes]:
+        out: List[bytes] = []
+        if self._held is not None:
+            held, self._held = self._held, None
+            self._emit(out, *held)
+        return out
+
+    def _emit(self, out: List[bytes], seq: int, ts_ms: Optional[int], pcm):
+        if seq > self._next_seq:
+            self._fill_gap(out, seq - self._next_seq, ts_ms)
+        frame = bytes(pcm)
+        out.append(frame)
+        if frame:
+            self._frame_bytes = len(frame)
+        self._next_seq = seq + 1
+        frame_ms = len(frame) * 1000 // (2 * self.rate)
+        self._next_ts = (ts_ms + frame_ms) if ts_ms is not None else None
+
+    def _fill_gap(self, out: List[bytes], missing_seq: int, ts_ms: Optional[int]):
+        if ts_ms is not None and self._next_ts is not None:
+            gap_ms = ts_ms - self._next_ts
+            # Sequenzlücke ohne Zeitlücke (z. B. Nicht-Media-Events) → kein Verlust
+            if gap_ms < self.frame_ms // 2:
+                return
+        else:
+            gap_ms = missing_seq * self._frame_bytes * 1000 // (2 * self.rate)
+        gap_ms = min(gap_ms, self.max_gap_ms)
+        n_frames = max(1, round(gap_ms / self.frame_ms))
+        self.lost += n_frames
+        self.silence_ms += gap_ms
+        out.append(b"\x00" * (gap_ms * self.rate // 1000 * 2))
+
+    def stats(self) -> dict:
+        return {
+            "jitter_received": self.received,
+            "jitter_reordered": self.reordered,
+            "jitter_late_dropped": self.late,
+            "jitter_lost": self.lost,
+            "jitter_silence_ms": self.silence_ms,
+        }
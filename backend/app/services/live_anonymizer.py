@@ -0,0 +1,123 @@
+# app/services/live_anonymizer.py
+import asyncio
+import time
+from typing import Dict, Optional
+
+from ..config import settings
+from ..logging import setup_logging
+from ..state.live_store import live_store
+from .pii import anonymize_text
+
+log = setup_logging()
+
+
+def commit_point(text: str, hold: int) -> int:
+    """
+    Bis wohin neuer Roh-Text schon maskiert werden darf: die letzten `hold` Zeichen bleiben offen,
+    weil eine diktierte Nummer/Adresse über eine Sprechpause (= Segmentgrenze) weiterlaufen kann.
+    Geschnitten wird an einem Leerzeichen → 0 = noch nichts.
+    """
+    if len(text) <= hold:
+        return 0
+    cut = text.rfind(" ", 0, len(text) - hold + 1)
+    return cut + 1 if cut > 0 else 0
+
+
+class _CallMirror:
+    __slots__ = ("task", "wake", "last_text_at", "batches")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.wake = asyncio.Event()
+        self.last_text_at = 0.0
+        self.batches = 0
+
+
+class LiveAnonymizer:
+    """
+    Hält pro Call den anonymisierten Spiegel in live_store aktuell, während Text ankommt:
+    - Listener auf add_text weckt einen Worker pro Call (single-flight; was während eines Laufs
+      ankommt, geht gesammelt in den nächsten)
+    - maskiert wird nur bis commit_point(); der Rest folgt mit dem nächsten Segment oder nach
+      `idle` Sekunden ohne neuen Text
+    - Snapshots speichern nur den fertigen Spiegel → keine Anonymisierung im Button-Request
+    """
+
+    def __init__(self, hold_chars: int = 48, idle: float = 2.0, name_pass: Optional[str] = None):
+        self.hold_chars = hold_chars
+        self.idle = idle
+        self.name_pass = name_pass
+        self._calls: Dict[str, _CallMirror] = {}
+
+    def open(self, call_id: str) -> None:
+        """Call anmelden (Stream-Start); nur angemeldete Calls bekommen einen Spiegel."""
+        self._calls.setdefault(call_id, _CallMirror())
+
+    def on_text(self, call_id: str, offset: int) -> None:
+        """
+        Listener für live_store.add_text. Unbekannte/geschlossene Calls → No-op: nach dem Hangup gehört
+        das Transkript dem Post-Call-Job.
+        """
+        if not settings.LIVE_ANONYMIZE:
+            return
+        st = self._calls.get(call_id)
+        if st is None:
+            return
+        st.last_text_at = time.monotonic()
+        st.wake.set()
+        if st.task is None or st.task.done():
+            st.task = asyncio.create_task(self._worker(call_id, st))
+
+    async def _worker(self, call_id: str, st: _CallMirror):
+        while self._calls.get(call_id) is st:
+            st.wake.clear()
+            raw = live_store.full_text(call_id)
+            start = live_store.masked_raw_end(call_id)
+            if start > len(raw):  # Text ersetzt/geleert
+                start = 0
+            pending = raw[start:]
+            idle = time.monotonic() - st.last_text_at >= self.idle
+            n = len(pending) if idle else commit_point(pending, self.hold_chars)
+            if n and pending.strip():
+                await self._mask(call_id, st, raw, start, start + n)
+                continue
+            if not pending.strip():
+                # alles maskiert → Worker endet, nächster add_text startet ihn neu
+                if pending:
+                    live_store.append_masked(call_id, "", len(raw))
+                return
+            # nur zurückgehaltener Rest: auf neuen Text oder Ruhe warten
+            try:
+                await asyncio.wait_for(st.wake.wait(), self.idle)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _mask(self, call_id: str, st: _CallMirror, raw: str, start: int, end: int):
+        try:
+            masked = await anonymize_text(raw[start:end], self.name_pass)
+        except Exception as e:
+            # ohne Spiegel kein Snapshot dieses Abschnitts; nächster Versuch mit dem nächsten Segment
+            log.warning("live_anonymizer: mask failed call_id=%s: %s", call_id, e)
+            await asyncio.sleep(self.idle)
+            return
+        # Text zwischenzeitlich ersetzt (replace_text/clear) → Ergebnis gehört nicht mehr dazu
+        if live_store.full_text(call_id)[:end] != raw[:end] or live_store.masked_raw_end(call_id) != start:
+            return
+        live_store.append_masked(call_id, masked, end)
+        st.batches += 1
+
+    def close(self, call_id: str) -> None:
+        st = self._calls.pop(call_id, None)
+        if st is not None and st.task is not None:
+            st.task.cancel()
+
+    def stats(self, call_id: str) -> Optional[dict]:
+        st = self._calls.get(call_id)
+        if st is None:
+            return None
+        return {"mask_batches": st.batches, "masked_raw_end": live_store.masked_raw_end(call_id),
+                "raw_len": len(live_store.full_text(call_id))}
+
+
+live_anonymizer = LiveAnonymizer(settings.LIVE_ANONYMIZE_HOLD_CHARS, settings.LIVE_ANONYMIZE_IDLE_SEC,
+                                 settings.LIVE_ANONYMIZE_NAME_PASS)
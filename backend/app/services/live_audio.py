@@ -1,5 +1,4 @@
 import os
-import wave
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any
 
@@ -9,6 +8,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..config import settings
 from ..logging import setup_logging
+from .recording import open_recording
+from .wav_writer import StreamingWavWriter
 
 log = setup_logging()
 
@@ -16,53 +17,45 @@ AUDIO_DIR = getattr(settings, "AUDIO_DIR", "./audio")
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
 
+_writers: Dict[str, StreamingWavWriter] = {}
+
+
+def _writer_for(path: str) -> StreamingWavWriter:
+    w = _writers.get(path)
+    if w is None or w.closed:
+        w = StreamingWavWriter(path, rate=8000, channels=1, sampwidth=2)
+        _writers[path] = w
+    return w
+
+
 def _append_wav8_mono(path: str, pcm8k_s16: bytes) -> int:
     if not pcm8k_s16:
         return 0
-    if not os.path.exists(path):
-        with wave.open(path, "wb") as w:
-            w.setnchannels(1)
-            w.setsampwidth(2)
-            w.setframerate(8000)
-            w.writeframes(pcm8k_s16)
-        return len(pcm8k_s16)
-    with wave.open(path, "rb") as r:
-        params = r.getparams()
-        if params.nchannels != 1 or params.sampwidth != 2 or params.framerate != 8000:
-            raise ValueError(f"Unexpected WAV format in {path}: {params}")
-        existing = r.readframes(r.getnframes())
-    with wave.open(path, "wb") as w:
-        w.setnchannels(1)
-        w.setsampwidth(2)
-        w.setframerate(8000)
-        w.writeframes(existing)
-        w.writeframes(pcm8k_s16)
-    return len(pcm8k_s16)
+    return _writer_for(path).append(pcm8k_s16)
 
 
 def _probe_wav(path: str) -> dict:
-    info = {"exists": False}
+    # offene Writer kennen ihre Größe – kein erneutes Öffnen pro Chunk
+    w = _writers.get(path)
+    if w is not None and not w.closed:
+        return w.info()
+    if not os.path.exists(path):
+        return {"exists": False}
     try:
-        if not os.path.exists(path):
-            return info
-        info["exists"] = True
-        info["size_bytes"] = os.path.getsize(path)
-        with wave.open(path, "rb") as r:
-            nframes = r.getnframes()
-            rate = r.getframerate()
-            ch = r.getnchannels()
-            sw = r.getsampwidth()
-            info.update({
-                "frames": nframes,
-                "samplerate": rate,
-                "channels": ch,
-                "sampwidth": sw,
-                "duration_sec": round(nframes / float(rate or 1), 3),
-            })
-        return info
+        return open_recording(path).info()
     except Exception as e:
-        info["error"] = str(e)
-        return info
+        return {"exists": True, "size_bytes": os.path.getsize(path), "error": str(e)}
+
+
+def close_live_audio(conversation_id: str) -> Optional[dict]:
+    """Schließt den Writer eines Calls (Header final patchen) und gibt die letzten Werte zurück."""
+    fpath = os.path.join(AUDIO_DIR, f"{conversation_id}.wav")
+    w = _writers.pop(fpath, None)
+    if w is None:
+        return None
+    info = w.info()
+    w.close()
+    return info
 
 
 async def _get_or_create_live_row(
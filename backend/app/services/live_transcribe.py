@@ -0,0 +1,124 @@
+# app/services/live_transcribe.py
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..logging import setup_logging
+from ..state.live_store import live_store
+from .asr import pcm16_to_wav, transcribe_wav
+from .asr_scheduler import PRIORITY_LIVE
+from .stitch import TranscriptStitcher
+from .vad import SpeechSegment, vad_from_settings
+
+log = setup_logging()
+
+
+class LiveTranscriber:
+    """
+    Streaming-Transkription eines Calls, hängt am selben Frame-Strom wie der Audio-Sink.
+    - VAD schneidet Sprachfenster; jedes abgeschlossene Fenster geht sofort an die ASR
+    - höchstens `max_concurrency` ASR-Requests gleichzeitig pro Call
+    - Ergebnisse landen strikt in Fenster-Reihenfolge im live_store (inkl. Audio-Zeit)
+    - überlappende Fenster (harte Schnitte) werden per TranscriptStitcher dedupliziert
+    """
+
+    def __init__(self, call_id: str, rate: int = 8000, max_concurrency: int = 2):
+        self.call_id = call_id
+        self.rate = rate
+        self.vad = vad_from_settings(rate)
+        self._sem = asyncio.Semaphore(max_concurrency)
+        self._tasks: List[asyncio.Task] = []
+        self._next_idx = 0
+        self._commit_idx = 0
+        self._done: Dict[int, Tuple[str, SpeechSegment]] = {}
+        self._stitch = TranscriptStitcher()
+        # Zähler
+        self.segments = 0
+        self.chars = 0
+        self.errors = 0
+        self.latency_sum = 0.0
+
+    def feed(self, pcm):
+        for seg in self.vad.feed(pcm):
+            self._dispatch(seg)
+
+    def _dispatch(self, seg: SpeechSegment):
+        idx = self._next_idx
+        self._next_idx += 1
+        self._tasks.append(asyncio.create_task(self._run(idx, seg, time.perf_counter())))
+        self._tasks = [t for t in self._tasks if not t.done()]
+
+    async def _run(self, idx: int, seg: SpeechSegment, t_closed: float):
+        text = ""
+        try:
+            async with self._sem:
+                text = await transcribe_wav(pcm16_to_wav(seg.pcm, seg.rate), filename=f"live_{idx}.wav",
+                                           priority=PRIORITY_LIVE)
+            self.latency_sum += time.perf_counter() - t_closed
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.errors += 1
+            log.warning("live_transcribe: asr failed call=%s seg=%d err=%s", self.call_id, idx, e)
+        finally:
+            self._done[idx] = (text, seg)
+            self._commit()
+
+    def _commit(self):
+        # nur lückenlos von vorne übernehmen → Reihenfolge bleibt erhalten
+        while self._commit_idx in self._done:
+            text, seg = self._done.pop(self._commit_idx)
+            self._commit_idx += 1
+            text = self._stitch.add(text, overlap=seg.overlap_samples > 0)
+            if text:
+                self.segments += 1
+                self.chars += len(text)
+                live_store.add_text(self.call_id, text, span=(seg.start_sec, seg.end_sec))
+
+    async def close(self, timeout: Optional[float] = 30.0):
+        """Offenes Fenster abschließen und auf laufende ASR-Requests warten (begrenzt)."""
+        for seg in self.vad.flush():
+            self._dispatch(seg)
+        pending = [t for t in self._tasks if not t.done()]
+        if pending:
+            _, still = await asyncio.wait(pending, timeout=timeout)
+            for t in still:
+                t.cancel()
+        self._tasks = []
+
+    def stats(self) -> dict:
+        ok = max(1, self.segments)
+        return {
+            "live_asr_windows": self._next_idx,
+            "live_asr_segments": self.segments,
+            "live_asr_chars": self.chars,
+            "live_asr_errors": self.errors,
+            "live_asr_dup_tokens": self._stitch.dup_tokens,
+            "live_asr_avg_latency_sec": round(self.latency_sum / ok, 3),
+        }
+
+
+class LiveTranscriberStore:
+    def __init__(self):
+        self._items: Dict[str, LiveTranscriber] = {}
+
+    def open(self, call_id: str, rate: int = 8000) -> LiveTranscriber:
+        tr = self._items.get(call_id)
+        if tr is None:
+            tr = LiveTranscriber(call_id, rate=rate, max_concurrency=settings.LIVE_ASR_CONCURRENCY)
+            self._items[call_id] = tr
+        return tr
+
+    def get(self, call_id: str) -> Optional[LiveTranscriber]:
+        return self._items.get(call_id)
+
+    async def close(self, call_id: str, timeout: Optional[float] = 30.0) -> Optional[dict]:
+        tr = self._items.pop(call_id, None)
+        if tr is None:
+            return None
+        await tr.close(timeout)
+        return tr.stats()
+
+
+live_transcribers = LiveTranscriberStore()
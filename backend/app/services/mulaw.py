@@ -0,0 +1,73 @@
+# app/services/mulaw.py
+"""
+G.711 µ-law Codec über vorberechnete Tabellen (ersetzt audioop.ulaw2lin/lin2ulaw).
+Bitgenau kompatibel zu audioop; Decoding direkt in einen vom Aufrufer gehaltenen Puffer.
+"""
+from typing import Union
+
+import numpy as np
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+ULAW_SILENCE = 0xFF
+_BIAS = 0x84
+_CLIP = 8159
+_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF], dtype=np.int32)
+
+
+def _build_decode_table() -> np.ndarray:
+    u = ~np.arange(256, dtype=np.int32) & 0xFF
+    t = (((u & 0x0F) << 3) + _BIAS) << ((u & 0x70) >> 4)
+    return np.where(u & 0x80, _BIAS - t, t - _BIAS).astype(np.int16)
+
+
+def _build_encode_table() -> np.ndarray:
+    # Index = int16-Sample als uint16 gelesen
+    pcm = np.arange(65536, dtype=np.int32)
+    pcm = np.where(pcm >= 32768, pcm - 65536, pcm) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    mag = np.minimum(np.abs(pcm), _CLIP) + (_BIAS >> 2)
+    seg = np.searchsorted(_SEG_END, mag, side="left")
+    uval = (np.minimum(seg, 7) << 4) | ((mag >> (np.minimum(seg, 7) + 1)) & 0x0F)
+    uval = np.where(seg >= 8, 0x7F, uval)
+    return (uval ^ mask).astype(np.uint8)
+
+
+ULAW_DECODE = _build_decode_table()
+ULAW_ENCODE = _build_encode_table()
+
+
+def decode_into(mu: BytesLike, out: np.ndarray) -> np.ndarray:
+    """µ-law → int16 in `out` (muss >= len(mu) sein); gibt die befüllte View zurück."""
+    n = len(mu)
+    if n > len(out):
+        raise ValueError(f"decode buffer too small: {len(out)} < {n}")
+    view = out[:n]
+    if n:
+        ULAW_DECODE.take(np.frombuffer(mu, dtype=np.uint8), out=view, mode="clip")
+    return view
+
+
+def decode(mu: BytesLike) -> bytes:
+    """µ-law → PCM16 (little endian) als bytes."""
+    if not mu:
+        return b""
+    return ULAW_DECODE[np.frombuffer(mu, dtype=np.uint8)].tobytes()
+
+
+def encode_into(pcm: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """int16-Samples → µ-law in `out` (uint8)."""
+    n = len(pcm)
+    if n > len(out):
+        raise ValueError(f"encode buffer too small: {len(out)} < {n}")
+    view = out[:n]
+    if n:
+        ULAW_ENCODE.take(pcm.view(np.uint16), out=view, mode="clip")
+    return view
+
+
+def encode(pcm16: BytesLike) -> bytes:
+    """PCM16 (little endian) → µ-law als bytes."""
+    if not pcm16:
+        return b""
+    return ULAW_ENCODE[np.frombuffer(pcm16, dtype="<u2")].tobytes()
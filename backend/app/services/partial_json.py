@@ -0,0 +1,104 @@
+# app/services/partial_json.py
+import json
+from typing import Any, List, Optional, Tuple
+
+TRAFFIC_LIGHTS = ("green", "yellow", "red")
+
+
+def normalize_traffic_light(value: Any) -> str:
+    tl = str(value or "yellow").strip().lower()
+    return tl if tl in TRAFFIC_LIGHTS else "yellow"
+
+
+class _Frame:
+    __slots__ = ("kind", "key", "idx", "expect_key")
+
+    def __init__(self, kind: str):
+        self.kind = kind  # "obj" | "arr"
+        self.key: Optional[str] = None
+        self.idx = 0
+        self.expect_key = kind == "obj"
+
+
+class SuggestionStreamParser:
+    """
+    Inkrementeller Parser für {"suggestions": ["...", ...], "trafficLight": "..."} aus Token-Deltas.
+    feed() liefert Ereignisse, sobald ein Element vollständig ist:
+      ("suggestion", index, text) und ("trafficLight", value)
+    Kein Re-Parse des bisherigen Texts: jeder Char wird genau einmal angesehen.
+    Text vor dem ersten '{' (z. B. ```json) wird ignoriert.
+    """
+
+    def __init__(self):
+        self._stack: List[_Frame] = []
+        self._in_str = False
+        self._esc = False
+        self._str: List[str] = []
+        self.raw: List[str] = []
+        self.suggestions: List[str] = []
+        self.traffic_light: Optional[str] = None
+
+    def feed(self, delta: str) -> List[Tuple]:
+        out: List[Tuple] = []
+        if not delta:
+            return out
+        self.raw.append(delta)
+        for ch in delta:
+            if self._in_str:
+                if self._esc:
+                    self._esc = False
+                    self._str.append(ch)
+                elif ch == "\\":
+                    self._esc = True
+                    self._str.append(ch)
+                elif ch == '"':
+                    self._in_str = False
+                    self._on_string("".join(self._str), out)
+                    self._str = []
+                else:
+                    self._str.append(ch)
+                continue
+            if ch == '"':
+                if self._stack:
+                    self._in_str = True
+            elif ch == "{":
+                self._stack.append(_Frame("obj"))
+            elif ch == "[":
+                if self._stack:
+                    self._stack.append(_Frame("arr"))
+            elif ch in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif ch == ":":
+                if self._stack and self._stack[-1].kind == "obj":
+                    self._stack[-1].expect_key = False
+            elif ch == ",":
+                if self._stack:
+                    top = self._stack[-1]
+                    if top.kind == "obj":
+                        top.expect_key = True
+                    else:
+                        top.idx += 1
+        return out
+
+    def _on_string(self, raw: str, out: List[Tuple]):
+        try:
+            s = json.loads('"' + raw + '"')
+        except ValueError:
+            s = raw
+        top = self._stack[-1]
+        if top.kind == "obj" and top.expect_key:
+            top.key = s
+            return
+        depth = len(self._stack)
+        if depth == 1 and top.key == "trafficLight":
+            self.traffic_light = normalize_traffic_light(s)
+            out.append(("trafficLight", self.traffic_light))
+        elif depth == 2 and top.kind == "arr" and self._stack[0].key == "suggestions":
+            s = s.strip()
+            if s:
+                self.suggestions.append(s)
+                out.append(("suggestion", top.idx, s))
+
+    def text(self) -> str:
+        return "".join(self.raw)
@@ -0,0 +1,251 @@
+# app/services/pii.py
+import asyncio
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..agents import runner, database_agent
+from ..config import settings
+from ..logging import setup_logging
+
+log = setup_logging()
+
+# Platzhalter wie im DATABASE_AGENT_PROMPT
+EMAIL, PHONE, IBAN, CARD, ADDRESS, NAME = "[email]", "[telefon]", "[iban]", "[karte]", "[adresse]", "[name]"
+
+_EMAIL = re.compile(r"(?<![\w.+-])[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-zA-Z]{2,}(?!\w)")
+# Länderkürzel + Prüfziffern + Blöcke; Länge/Prüfsumme entscheidet _valid_iban
+_IBAN = re.compile(r"(?<![\w])[A-Z]{2}\d{2}(?:[ ]?[A-Z0-9]{1,4}){3,8}(?!\w)", re.I)
+_CARD = re.compile(r"(?<![\d\w])\d(?:[ \-]?\d){12,18}(?![\d\w])")
+_STREET_SUFFIX = r"(?:straße|strasse|str\.|weg|allee|platz|gasse|ring|damm|ufer|chaussee|steig|pfad)"
+_STREET_WORD = r"(?:Straße|Strasse|Str\.|Weg|Allee|Platz|Gasse|Ring|Damm|Ufer|Chaussee)"
+_CAP = r"[A-ZÄÖÜ][a-zäöüß]+"
+_ADDRESS = re.compile(
+    # Goethestraße 5 | Karl-Marx-Allee 3a | Musterstr. 1 | Alte Landstraße 12 | Berliner Straße 7-9
+    rf"(?<![\w-])(?:(?:{_CAP}(?:e|er) )?{_CAP}(?:-{_CAP})*-?{_STREET_SUFFIX}|(?:{_CAP}[ -]){{1,3}}{_STREET_WORD})"
+    r"\s*\d{1,4}(?:\s?[a-zA-Z](?![\wäöüß]))?(?:\s?[-/]\s?\d{1,4}[a-zA-Z]?)?(?!\d)"
+    # optional ", 10115 Berlin"
+    r"(?:,?\s*\d{5}\s+[A-ZÄÖÜ][\wäöüß-]+(?:\s+(?:an\s+der|am|im)\s+[A-ZÄÖÜ][\wäöüß-]+)?)?"
+)
+_PHONE = re.compile(
+    r"(?<![\w+])(?:"
+    r"(?:\+|00)[1-9]\d{0,2}(?:[ \-/]?\(0\))?(?:[ \-/]{0,3}\d{1,5}){2,6}"  # +49 151 2345678, 0049 (0)30 …
+    r"|\(?0[1-9]\d{1,4}\)?(?:[ \-/]{0,3}\d{2,}){1,4}"  # 0151 2345678, (030) 123 456, 030 / 12 34 56
+    r")(?![\d\w])"
+)
+# Namen nur in eindeutigen Mustern; "ich bin …" trifft im Deutschen zu oft Substantive (Rentner, Kunde)
+_NAME_INTRO = re.compile(rf"(?<!\w)((?:[Mm]ein Name ist|[Ii]ch heiße|[Hh]ier spricht)\s+){_CAP}(?:[ -]{_CAP})?")
+_NAME_TITLE = re.compile(rf"(?<!\w)((?:Herr|Herrn|Frau|Hr\.|Fr\.)\s+)(?:Dr\.\s+)?{_CAP}(?:-{_CAP})?")
+
+
+def _valid_iban(compact: str) -> bool:
+    s = compact.upper()
+    if not 15 <= len(s) <= 34 or (s.startswith("DE") and len(s) != 22):
+        return False
+    digits = "".join(str(int(c, 36)) for c in s[4:] + s[:4])
+    return int(digits) % 97 == 1
+
+
+def _valid_luhn(digits: str) -> bool:
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        n = ord(d) - 48
+        if i % 2:
+            n = n * 2 - 9 if n > 4 else n * 2
+        total += n
+    return total % 10 == 0
+
+
+_DE_IBAN_SHAPE = re.compile(r"DE\d{20}", re.I)
+
+
+def _sub_iban(m: "re.Match") -> str:
+    raw = m.group(0)
+    # gierig gematchte Blöcke hinten abschneiden, bis Prüfsumme passt ("DE89 … 00 und 12")
+    compact_pos = [i for i, c in enumerate(raw) if c != " "]
+    for n in range(min(34, len(compact_pos)), 14, -1):
+        end = compact_pos[n - 1] + 1
+        if _valid_iban(raw[:end].replace(" ", "")):
+            return IBAN + raw[end:]
+    # exakt DE + 20 Ziffern, aber Prüfsumme falsch: verhörte/vertippte Kontonummer, trotzdem maskieren
+    if len(compact_pos) >= 22:
+        end = compact_pos[21] + 1
+        if _DE_IBAN_SHAPE.fullmatch(raw[:end].replace(" ", "")):
+            return IBAN + raw[end:]
+    return raw
+
+
+def _sub_card(m: "re.Match") -> str:
+    raw = m.group(0)
+    digits = re.sub(r"\D", "", raw)
+    return CARD if _valid_luhn(digits) else raw
+
+
+def _sub_phone(m: "re.Match") -> str:
+    raw = m.group(0)
+    n = sum(c.isdigit() for c in raw)
+    return PHONE if 7 <= n <= 15 else raw
+
+
+def anonymize_local(text: str, names: bool = True) -> Tuple[str, Dict[str, int]]:
+    """
+    Regelbasierte Maskierung der regulären PII-Kategorien aus DATABASE_AGENT_PROMPT.
+    Reihenfolge zählt: E-Mail → IBAN → Karte → Adresse → Telefon (spätere Muster sehen die
+    Platzhalter der früheren, keine Ziffern mehr) → Namen in eindeutigen Mustern.
+    → (maskierter Text, Anzahl je Platzhalter)
+    """
+    if not text or not text.strip():
+        return text, {}
+    counts: Dict[str, int] = {}
+    out = text
+    for rx, repl, ph in ((_EMAIL, EMAIL, EMAIL), (_IBAN, _sub_iban, IBAN), (_CARD, _sub_card, CARD),
+                         (_ADDRESS, ADDRESS, ADDRESS), (_PHONE, _sub_phone, PHONE)):
+        before = out.count(ph)
+        out = rx.sub(repl, out)
+        if out.count(ph) > before:
+            counts[ph] = out.count(ph) - before
+    if names:
+        before = out.count(NAME)
+        out = _NAME_TITLE.sub(lambda m: m.group(1) + NAME, out)
+        out = _NAME_INTRO.sub(lambda m: m.group(1) + NAME, out)
+        if out.count(NAME) > before:
+            counts[NAME] = out.count(NAME) - before
+    return out, counts
+
+
+_PLACEHOLDERS = (EMAIL, PHONE, IBAN, CARD, ADDRESS, NAME)
+_PH_SPLIT = re.compile(r"(\[(?:email|telefon|iban|karte|adresse|name)\])", re.I)
+_SENT_END = re.compile(r"(?<=[.!?…])\s+")
+
+
+def split_chunks(text: str, max_chars: int) -> List[str]:
+    """
+    Text an Satzgrenzen in Stücke ≤ max_chars teilen; "".join(chunks) == text.
+    Überlange Sätze werden am letzten Leerzeichen davor geteilt.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    sentences, pos = [], 0
+    for m in _SENT_END.finditer(text):
+        sentences.append(text[pos:m.end()])
+        pos = m.end()
+    if pos < len(text):
+        sentences.append(text[pos:])
+
+    chunks, cur = [], ""
+    for sent in sentences:
+        while len(sent) > max_chars:
+            cut = sent.rfind(" ", 0, max_chars) + 1 or max_chars
+            if cur:
+                chunks.append(cur)
+                cur = ""
+            chunks.append(sent[:cut])
+            sent = sent[cut:]
+        if len(cur) + len(sent) > max_chars and cur:
+            chunks.append(cur)
+            cur = ""
+        cur += sent
+    if cur:
+        chunks.append(cur)
+    return chunks
+
+
+def reconstruct(src: str, out: str) -> Optional[List[Tuple[str, str]]]:
+    """
+    Prüft, ob `out` 1:1 `src` ist, nur mit Abschnitten durch Platzhalter ersetzt (Leerraum-Varianten
+    toleriert). → [(Platzhalter, ersetzter Originaltext), …] oder None, wenn umformuliert/gekürzt.
+    Im LLM-Text vorhandene Platzhalter des lokalen Durchgangs müssen dabei wörtlich erhalten bleiben.
+    """
+    parts = _PH_SPLIT.split(out)
+    rx, phs = [], []
+    for i, part in enumerate(parts):
+        if i % 2:
+            ph = part.lower()
+            phs.append(ph)
+            rx.append(r"([^\n]{1,80}?)")
+        else:
+            rx.append(r"\s+".join(re.escape(w) for w in part.split()) if part.strip() else "")
+            if part[:1].isspace():
+                rx[-1] = r"\s*" + rx[-1]
+            if part[-1:].isspace() and part.strip():
+                rx[-1] += r"\s*"
+    m = re.fullmatch(r"\s*" + "".join(rx) + r"\s*", src, re.S)
+    if m is None:
+        return None
+    spans = list(zip(phs, m.groups()))
+    for ph, orig in spans:
+        # lokaler Platzhalter nur 1:1 übernehmen; neue Funde ohne Satzzeichen am Rand / geschluckte Platzhalter
+        if orig == ph:
+            continue
+        if not (orig[0].isalnum() and orig[-1].isalnum()) or _PH_SPLIT.search(orig):
+            return None
+    return spans
+
+
+def _strip_quotes(src: str, out: str) -> str:
+    # Prompt-Beispiele stehen in Anführungszeichen; manche Antworten übernehmen sie
+    for q in ('"', "„", "“"):
+        if out[:1] == q and src.strip()[:1] != q:
+            return out.strip('"„“”').strip()
+    return out
+
+
+async def _name_pass_chunk(chunk: str, sem: asyncio.Semaphore) -> Optional[Tuple[str, List[Tuple[str, str]]]]:
+    """database_agent auf einem Stück → (Text, ersetzte Abschnitte) oder None (lokal bleibt)."""
+    if not chunk.strip():
+        return None
+    try:
+        async with sem:
+            da_out = await runner.run(database_agent, [{"role": "user", "content": chunk.strip()}])
+        llm = _strip_quotes(chunk, (getattr(da_out, "final_output", "") or "").strip())
+    except Exception as e:
+        log.warning("pii: name pass failed for chunk (%d chars), keeping local result: %s", len(chunk), e)
+        return None
+    spans = reconstruct(chunk, llm) if llm else None
+    if spans is None:
+        log.info("pii: name pass chunk rejected (len %d → %d), keeping local result", len(chunk), len(llm))
+        return None
+    # Leerraum am Rand wie im Original, damit "".join(Stücke) die Struktur erhält
+    lead, trail = chunk[:len(chunk) - len(chunk.lstrip())], chunk[len(chunk.rstrip()):]
+    return lead + llm.strip() + trail, spans
+
+
+def _propagate(chunks: List[str], learned: Dict[str, str]) -> List[str]:
+    """Was das LLM in einem Stück maskiert hat, überall maskieren (gleiche Person → gleicher Platzhalter)."""
+    if not learned:
+        return chunks
+    rx = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(t) for t in sorted(learned, key=len, reverse=True))
+                    + r")(?!\w)")
+    return [rx.sub(lambda m: learned[m.group(0)], c) for c in chunks]
+
+
+async def anonymize_text(text: str, name_pass: Optional[str] = None) -> str:
+    """
+    Lokale Maskierung; Personennamen danach je nach ANONYMIZE_NAME_PASS:
+    - "llm":   database_agent auf dem bereits maskierten Text (sieht keine Nummern/Adressen mehr),
+               lange Texte in Stücken an Satzgrenzen, parallel (ANONYMIZE_CONCURRENCY); jedes Stück
+               wird per reconstruct() geprüft, ein abgelehntes Stück behält nur sein lokales Ergebnis
+    - "rules": nur die lokalen Namensmuster
+    - "off":   keine Namensmaskierung
+    """
+    mode = (name_pass or settings.ANONYMIZE_NAME_PASS).lower()
+    masked, _ = anonymize_local(text, names=mode != "off")
+    if mode != "llm" or not masked.strip():
+        return masked
+    chunks = split_chunks(masked, settings.ANONYMIZE_CHUNK_CHARS)
+    sem = asyncio.Semaphore(max(1, settings.ANONYMIZE_CONCURRENCY))
+    results = await asyncio.gather(*(_name_pass_chunk(c, sem) for c in chunks))
+
+    out, learned, rejected = [], {}, 0
+    for chunk, res in zip(chunks, results):
+        if res is None:
+            rejected += chunk.strip() != ""
+            out.append(chunk)
+            continue
+        out.append(res[0])
+        for ph, orig in res[1]:
+            # nur echte Funde weitertragen (keine lokalen Platzhalter, keine Kleinwörter)
+            if ph == NAME and orig[:1].isupper() and len(orig) >= 3:
+                learned.setdefault(orig, ph)
+    if len(chunks) > 1:
+        log.info("pii: name pass %d chunks, %d kept local, %d names propagated", len(chunks), rejected, len(learned))
+    return "".join(_propagate(out, learned))
@@ -0,0 +1,211 @@
+# app/services/playbook.py
+import asyncio
+import json
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from prompts import COMBO_AGENT_PROMPT, SALES_ASSISTANT_PROMPT
+
+from ..config import settings
+from ..logging import setup_logging
+from ..state.live_store import live_store
+from .ws_rooms import broadcast
+
+log = setup_logging()
+
+# Einwand → Auslöser (ganze Wörter; "*" am Ende = Wortanfang genügt) + Beispiel-Input aus den Prompts
+# (liefert die Antworten)
+OBJECTIONS: Dict[str, dict] = {
+    "keine_zeit": {
+        "triggers": ["keine zeit", "hab grad keine zeit", "passt gerade nicht", "gerade schlecht",
+                     "bin beschäftigt", "bin gerade unterwegs"],
+        "example": "Ich habe keine Zeit!",
+    },
+    "kein_interesse": {
+        "triggers": ["kein interesse", "interessiert mich nicht", "brauche ich nicht", "will ich nicht"],
+        "example": "Ich habe kein Interesse!",
+    },
+    "kenne_sie_nicht": {
+        "triggers": ["kenne sie nicht", "kenn ich nicht", "wer sind sie", "nie von ihnen gehört"],
+        "example": "Ich kenne Sie nicht.",
+    },
+    "abzocke": {
+        "triggers": ["abzock*", "ist betrug", "betrüger*", "unseriös*", "klingt nach masche"],
+        "example": "Das klingt nach Abzocke.",
+    },
+    "schon_gewechselt": {
+        "triggers": ["schon gewechselt", "bereits gewechselt", "gerade gewechselt", "habe gewechselt"],
+        "example": "Ich habe schon gewechselt!",
+    },
+    "datenherkunft": {
+        "triggers": ["woher haben sie meine daten", "woher haben sie meine nummer",
+                     "woher haben sie meine telefonnummer", "woher kennen sie meine"],
+        "example": "Woher haben Sie meine Daten?",
+    },
+}
+
+# 'User: "…" Antwort: [ … ]' (SALES_ASSISTANT_PROMPT) und 'Input: "…" Output: { … }' (COMBO_AGENT_PROMPT)
+_EXAMPLE = re.compile(r'(?:User|Input):\s*"(.+?)"\s*(?:Antwort|Output):\s*(\[.*?\]|\{.*?\})', re.S)
+
+
+def _fold(ch: str) -> str:
+    """Zeichen für den Automaten: klein, Satzzeichen → Leerzeichen (längenerhaltend, kein Re-Normalisieren)."""
+    c = ch.lower()
+    return c if len(c) == 1 and c.isalnum() else " "
+
+
+class AhoCorasick:
+    """
+    Mehrmuster-Automat über gefaltete Zeichen; Zustand = (Knoten, letztes Zeichen war Leerzeichen),
+    damit ein Call-Transkript segmentweise weiter eingespeist werden kann (Muster über Segmentgrenzen
+    hinweg werden gefunden, nichts wird doppelt gescannt). Muster beginnen und enden an Wortgrenzen;
+    Segmente daher mit Leerzeichen einrahmen, sonst fällt ein Treffer am Segmentende erst später auf.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[str]] = [[]]
+        for key, pats in patterns.items():
+            for p in pats:
+                # Leerzeichen vorn/hinten = Wortgrenzen; Mehrfach-Leerzeichen zusammenfassen
+                stem = p.endswith("*")
+                words = " ".join("".join(_fold(c) for c in p.rstrip("*")).split())
+                node = 0
+                for ch in " " + words + ("" if stem else " "):
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto[node][ch] = nxt
+                        self._goto.append({})
+                        self._out.append([])
+                    node = nxt
+                if key not in self._out[node]:
+                    self._out[node].append(key)
+        # Fehler-Links per BFS, Ausgaben entlang der Links zusammenführen
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] += [k for k in self._out[self._fail[nxt]] if k not in self._out[nxt]]
+
+    START: Tuple[int, bool] = (0, False)
+
+    def feed(self, state: Tuple[int, bool], text: str) -> Tuple[Tuple[int, bool], List[str]]:
+        node, prev_space = state
+        goto, fail, out = self._goto, self._fail, self._out
+        found: List[str] = []
+        for ch in text:
+            c = _fold(ch)
+            if c == " ":
+                if prev_space:
+                    continue
+                prev_space = True
+            else:
+                prev_space = False
+            while node and c not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(c, 0)
+            if out[node]:
+                found += out[node]
+        return (node, prev_space), found
+
+    def search(self, text: str) -> List[str]:
+        return self.feed(self.START, " " + text + " ")[1]
+
+
+def load_playbook() -> Dict[str, List[str]]:
+    """Freigegebene Antworten je Einwand aus den Prompt-Beispielen (SALES_ASSISTANT + COMBO), max. 3."""
+    answers: Dict[str, List[str]] = {}
+    for prompt in (SALES_ASSISTANT_PROMPT, COMBO_AGENT_PROMPT):
+        for example, raw in _EXAMPLE.findall(prompt):
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                continue
+            sugg = data.get("suggestions", []) if isinstance(data, dict) else data
+            answers.setdefault(example.strip(), []).extend(s for s in sugg if isinstance(s, str))
+    out = {}
+    for key, obj in OBJECTIONS.items():
+        sugg = list(dict.fromkeys(answers.get(obj["example"], [])))[:3]
+        if sugg:
+            out[key] = sugg
+        else:
+            log.warning("playbook: no vetted answers for %s (%r)", key, obj["example"])
+    return out
+
+
+class _CallScan:
+    __slots__ = ("state", "pos", "pushed")
+
+    def __init__(self):
+        self.state = AhoCorasick.START
+        self.pos = 0
+        self.pushed: Dict[str, float] = {}
+
+
+class ObjectionPlaybook:
+    """
+    Listener auf live_store: scannt nur den neuen Teil des Transkripts, erkennt Einwände und pusht
+    sofort die freigegebenen Antworten in die /ws/client-Room (type="playbook"), bevor das LLM antwortet.
+    Pro Einwand und Call höchstens einmal je `cooldown` Sekunden.
+    """
+
+    def __init__(self, cooldown: float = 30.0):
+        self.cooldown = cooldown
+        self.answers = load_playbook()
+        self.matcher = AhoCorasick({k: OBJECTIONS[k]["triggers"] for k in self.answers})
+        self._calls: Dict[str, _CallScan] = {}
+        self.matches = 0
+        self.pushed = 0
+
+    def open(self, call_id: str) -> None:
+        """Call anmelden (Stream-Start); nur angemeldete Calls werden gescannt."""
+        self._calls.setdefault(call_id, _CallScan())
+
+    def on_text(self, call_id: str, offset: int) -> None:
+        """Listener für live_store.add_text; unbekannte/geschlossene Calls (Segmente nach dem Hangup) → No-op."""
+        if not settings.PLAYBOOK_ENABLED:
+            return
+        st = self._calls.get(call_id)
+        if st is None:
+            return
+        text = live_store.full_text(call_id)
+        if len(text) < st.pos:  # Text ersetzt → von vorn
+            st = self._calls[call_id] = _CallScan()
+        new = text[st.pos:]
+        st.pos = len(text)
+        st.state, found = self.matcher.feed(st.state, " " + new + " ")
+        for key in dict.fromkeys(found):
+            self.matches += 1
+            now = time.monotonic()
+            if now - st.pushed.get(key, -self.cooldown) < self.cooldown:
+                continue
+            st.pushed[key] = now
+            self.pushed += 1
+            asyncio.create_task(broadcast(call_id, {
+                "type": "playbook", "objection": key, "suggestions": list(self.answers[key]),
+                "source": "playbook", "call_id": call_id, "offset": len(text),
+            }))
+
+    def match(self, text: str) -> Optional[Tuple[str, List[str]]]:
+        """Letzter erkannter Einwand im Text → (Schlüssel, Antworten)."""
+        found = self.matcher.search(text or "")
+        return (found[-1], list(self.answers[found[-1]])) if found else None
+
+    def close(self, call_id: str) -> None:
+        self._calls.pop(call_id, None)
+
+    def stats(self) -> dict:
+        return {"playbook_objections": len(self.answers), "playbook_matches": self.matches,
+                "playbook_pushed": self.pushed, "playbook_calls": len(self._calls)}
+
+
+objection_playbook = ObjectionPlaybook(settings.PLAYBOOK_COOLDOWN_SEC)
@@ -0,0 +1,250 @@
+# app/services/post_call.py
+import asyncio
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from models import Message, PostCallJob
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from ..config import settings
+from ..db import SessionLocal
+from ..logging import setup_logging
+from ..state.live_store import live_store
+from ..utils import now_berlin
+from .finalize import collect_final_text
+from .pii import anonymize_text
+
+log = setup_logging()
+
+
+class PostCallQueue:
+    """
+    Dauerhafte Job-Queue für die Nachbearbeitung nach dem Auflegen (Tabelle post_call_jobs):
+      Lücken/Aufnahme transkribieren → EINMAL anonymisieren → speichern
+    - enqueue() ist ein INSERT; der Webhook wartet nicht auf ASR/LLM
+    - ein Job pro conversation_id (Primärschlüssel); doppelte Webhooks sind No-ops
+    - Worker holen Jobs per bedingtem UPDATE (pending → running), Fehler → Retry mit exponentiellem
+      Backoff bis POSTCALL_MAX_ATTEMPTS, danach "failed"
+    - Message-Zeile und status="done" werden in EINER Transaktion geschrieben → kein Doppel-Insert bei Retry
+    - laufende Jobs erneuern updated_at regelmäßig (Lease); "running"-Jobs ohne Lebenszeichen seit
+      `lease` Sekunden (abgestürzter Prozess) gehen wieder auf "pending" – Jobs eines anderen, lebenden
+      Prozesses bleiben unangetastet
+    """
+
+    def __init__(self, workers: int = 2, max_attempts: int = 5, backoff: float = 5.0, backoff_max: float = 300.0,
+                 poll: float = 2.0, lease: float = 120.0):
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.poll = poll
+        self.lease = lease
+        self._last_reap = 0.0
+        self._wake = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        # Zähler
+        self.enqueued = 0
+        self.duplicates = 0
+        self.done = 0
+        self.retried = 0
+        self.failed = 0
+
+    # ---- Lebenszyklus ----
+
+    async def start(self):
+        if self._tasks:
+            return
+        await self._requeue_expired()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._wake.set()
+
+    async def close(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # ---- API ----
+
+    async def enqueue(self, call_id: str, reason: str = "hangup", live_text: str = "",
+                      spans: Optional[List[List[float]]] = None) -> bool:
+        """Job anlegen → True; existiert schon einer für den Call → False (idempotent)."""
+        try:
+            async with SessionLocal() as db:
+                db.add(PostCallJob(conversation_id=call_id, reason=reason, status="pending", attempts=0,
+                                   run_after=0.0, payload={"text": live_text, "spans": spans or []}))
+                await db.commit()
+        except IntegrityError:
+            self.duplicates += 1
+            log.info("post_call: job exists call_id=%s -> skip", call_id)
+            return False
+        self.enqueued += 1
+        self._wake.set()
+        return True
+
+    async def status(self, call_id: str) -> Optional[dict]:
+        async with SessionLocal() as db:
+            job = await db.get(PostCallJob, call_id)
+        if job is None:
+            return None
+        return {"conversation_id": job.conversation_id, "status": job.status, "attempts": job.attempts,
+                "result_chars": job.result_chars, "last_error": job.last_error}
+
+    def stats(self) -> dict:
+        return {"enqueued": self.enqueued, "duplicates": self.duplicates, "done": self.done,
+                "retried": self.retried, "failed": self.failed, "workers": len(self._tasks)}
+
+    # ---- Worker ----
+
+    async def _requeue_expired(self):
+        """Verwaiste "running"-Jobs (Lease abgelaufen) wieder freigeben."""
+        self._last_reap = time.monotonic()
+        # updated_at schreibt immer die DB (func.now(), UTC) → Vergleich gegen UTC
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease)
+        async with SessionLocal() as db:
+            res = await db.execute(update(PostCallJob)
+                                   .where(PostCallJob.status == "running", PostCallJob.updated_at < cutoff)
+                                   .values(status="pending", updated_at=func.now()))
+            await db.commit()
+        if res.rowcount:
+            log.info("post_call: %d orphaned jobs requeued", res.rowcount)
+
+    async def _heartbeat(self, cid: str):
+        """Lease des laufenden Jobs verlängern, bis _run fertig ist."""
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            try:
+                async with SessionLocal() as db:
+                    await db.execute(update(PostCallJob)
+                                     .where(PostCallJob.conversation_id == cid, PostCallJob.status == "running")
+                                     .values(updated_at=func.now()))
+                    await db.commit()
+            except Exception as e:
+                log.warning("post_call: heartbeat failed call_id=%s: %s", cid, e)
+
+    async def _claim(self) -> Optional[PostCallJob]:
+        async with SessionLocal() as db:
+            res = await db.execute(
+                select(PostCallJob.conversation_id)
+                .where(PostCallJob.status == "pending", PostCallJob.run_after <= time.time())
+                .order_by(PostCallJob.created_at).limit(1))
+            cid = res.scalar()
+            if cid is None:
+                return None
+            # bedingtes UPDATE: nur einer von mehreren Workern/Prozessen bekommt den Job
+            res = await db.execute(
+                update(PostCallJob).where(PostCallJob.conversation_id == cid, PostCallJob.status == "pending")
+                .values(status="running", attempts=PostCallJob.attempts + 1, updated_at=func.now()))
+            await db.commit()
+            if res.rowcount != 1:
+                return None
+            return await db.get(PostCallJob, cid, populate_existing=True)
+
+    async def _next_due(self) -> float:
+        async with SessionLocal() as db:
+            res = await db.execute(select(func.min(PostCallJob.run_after)).where(PostCallJob.status == "pending"))
+            ts = res.scalar()
+        return self.poll if ts is None else min(self.poll, max(0.0, ts - time.time()))
+
+    async def _worker(self, n: int):
+        while True:
+            try:
+                if n == 0 and time.monotonic() - self._last_reap >= self.lease:
+                    await self._requeue_expired()
+                job = await self._claim()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning("post_call: claim failed: %s", e)
+                job = None
+            if job is None:
+                self._wake.clear()
+                try:
+                    # Timeout zuerst: sonst bleibt die Event.wait()-Coroutine bei Abbruch/Fehler ungewartet liegen
+                    timeout = await self._next_due()
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    await asyncio.sleep(self.poll)
+                continue
+            await self._run(job)
+
+    async def _run(self, job: PostCallJob):
+        cid, t0 = job.conversation_id, time.perf_counter()
+        beat = asyncio.create_task(self._heartbeat(cid))
+        try:
+            payload = job.payload or {}
+
+            def _live():
+                # im selben Prozess noch vorhanden (inkl. Live-Segmenten nach dem Hangup) → aktueller als der
+                # Stand beim enqueue; nach einem Neustart bleibt der Payload
+                return (live_store.full_text(cid) or payload.get("text", ""),
+                        live_store.audio_spans(cid) or payload.get("spans", []))
+
+            raw = await collect_final_text(cid, _live)
+            anonym = (await anonymize_text(raw)).strip() if raw.strip() else ""
+            await self._complete(job, anonym)
+            self.done += 1
+            live_store.clear(cid)
+            log.info("post_call: done call_id=%s attempt=%d chars=%d in %.2fs", cid, job.attempts, len(anonym),
+                     time.perf_counter() - t0)
+        except asyncio.CancelledError:
+            # Shutdown: Job bleibt "running" und wird beim nächsten Start wieder aufgenommen
+            raise
+        except Exception as e:
+            await self._fail(job, e)
+        finally:
+            beat.cancel()
+
+    async def _complete(self, job: PostCallJob, text: str):
+        async with SessionLocal() as db:
+            async with db.begin():
+                row = await db.get(PostCallJob, job.conversation_id, with_for_update=True)
+                if row is None or row.status == "done":
+                    return
+                if text:
+                    db.add(Message(
+                        conversation_id=job.conversation_id,
+                        external_id=os.getenv("EXTERNAL_CALL_ID", "EXT_FIXED_ID"),
+                        role="user", content=text, source="transcribe", created_at=now_berlin(),
+                        meta={"mime": "text/plain", "filename": f"snapshot_{job.reason}.txt"},
+                    ))
+                row.status = "done"
+                row.result_chars = len(text)
+                row.last_error = None
+                row.updated_at = func.now()
+
+    async def _fail(self, job: PostCallJob, err: Exception):
+        cid = job.conversation_id
+        final = job.attempts >= self.max_attempts
+        delay = min(self.backoff_max, self.backoff * 2 ** (job.attempts - 1))
+        log.warning("post_call: attempt %d/%d failed call_id=%s: %s%s", job.attempts, self.max_attempts, cid, err,
+                    "" if final else f" -> retry in {delay:.1f}s")
+        try:
+            async with SessionLocal() as db:
+                await db.execute(update(PostCallJob).where(PostCallJob.conversation_id == cid).values(
+                    status="failed" if final else "pending", run_after=time.time() + delay,
+                    last_error=f"{type(err).__name__}: {err}"[:2000], updated_at=func.now()))
+                await db.commit()
+        except Exception as e:
+            log.warning("post_call: cannot record failure call_id=%s: %s", cid, e)
+        if final:
+            self.failed += 1
+            live_store.clear(cid)
+        else:
+            self.retried += 1
+
+
+post_call_queue = PostCallQueue(
+    workers=settings.POSTCALL_WORKERS,
+    max_attempts=settings.POSTCALL_MAX_ATTEMPTS,
+    backoff=settings.POSTCALL_BACKOFF_SEC,
+    backoff_max=settings.POSTCALL_BACKOFF_MAX_SEC,
+    lease=settings.POSTCALL_LEASE_SEC,
+)
@@ -0,0 +1,134 @@
+# app/services/recording.py
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from .resample import pcm_to_int16
+from .wav_writer import find_data_chunk
+
+# so viele Aufnahmen bleiben gemappt (Header geparst, Filehandle offen)
+MAX_OPEN = 16
+
+
+class Recording:
+    """
+    WAV-Aufnahme als mmap: Header wird einmal geparst, Audio kommt als Zero-Copy-View nach Zeitbereich.
+    - Länge kommt aus der Dateigröße, nicht aus dem Header → funktioniert auch auf noch wachsenden Dateien
+    - refresh() mappt neu, wenn die Datei gewachsen ist (ohne den Header neu zu lesen)
+    - Views bleiben gültig, auch wenn inzwischen neu gemappt wurde (alte Map lebt, solange Views existieren)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._f = open(path, "rb")
+        found = find_data_chunk(self._f)
+        if found is None:
+            self._f.close()
+            raise ValueError(f"not a PCM WAV file: {path}")
+        self.channels, self.sampwidth, self.rate, self.data_offset = found
+        if self.sampwidth not in (1, 2, 4) or not self.rate:
+            self._f.close()
+            raise ValueError(f"unsupported WAV format in {path}: sw={self.sampwidth} rate={self.rate}")
+        self.inode = os.fstat(self._f.fileno()).st_ino
+        self._mm: Optional[mmap.mmap] = None
+        self._size = 0
+        self.refresh()
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sampwidth
+
+    @property
+    def data_bytes(self) -> int:
+        n = max(0, self._size - self.data_offset)
+        return n - n % self.frame_size
+
+    @property
+    def frames(self) -> int:
+        return self.data_bytes // self.frame_size
+
+    @property
+    def duration_sec(self) -> float:
+        return self.frames / float(self.rate)
+
+    def refresh(self) -> "Recording":
+        size = os.fstat(self._f.fileno()).st_size
+        if size != self._size or self._mm is None:
+            self._size = size
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        return self
+
+    def _frame_at(self, sec: Optional[float], default: int) -> int:
+        if sec is None:
+            return default
+        return min(self.frames, max(0, int(round(sec * self.rate))))
+
+    def view(self, start_sec: Optional[float] = None, end_sec: Optional[float] = None) -> memoryview:
+        """Roh-PCM (Dateiformat) des Zeitbereichs als Zero-Copy-memoryview."""
+        a = self._frame_at(start_sec, 0)
+        b = max(a, self._frame_at(end_sec, self.frames))
+        if self._mm is None or a == b:
+            return memoryview(b"")
+        off = self.data_offset
+        return memoryview(self._mm)[off + a * self.frame_size: off + b * self.frame_size]
+
+    def samples(self, start_sec: Optional[float] = None, end_sec: Optional[float] = None) -> np.ndarray:
+        """Mono-int16 des Zeitbereichs; bei 16-bit-mono ohne Kopie (read-only)."""
+        v = self.view(start_sec, end_sec)
+        if self.sampwidth == 2 and self.channels == 1:
+            return np.frombuffer(v, dtype="<i2")
+        return pcm_to_int16(v, self.sampwidth, self.channels)
+
+    def last(self, sec: float) -> np.ndarray:
+        """Die letzten `sec` Sekunden."""
+        return self.samples(start_sec=max(0.0, self.duration_sec - sec))
+
+    def info(self) -> dict:
+        return {
+            "exists": True,
+            "size_bytes": self._size,
+            "frames": self.frames,
+            "samplerate": self.rate,
+            "channels": self.channels,
+            "sampwidth": self.sampwidth,
+            "duration_sec": round(self.duration_sec, 3),
+        }
+
+    def close(self):
+        mm, self._mm = self._mm, None
+        if mm is not None:
+            try:
+                mm.close()
+            except BufferError:
+                pass  # Views sind noch in Benutzung; Map geht mit der letzten View weg
+        self._f.close()
+
+
+_open: "OrderedDict[str, Recording]" = OrderedDict()
+_open_lock = threading.Lock()
+
+
+def open_recording(path: str) -> Recording:
+    """Aufnahme aus dem Cache (Header schon geparst) holen bzw. neu mappen; Größe wird aktualisiert."""
+    key = os.path.abspath(path)
+    with _open_lock:
+        rec = _open.get(key)
+        if rec is not None and rec.inode == os.stat(key).st_ino:
+            _open.move_to_end(key)
+        else:
+            rec = Recording(key)
+            _open[key] = rec
+            # verdrängte Einträge nicht schließen – evtl. liest gerade noch jemand; GC räumt auf
+            while len(_open) > MAX_OPEN:
+                _open.popitem(last=False)
+        return rec.refresh()
+
+
+def forget_recording(path: str):
+    """Aus dem Cache nehmen (z. B. nach Call-Ende oder wenn die Datei neu angelegt wird)."""
+    with _open_lock:
+        _open.pop(os.path.abspath(path), None)
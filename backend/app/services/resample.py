@@ -0,0 +1,126 @@
+# app/services/resample.py
+from math import gcd
+from typing import Iterable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Halbe Filterlänge in Eingangs-Samples; 16 → ~-80 dB Sperrdämpfung bei 8k→16k
+HALF_TAPS = 16
+KAISER_BETA = 8.6
+ROLLOFF = 0.92
+# Ausgabe-Samples pro Filterdurchlauf
+RUN_BLOCK = 16384
+
+
+def _design_polyphase(up: int, down: int, half: int) -> np.ndarray:
+    """Windowed-sinc Tiefpass (Kaiser), in `up` Phasen zerlegt → Shape (up, taps)."""
+    taps = 2 * half + 1
+    n = taps * up
+    m = np.arange(n, dtype=np.float64) - half * up
+    fc = ROLLOFF * 0.5 / max(up, down)
+    h = 2.0 * fc * np.sinc(2.0 * fc * m) * np.kaiser(n, KAISER_BETA)
+    # Verstärkung `up` kompensiert das Zero-Stuffing
+    h *= up / h.sum()
+    # hp[phase, j] = h[phase + j*up]; umgedreht, damit es direkt auf aufsteigende Fenster passt
+    return np.ascontiguousarray(h.reshape(taps, up).T[:, ::-1]).astype(np.float32)
+
+
+def pcm_to_int16(frames: bytes, sampwidth: int, channels: int = 1) -> np.ndarray:
+    """Beliebiges PCM (8/16/32 bit, n Kanäle) → mono int16."""
+    if sampwidth == 1:
+        x = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+    elif sampwidth == 2:
+        x = np.frombuffer(frames, dtype="<i2")
+    elif sampwidth == 4:
+        x = (np.frombuffer(frames, dtype="<i4") >> 16).astype(np.int16)
+    else:
+        raise ValueError(f"unsupported sampwidth {sampwidth}")
+    if channels > 1:
+        x = x[: len(x) - len(x) % channels].reshape(-1, channels).mean(axis=1).astype(np.int16)
+    return x
+
+
+class Resampler:
+    """
+    Zustandsbehafteter Polyphasen-Resampler (mono, int16) für einen Call/Stream.
+    - Filterhistorie und Phase werden über Pakete hinweg mitgeführt → keine Sprünge an Paketgrenzen
+    - process()/process_many() liefern alles, was schon berechenbar ist; flush() den Rest
+    - Gruppenlaufzeit ist kompensiert: Ausgabe ist zeitlich deckungsgleich mit der Eingabe
+    """
+
+    def __init__(self, src_rate: int, dst_rate: int, half_taps: int = HALF_TAPS):
+        g = gcd(src_rate, dst_rate)
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        self._h = _design_polyphase(self.up, self.down, half_taps)
+        self._taps = self._h.shape[1]
+        self._delay = half_taps * self.up
+        # Eingangspuffer; _buf[0] hat globalen Index _buf_start (negativ = implizite Nullen)
+        self._buf = np.zeros(self._taps - 1, dtype=np.float32)
+        self._buf_start = -(self._taps - 1)
+        self._n_in = 0
+        self._n_out = 0
+
+    def _src_index(self, n: np.ndarray) -> np.ndarray:
+        return (n * self.down + self._delay) // self.up
+
+    def _run(self, x: np.ndarray, n_end: int) -> np.ndarray:
+        if len(x):
+            self._buf = np.concatenate((self._buf, x.astype(np.float32)))
+        n = np.arange(self._n_out, n_end, dtype=np.int64)
+        if n.size == 0:
+            return np.empty(0, dtype=np.int16)
+        pos = n * self.down + self._delay
+        first = pos // self.up - self._buf_start - (self._taps - 1)
+        windows = sliding_window_view(self._buf, self._taps)
+        y = np.empty(n.size, dtype=np.float32)
+        # blockweise, damit die (n, taps)-Fenstermatrix bei langen Signalen nicht den Speicher sprengt
+        for i in range(0, n.size, RUN_BLOCK):
+            j = i + RUN_BLOCK
+            y[i:j] = np.einsum("ij,ij->i", self._h[pos[i:j] % self.up], windows[first[i:j]])
+        self._n_out = n_end
+
+        # Historie auf das kürzen, was der nächste Output noch braucht
+        keep_from = int(self._src_index(np.int64(n_end))) - (self._taps - 1)
+        drop = max(0, keep_from - self._buf_start)
+        if drop:
+            self._buf = self._buf[drop:]
+            self._buf_start += drop
+        return np.clip(np.rint(y), -32768, 32767).astype(np.int16)
+
+    def process_array(self, x: np.ndarray) -> np.ndarray:
+        self._n_in += len(x)
+        # Output n ist fertig, sobald sein letztes benötigtes Eingangs-Sample da ist
+        n_end = max(self._n_out, (self._n_in * self.up - 1 - self._delay) // self.down + 1)
+        return self._run(x, n_end)
+
+    def process(self, pcm: bytes) -> bytes:
+        if not pcm:
+            return b""
+        return self.process_array(np.frombuffer(pcm, dtype="<i2")).tobytes()
+
+    def process_many(self, packets: Iterable[bytes]) -> bytes:
+        """Mehrere Pakete (z. B. 20-ms-Frames) in einem Filterdurchlauf."""
+        return self.process(b"".join(packets))
+
+    def flush(self) -> bytes:
+        """Restliche Samples (Filter-Nachlauf mit Nullen) ausgeben; danach ist der Stream zu Ende."""
+        n_total = -(-self._n_in * self.up // self.down)
+        if n_total <= self._n_out:
+            return b""
+        need = int(self._src_index(np.int64(n_total - 1))) + 1
+        pad = max(0, need - (self._buf_start + len(self._buf)))
+        return self._run(np.zeros(pad, dtype=np.float32), n_total).tobytes()
+
+
+def resample_int16(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """Einmal-Konvertierung eines kompletten Signals."""
+    if src_rate == dst_rate:
+        return x.astype(np.int16, copy=False)
+    rs = Resampler(src_rate, dst_rate)
+    head = rs.process_array(x)
+    tail = np.frombuffer(rs.flush(), dtype=np.int16)
+    return np.concatenate((head, tail))
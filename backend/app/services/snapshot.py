@@ -1,6 +1,7 @@
 # app/services/snapshot.py
+from ..config import settings
 from ..logging import setup_logging
-from ..services.anonymize import anonymize_and_store
+from ..services.anonymize import anonymize_and_store, store_anonymized
 from ..state.live_store import live_store
 
 log = setup_logging()
@@ -11,8 +12,23 @@ async def save_snapshot(call_id: str, reason: str = "button") -> int:
     Speichert genau EINEN großen Textblock:
     - Beim ersten Mal: alles seit Callbeginn
     - Danach: nur Delta seit dem letzten Snapshot
+    - LIVE_ANONYMIZE: nur der schon im Hintergrund maskierte Spiegel (konstante Latenz); was noch
+      nicht maskiert ist, kommt mit dem nächsten Snapshot bzw. dem finalen Text
     - Gibt Anzahl gespeicherter Zeichen zurück.
     """
+    if settings.LIVE_ANONYMIZE:
+        delta, start, end, raw_end = live_store.masked_since_saved(call_id)
+        text = (delta or "").strip()
+        if not text:
+            log.info("📝 snapshot(%s): nichts zu speichern (masked delta=0)", reason)
+            return 0
+        if not await store_anonymized(text, "text/plain", f"snapshot_{reason}_{raw_end}.txt", call_id):
+            return 0
+        live_store.mark_masked_saved(call_id, end, raw_end)
+        log.info("📝 snapshot(%s): saved %d masked chars (offset %d→%d, raw %d/%d)", reason, len(text), start, end,
+                 raw_end, len(live_store.full_text(call_id)))
+        return len(text)
+
     delta, start, end = live_store.delta_since_saved(call_id)
     text = (delta or "").strip()
     if not text:
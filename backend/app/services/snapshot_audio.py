@@ -1,15 +1,15 @@
 import os
-import wave
-from io import BytesIO
 from typing import Optional
 
-import openai
-from sqlalchemy import text
+from models import LiveCall
+from sqlalchemy import select
 
 from ..config import settings
 from ..db import SessionLocal
 from ..logging import setup_logging
 from ..services.anonymize import anonymize_and_store
+from ..services.asr import pcm16_to_wav, transcribe_pcm_chunked, transcribe_wav
+from ..services.recording import open_recording
 
 log = setup_logging()
 AUDIO_DIR = getattr(settings, "AUDIO_DIR", "./audio")
@@ -17,72 +17,75 @@ MIN_SECONDS = float(getattr(settings, "FINAL_MIN_SECONDS", 1.0))
 DEFAULT_LANG = getattr(settings, "TRANSCRIBE_LANG", None) or "de"
 
 
-def _find_audio_path(call_id: str) -> Optional[str]:
+async def find_audio_path(call_id: str) -> Optional[str]:
     candidates = [getattr(settings, "AUDIO_DIR", "./audio"), "./recordings", "."]
     for base in candidates:
         p = os.path.join(base, f"{call_id}.wav")
         if os.path.exists(p) and os.path.isfile(p):
             return p
     try:
-        with SessionLocal() as db:
-            row = db.execute(
-                text("select audio_path from live_calls where conversation_id=:cid order by updated_at desc limit 1"),
-                {"cid": call_id},
-            ).first()
-            if row:
-                ap = row[0]
-                if ap and os.path.isfile(ap):
-                    return ap
-    except Exception:
-        pass
+        async with SessionLocal() as db:
+            res = await db.execute(
+                select(LiveCall.audio_path).where(LiveCall.conversation_id == call_id)
+                .order_by(LiveCall.updated_at.desc()).limit(1))
+            ap = res.scalar()
+            if ap and os.path.isfile(ap):
+                return ap
+    except Exception as e:
+        log.warning("snapshot_audio: audio_path lookup failed call_id=%s: %s", call_id, e)
     return None
 
 
-async def save_snapshot_from_audio(call_id: str, reason: str = "hangup") -> int:
-    path = _find_audio_path(call_id)
+async def store_final_text(call_id: str, raw_text: str, reason: str) -> int:
+    """Finalen Call-Text EINMAL anonymisieren und als EINEN Block speichern → Zeichen des Rohtexts."""
+    await anonymize_and_store(raw_text, "text/plain", f"snapshot_{reason}.txt", call_id)
+    return len(raw_text)
+
+
+async def transcribe_recording(call_id: str, path: Optional[str] = None) -> str:
+    """
+    Komplette Aufnahme transkribieren → Rohtext ("" ohne/zu kurze/kaputte Datei).
+    ASR-Fehler werden durchgereicht (Post-Call-Job wiederholt dann).
+    """
+    path = path or await find_audio_path(call_id)
     if not path:
         log.info("snapshot_audio: no audio file for call_id=%s", call_id)
-        return 0
+        return ""
     try:
-        with open(path, "rb") as f:
-            wav_bytes = f.read()
-        with wave.open(BytesIO(wav_bytes), "rb") as r:
-            frames = r.getnframes()
-            rate = r.getframerate()
-            duration = frames / float(rate or 1)
-            log.info("snapshot_audio: path_ok call_id=%s frames=%d rate=%d duration=%.3fs", call_id, frames, rate,
-                     duration)
-            if duration < MIN_SECONDS:
-                log.info("snapshot_audio: too short (%.2fs) -> skip", duration)
-                return 0
+        rec = open_recording(path)
+        frames, rate, duration = rec.frames, rec.rate, rec.duration_sec
+        log.info("snapshot_audio: path_ok call_id=%s frames=%d rate=%d duration=%.3fs", call_id, frames, rate,
+                 duration)
+        if duration < MIN_SECONDS:
+            log.info("snapshot_audio: too short (%.2fs) -> skip", duration)
+            return ""
+        # Zero-Copy-View auf die gemappte Datei; kopiert wird erst pro ASR-Stück
+        pcm = rec.samples()
     except Exception as e:
         log.warning("snapshot_audio: invalid wav for %s: %s", call_id, e)
-        return 0
+        return ""
+    # lange Calls: in Stücke an Sprechpausen schneiden und parallel transkribieren
+    chunked = settings.SNAPSHOT_CHUNKED and duration > settings.SNAPSHOT_CHUNK_MAX_SEC
+    log.info("snapshot_audio: transcribe start call_id=%s model=%s lang=%s chunked=%s", call_id,
+             settings.TRANSCRIBE_MODEL, DEFAULT_LANG, chunked)
+    if chunked:
+        raw_text = await transcribe_pcm_chunked(
+            pcm, rate, settings.SNAPSHOT_CHUNK_MAX_SEC, settings.SNAPSHOT_ASR_CONCURRENCY, label=call_id)
+    else:
+        raw_text = await transcribe_wav(pcm16_to_wav(pcm, rate), filename="full.wav", language=DEFAULT_LANG,
+                                        timeout=max(settings.ASR_TIMEOUT, duration))
+    log.info("snapshot_audio: transcribe done call_id=%s chars=%d", call_id, len(raw_text))
+    return raw_text
+
+
+async def save_snapshot_from_audio(call_id: str, reason: str = "hangup", path: Optional[str] = None) -> int:
+    """Komplette Aufnahme neu transkribieren und speichern."""
     try:
-        bio = BytesIO(wav_bytes)
-        bio.seek(0)
-        log.info("snapshot_audio: transcribe start call_id=%s model=%s lang=%s", call_id, settings.TRANSCRIBE_MODEL,
-                 DEFAULT_LANG)
-        tr = openai.audio.transcriptions.create(
-            file=("full.wav", bio, "audio/wav"),
-            model=settings.TRANSCRIBE_MODEL,
-            language=DEFAULT_LANG,
-        )
-        raw_text = (getattr(tr, "text", "") or "").strip()
-        log.info("snapshot_audio: transcribe done call_id=%s chars=%d", call_id, len(raw_text))
+        raw_text = await transcribe_recording(call_id, path)
         if not raw_text:
             log.info("snapshot_audio: no text -> skip store")
             return 0
-        try:
-            from ..agents import runner, database_agent
-            da_out = await runner.run(database_agent, [{"role": "user", "content": raw_text}])
-            anonym = (getattr(da_out, "final_output", "") or "").strip()
-        except Exception as e:
-            log.warning("snapshot_audio: anonymize failed, using raw: %s", e)
-            anonym = ""
-        final_text = anonym if (len(anonym) >= max(12, len(raw_text) // 2)) else raw_text
-        await anonymize_and_store(final_text, "text/plain", f"snapshot_{reason}.txt", call_id)
-        return len(final_text)
+        return await store_final_text(call_id, raw_text, reason)
     except Exception as e:
         log.exception("snapshot_audio: transcribe/store failed: %s", e)
         return 0
@@ -0,0 +1,84 @@
+# app/services/stitch.py
+import re
+from typing import List, Tuple
+
+# Satzzeichen am Wortrand ignorieren, Groß/klein egal
+_EDGE_PUNCT = re.compile(r"^[^\w]+|[^\w]+$", re.UNICODE)
+# einzelne sehr kurze Wörter („ja“, „und“) allein reichen nicht als Überlappungsbeweis
+MIN_SINGLE_TOKEN_CHARS = 5
+
+
+def _norm(tok: str) -> str:
+    return _EDGE_PUNCT.sub("", tok).lower()
+
+
+def tokenize(text: str) -> List[Tuple[str, str]]:
+    """→ [(normalisiert, original)], leere Normalformen (reine Satzzeichen) fallen weg."""
+    out = []
+    for raw in (text or "").split():
+        n = _norm(raw)
+        if n:
+            out.append((n, raw))
+    return out
+
+
+def find_overlap(left: List[str], right: List[str], max_tokens: int = 12, edge_slack: int = 1) -> Tuple[int, int, int]:
+    """
+    Längster Suffix(left) == Präfix(right) auf Token-Ebene.
+    An den Fensterkanten darf je `edge_slack` Token abweichen (angeschnittene Wörter).
+    → (drop_left, skip_right, k): left ohne letzte drop_left Tokens + right ab skip_right + k.
+    """
+    best = (0, 0, 0)
+    for a in range(edge_slack + 1):
+        lt = left[: len(left) - a] if a else left
+        for b in range(edge_slack + 1):
+            rt = right[b:]
+            k_max = min(len(lt), len(rt), max_tokens)
+            for k in range(k_max, best[2], -1):
+                if lt[len(lt) - k:] == rt[:k]:
+                    if k == 1 and len(rt[0]) < MIN_SINGLE_TOKEN_CHARS:
+                        break
+                    best = (a, b, k)
+                    break
+    return best
+
+
+def merge_texts(left: str, right: str, max_tokens: int = 12) -> str:
+    """Zwei überlappende Hypothesen zu einem Text ohne Dubletten zusammenfügen."""
+    lt, rt = tokenize(left), tokenize(right)
+    a, b, k = find_overlap([t[0] for t in lt], [t[0] for t in rt], max_tokens)
+    if k == 0:
+        return " ".join(x for x in (left.strip(), right.strip()) if x)
+    keep = [t[1] for t in (lt[: len(lt) - a] if a else lt)]
+    return " ".join(keep + [t[1] for t in rt[b + k:]])
+
+
+class TranscriptStitcher:
+    """
+    Fügt Fenster-Transkripte (in Reihenfolge) zusammen, deren Audio sich leicht überlappt.
+    add() gibt nur den wirklich neuen Text zurück; der bisher ausgegebene Text wird nie umgeschrieben,
+    daher bleibt ein links angeschnittenes letztes Wort stehen und sein Gegenstück rechts entfällt.
+    """
+
+    def __init__(self, max_overlap_tokens: int = 12):
+        self.max_overlap_tokens = max_overlap_tokens
+        self._tail: List[str] = []
+        self.parts: List[str] = []
+        self.dup_tokens = 0
+
+    def add(self, text: str, overlap: bool = True) -> str:
+        """overlap=False: Fenster teilt kein Audio mit dem vorigen → nichts abgleichen (echte Wiederholungen bleiben)."""
+        rt = tokenize(text)
+        if not rt:
+            return ""
+        a, b, k = find_overlap(self._tail, [t[0] for t in rt], self.max_overlap_tokens) if overlap else (0, 0, 0)
+        new = rt[b + k + a:] if k else rt
+        self.dup_tokens += len(rt) - len(new)
+        self._tail = (self._tail + [t[0] for t in new])[-2 * self.max_overlap_tokens:]
+        out = " ".join(t[1] for t in new)
+        if out:
+            self.parts.append(out)
+        return out
+
+    def text(self) -> str:
+        return " ".join(self.parts)
@@ -0,0 +1,115 @@
+# app/services/suggestion_cache.py
+import asyncio
+import hashlib
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+
+# Satzzeichen/Mehrfach-Leerzeichen ignorieren: "Ich habe keine Zeit!" == "ich habe  keine zeit"
+_PUNCT = re.compile(r"[^\w\s]+", re.UNICODE)
+_WS = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WS.sub(" ", _PUNCT.sub(" ", (text or "").lower())).strip()
+
+
+class SuggestionCache:
+    """
+    Antwort-Cache vor den Analyse-Agenten.
+    - Schlüssel = Agent-Name + Hash der normalisierten letzten `tail_chars` Zeichen der Nachrichten
+      (System-Nachrichten wie das Tagesdatum zählen nicht mit)
+    - TTL + LRU; gleichzeitige Anfragen mit demselben Schlüssel teilen sich einen Agent-Lauf
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 600.0, tail_chars: int = 600):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.tail_chars = tail_chars
+        self._items: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Zähler
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.expired = 0
+
+    def key(self, agent_name: str, messages: List[Dict[str, str]]) -> str:
+        text = " ".join(str(m.get("content", "")) for m in messages if m.get("role") != "system")
+        tail = normalize(text)[-self.tail_chars:]
+        return f"{agent_name}:{hashlib.sha1(tail.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        if time.monotonic() - item[0] > self.ttl:
+            del self._items[key]
+            self.expired += 1
+            return None
+        self._items.move_to_end(key)
+        return item[1]
+
+    def put(self, key: str, value: Any):
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """get() mit Treffer-Zählung (für Aufrufer, die selbst streamen)."""
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def get_or_run(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """→ (Wert, aus Cache?). Fehler werden nicht gecacht."""
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value, True
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self.joined += 1
+            return await asyncio.shield(fut), True
+        self.misses += 1
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value = await fn()
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # Wartende bekommen den Fehler; ohne sie nicht als "never retrieved" loggen
+            raise
+        except BaseException:
+            fut.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.put(key, value)
+        fut.set_result(value)
+        return value, False
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "joined": self.joined,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+suggestion_cache = SuggestionCache(
+    max_entries=settings.SUGGEST_CACHE_MAX_ENTRIES,
+    ttl=settings.SUGGEST_CACHE_TTL_SEC,
+    tail_chars=settings.SUGGEST_CACHE_TAIL_CHARS,
+)
@@ -0,0 +1,26 @@
+# app/services/transcribe.py
+from .asr import ASR_RATE, transcribe_wav
+from .asr_scheduler import PRIORITY_LIVE
+from .ingest import AudioIngest
+
+# darunter liefert die ASR eher Halluzinationen als Text
+MIN_ASR_SAMPLES = int(0.8 * ASR_RATE)
+
+
+def too_short(ing: AudioIngest) -> bool:
+    return ing.samples + 2 * ing.pad < MIN_ASR_SAMPLES
+
+
+async def transcribe_ingest(ing: AudioIngest, priority: int = PRIORITY_LIVE) -> str:
+    """Fertig gefütterten AudioIngest transkribieren (Logik von /transcribe); zu kurz → ""."""
+    wav_bytes = ing.finish()
+    if too_short(ing):
+        return ""
+    return await transcribe_wav(wav_bytes, filename="chunk.wav", priority=priority)
+
+
+async def transcribe_pcm(pcm: bytes, rate: int = 8000, priority: int = PRIORITY_LIVE) -> str:
+    """PCM16 LE mono (z. B. ein VAD-Segment) im Prozess transkribieren, ohne HTTP-Umweg über /transcribe."""
+    ing = AudioIngest("l16", rate=rate, size_hint=len(pcm))
+    ing.feed(pcm)
+    return await transcribe_ingest(ing, priority)
@@ -0,0 +1,238 @@
+# app/services/vad.py
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+
+from ..config import settings
+
+# Energie-Schwelle relativ zum geschätzten Rauschboden, plus absolute Untergrenze
+SPEECH_MARGIN_DB = 9.0
+ABS_FLOOR_DBFS = -50.0
+# Sprache hat (anders als Rauschen/Zischen) eine moderate Nulldurchgangsrate
+MAX_SPEECH_ZCR = 0.45
+LOUD_MARGIN_DB = 20.0
+
+
+def frame_energy(x: np.ndarray, flen: int, block_frames: int = 4096) -> np.ndarray:
+    """Mittlere Energie je Frame; blockweise, damit lange (gemappte) Aufnahmen nicht komplett als float anfallen."""
+    nf = len(x) // flen
+    energy = np.empty(nf, dtype=np.float32)
+    for i in range(0, nf, block_frames):
+        j = min(nf, i + block_frames)
+        fx = x[i * flen: j * flen].reshape(j - i, flen).astype(np.float32)
+        energy[i:j] = np.mean(fx * fx, axis=1)
+    return energy
+
+
+def silence_cut_points(x: np.ndarray, rate: int, max_sec: float, min_sec: float = 0.0,
+                       frame_ms: int = 20) -> List[int]:
+    """
+    Schnittpunkte (Samples) für lange Aufnahmen: jedes Stück ist höchstens `max_sec` lang und wird
+    in der spätesten Pause der zweiten Fensterhälfte geschnitten (i. d. R. eine Sprechpause).
+    → [0, c1, c2, ..., len(x)]
+    """
+    n = len(x)
+    max_len = int(max_sec * rate)
+    if n <= max_len:
+        return [0, n]
+    flen = rate * frame_ms // 1000
+    energy = frame_energy(x, flen)
+    nf = len(energy)
+    min_len = max(int(min_sec * rate), max_len // 2)
+    cuts = [0]
+    while n - cuts[-1] > max_len:
+        lo = (cuts[-1] + min_len) // flen
+        hi = min(nf, (cuts[-1] + max_len) // flen)
+        if hi <= lo:
+            cuts.append(cuts[-1] + max_len)
+            continue
+        # unter den fast-leisesten Frames den spätesten nehmen → möglichst lange Stücke
+        win = energy[lo:hi]
+        quiet = np.flatnonzero(win <= 2.0 * win.min() + 1.0)
+        cuts.append(int((lo + int(quiet[-1])) * flen + flen // 2))
+    cuts.append(n)
+    return cuts
+
+
+def last_pause(x: np.ndarray, rate: int, min_keep_sec: float = 0.0, frame_ms: int = 20,
+               search_sec: float = 10.0) -> int:
+    """
+    Position (Sample) der letzten Sprechpause in den letzten `search_sec` von x, aber nicht vor min_keep_sec.
+    0, wenn es keine erkennbare Pause gibt.
+    """
+    flen = rate * frame_ms // 1000
+    lo = max(int(min_keep_sec * rate), len(x) - int(search_sec * rate), 0) // flen
+    nf = len(x) // flen
+    if nf - lo < 3:
+        return 0
+    energy = frame_energy(x[lo * flen: nf * flen], flen)
+    # ohne klaren Pegelunterschied (durchgehend Sprache/Stille) keine Pause behaupten
+    if energy.max() < 10.0 * (energy.min() + 1.0):
+        return 0
+    quiet = np.flatnonzero(energy <= 2.0 * energy.min() + 1.0)
+    return int((lo + int(quiet[-1])) * flen + flen // 2)
+
+
+class SpeechSegment(NamedTuple):
+    start_sample: int  # absolute Position im Stream (Samples)
+    pcm: bytes  # PCM16 mono
+    rate: int
+    overlap_samples: int = 0  # >0 nur nach hartem Schnitt: so viel Audio teilt das Segment mit dem vorigen
+
+    @property
+    def start_sec(self) -> float:
+        return self.start_sample / float(self.rate)
+
+    @property
+    def duration_sec(self) -> float:
+        return len(self.pcm) / (2.0 * self.rate)
+
+    @property
+    def end_sec(self) -> float:
+        return self.start_sec + self.duration_sec
+
+
+class VadSegmenter:
+    """
+    Frame-basierte Voice Activity Detection (Energie + Nulldurchgänge) mit Hangover.
+    - feed() nimmt beliebig große PCM16-Stücke, liefert abgeschlossene Sprachsegmente
+    - Segment endet nach `hangover_ms` Stille oder spätestens nach `max_segment_ms`;
+      nach so einem harten Schnitt beginnt das nächste Segment mit `overlap_ms` des vorigen
+      (Wörter an der Schnittkante gehen nicht verloren, Dubletten entfernt der TranscriptStitcher)
+    - Segmente mit weniger als `min_speech_ms` Sprache (Klicks, Atmer) werden verworfen
+    - Rauschboden adaptiv: fällt sofort, steigt in Stille langsam
+    """
+
+    def __init__(
+            self,
+            rate: int = 8000,
+            frame_ms: int = 20,
+            hangover_ms: int = 400,
+            min_speech_ms: int = 250,
+            max_segment_ms: int = 15000,
+            pre_roll_ms: int = 200,
+            overlap_ms: int = 1000,
+    ):
+        self.rate = rate
+        self.frame_len = rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+        self.pre_roll_frames = pre_roll_ms // frame_ms
+        self.overlap_frames = overlap_ms // frame_ms
+        self._noise_db = ABS_FLOOR_DBFS
+        self._pending = np.empty(0, dtype=np.int16)
+        self._pos = 0  # absolute Sample-Position des nächsten Frames
+        self._pre: List[np.ndarray] = []
+        self._seg: List[np.ndarray] = []
+        self._seg_start = 0
+        self._overlap_end = 0  # Ende des letzten hart geschnittenen Segments (absolute Samples)
+        self._voiced = 0
+        self._silent_run = 0
+        # Zähler
+        self.frames_total = 0
+        self.frames_speech = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._seg)
+
+    def _classify(self, frames: np.ndarray) -> np.ndarray:
+        x = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(x * x, axis=1)) + 1e-3
+        db = 20.0 * np.log10(rms / 32768.0)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frames.shape[1])
+        out = np.empty(len(frames), dtype=bool)
+        for i in range(len(frames)):
+            thr = max(self._noise_db + SPEECH_MARGIN_DB, ABS_FLOOR_DBFS)
+            loud = db[i] > self._noise_db + LOUD_MARGIN_DB
+            speech = db[i] > thr and (zcr[i] < MAX_SPEECH_ZCR or loud)
+            out[i] = speech
+            if db[i] < self._noise_db:
+                self._noise_db = float(db[i])
+            elif not speech:
+                self._noise_db += 0.05 * (float(db[i]) - self._noise_db)
+        return out
+
+    def feed(self, pcm) -> List[SpeechSegment]:
+        x = np.frombuffer(pcm, dtype="<i2") if not isinstance(pcm, np.ndarray) else pcm
+        # concatenate kopiert immer → keine Views auf Puffer des Aufrufers
+        x = np.concatenate((self._pending, x))
+        n = len(x) // self.frame_len
+        self._pending = x[n * self.frame_len:].copy()
+        if n == 0:
+            return []
+        frames = x[: n * self.frame_len].reshape(n, self.frame_len)
+        out: List[SpeechSegment] = []
+        for frame, speech in zip(frames, self._classify(frames)):
+            seg = self._step(frame, bool(speech))
+            if seg is not None:
+                out.append(seg)
+        return out
+
+    def _step(self, frame: np.ndarray, speech: bool) -> Optional[SpeechSegment]:
+        self.frames_total += 1
+        pos = self._pos
+        self._pos += len(frame)
+        if speech:
+            self.frames_speech += 1
+
+        if not self._seg:
+            if speech:
+                self._seg = self._pre + [frame]
+                self._seg_start = pos - sum(len(f) for f in self._pre)
+                self._pre = []
+                self._voiced = 1
+                self._silent_run = 0
+            else:
+                self._pre.append(frame)
+                if len(self._pre) > self.pre_roll_frames:
+                    self._pre.pop(0)
+            return None
+
+        self._seg.append(frame)
+        if speech:
+            self._voiced += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+        if self._silent_run >= self.hangover_frames:
+            return self._close()
+        if len(self._seg) >= self.max_segment_frames:
+            return self._close(forced=True)
+        return None
+
+    def _close(self, forced: bool = False) -> Optional[SpeechSegment]:
+        seg, start, voiced = self._seg, self._seg_start, self._voiced
+        self._seg, self._voiced, self._silent_run = [], 0, 0
+        # Überlappung nur mit einem hart geschnittenen Vorgänger; an Stille geschnittene Segmente teilen kein Audio
+        overlap = max(0, self._overlap_end - start)
+        if forced and self.overlap_frames:
+            # Ende des Segments wird Vorlauf des nächsten
+            self._pre = seg[-self.overlap_frames:]
+            self._overlap_end = start + sum(len(f) for f in seg)
+        if voiced < self.min_speech_frames:
+            return None
+        return SpeechSegment(start, np.concatenate(seg).tobytes(), self.rate, overlap)
+
+    def flush(self) -> List[SpeechSegment]:
+        """Stream-Ende: offenes Segment (inkl. Rest-Samples) abschließen."""
+        if self._pending.size and self._seg:
+            self._seg.append(self._pending)
+            self._pos += len(self._pending)
+        self._pending = np.empty(0, dtype=np.int16)
+        if not self._seg:
+            return []
+        seg = self._close()
+        return [seg] if seg is not None else []
+
+
+def vad_from_settings(rate: int = 8000) -> VadSegmenter:
+    return VadSegmenter(
+        rate=rate,
+        hangover_ms=settings.VAD_HANGOVER_MS,
+        min_speech_ms=settings.VAD_MIN_SPEECH_MS,
+        max_segment_ms=int(settings.VAD_MAX_SEGMENT_SEC * 1000),
+    )
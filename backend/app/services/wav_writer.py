@@ -0,0 +1,150 @@
+# app/services/wav_writer.py
+import os
+import struct
+import threading
+import time
+from typing import Optional
+
+HEADER_SIZE = 44
+# Header alle ~1 s Audio (8 kHz, 16 bit) bzw. spätestens alle 2 s neu patchen
+PATCH_EVERY_BYTES = 16000
+PATCH_EVERY_SEC = 2.0
+
+
+def wav_header(data_bytes: int, rate: int, channels: int = 1, sampwidth: int = 2) -> bytes:
+    """Kanonischer 44-Byte PCM-Header (RIFF/WAVE/fmt/data)."""
+    block_align = channels * sampwidth
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, rate, rate * block_align, block_align, sampwidth * 8,
+        b"data", data_bytes,
+    )
+
+
+def find_data_chunk(f) -> Optional[tuple]:
+    """Läuft die RIFF-Chunks ab → (channels, sampwidth, rate, data_offset) oder None."""
+    f.seek(0)
+    riff = f.read(12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        return None
+    fmt = None
+    while True:
+        hdr = f.read(8)
+        if len(hdr) < 8:
+            return None
+        cid, size = struct.unpack("<4sI", hdr)
+        if cid == b"fmt ":
+            body = f.read(size + (size & 1))
+            _, ch, rate, _, _, bits = struct.unpack("<HHIIHH", body[:16])
+            fmt = (ch, bits // 8, rate)
+        elif cid == b"data":
+            if fmt is None:
+                return None
+            return fmt + (f.tell(),)
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+class StreamingWavWriter:
+    """
+    Hält die WAV-Datei eines Calls offen und hängt PCM roh an (O(Chunk) statt O(Datei)).
+    - RIFF-/data-Größen werden periodisch und beim close() in place gepatcht
+    - existiert die Datei schon (z. B. nach Restart), wird am Ende weitergeschrieben
+    - frames/duration kommen aus den Zählern, nicht aus erneutem Öffnen der Datei
+    """
+
+    def __init__(self, path: str, rate: int = 8000, channels: int = 1, sampwidth: int = 2):
+        self.path = path
+        self.rate = rate
+        self.channels = channels
+        self.sampwidth = sampwidth
+        self._lock = threading.Lock()
+        self._data_offset = HEADER_SIZE
+        self.data_bytes = 0
+        self._patched_bytes = 0
+        self._patched_at = time.monotonic()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self._f = open(path, "r+b")
+            found = find_data_chunk(self._f)
+            if found is None:
+                self._f.close()
+                raise ValueError(f"Unexpected WAV format in {path}")
+            ch, sw, sr, self._data_offset = found
+            if (ch, sw, sr) != (channels, sampwidth, rate):
+                self._f.close()
+                raise ValueError(f"Unexpected WAV format in {path}: ch={ch} sw={sw} rate={sr}")
+            # Nicht den Header-Werten trauen (evtl. nie gepatcht) – Dateigröße zählt
+            self._f.seek(0, os.SEEK_END)
+            size = self._f.tell() - self._data_offset
+            self.data_bytes = size - (size % self.frame_size)
+            self._f.seek(self._data_offset + self.data_bytes)
+            self._f.truncate()
+            self._patch()
+        else:
+            self._f = open(path, "wb")
+            self._f.write(wav_header(0, rate, channels, sampwidth))
+
+    @property
+    def frame_size(self) -> int:
+        return self.channels * self.sampwidth
+
+    @property
+    def frames(self) -> int:
+        return self.data_bytes // self.frame_size
+
+    @property
+    def duration_sec(self) -> float:
+        return self.frames / float(self.rate or 1)
+
+    @property
+    def closed(self) -> bool:
+        return self._f.closed
+
+    def append(self, pcm: bytes) -> int:
+        if not pcm:
+            return 0
+        with self._lock:
+            self._f.write(pcm)
+            self.data_bytes += len(pcm)
+            if (self.data_bytes - self._patched_bytes >= PATCH_EVERY_BYTES
+                    or time.monotonic() - self._patched_at >= PATCH_EVERY_SEC):
+                self._patch()
+        return len(pcm)
+
+    def _patch(self):
+        # nur die beiden Größenfelder überschreiben, danach wieder ans Ende
+        self._f.seek(4)
+        self._f.write(struct.pack("<I", self._data_offset - 8 + self.data_bytes))
+        self._f.seek(self._data_offset - 4)
+        self._f.write(struct.pack("<I", self.data_bytes))
+        self._f.seek(0, os.SEEK_END)
+        self._f.flush()
+        self._patched_bytes = self.data_bytes
+        self._patched_at = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            if not self._f.closed:
+                self._patch()
+
+    def info(self) -> dict:
+        return {
+            "exists": True,
+            "size_bytes": self._data_offset + self.data_bytes,
+            "frames": self.frames,
+            "samplerate": self.rate,
+            "channels": self.channels,
+            "sampwidth": self.sampwidth,
+            "duration_sec": round(self.duration_sec, 3),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._f.closed:
+                return
+            try:
+                self._patch()
+            finally:
+                self._f.close()
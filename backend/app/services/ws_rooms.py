@@ -0,0 +1,32 @@
+# app/services/ws_rooms.py
+import json
+from typing import Dict, Set
+
+from fastapi import WebSocket
+
+# /ws/client-Verbindungen pro Call; Router melden an/ab, Services pushen per broadcast()
+_rooms: Dict[str, Set[WebSocket]] = {}
+
+
+def join(call_id: str, ws: WebSocket) -> None:
+    _rooms.setdefault(call_id, set()).add(ws)
+
+
+def leave(call_id: str, ws: WebSocket) -> None:
+    conns = _rooms.get(call_id)
+    if conns is None:
+        return
+    conns.discard(ws)
+    if not conns:
+        _rooms.pop(call_id, None)
+
+
+async def broadcast(call_id: str, payload: dict):
+    dead = []
+    for w in list(_rooms.get(call_id, ())):
+        try:
+            await w.send_text(json.dumps(payload))
+        except Exception:
+            dead.append(w)
+    for w in dead:
+        leave(call_id, w)
@@ -4,7 +4,7 @@ import json
 import os
 import tempfile
 import time
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from ..config import settings
 
@@ -47,6 +47,10 @@ class _LiveStore:
     - In-Memory Buffer hält den aktuellen Transkript-String pro Call.
     - Auf jede Änderung wird die JSON-Datei <call_id>.json EINZEILIG überschrieben.
     - saved_offset wird mitgeführt, damit Snapshots Deltas speichern können.
+    - Live-Segmente können ihre Audio-Zeit mitgeben (audio_spans), damit man später weiß,
+      welcher Teil der Aufnahme schon transkribiert ist.
+    - Anonymisierter Spiegel (masked): wird im Hintergrund segmentweise nachgezogen, mit eigenen
+      Offsets (masked_saved) und dem Roh-Offset, bis zu dem er reicht (masked_raw_end).
     """
 
     def __init__(self):
@@ -54,6 +58,14 @@ class _LiveStore:
         self._locks: Dict[str, asyncio.Lock] = {}
         self._ext: Dict[str, str] = {}
         self._saved_offset: Dict[str, int] = {}
+        # pro Call: [start_sec, end_sec, char_start, char_end] je Segment
+        self._spans: Dict[str, List[List[float]]] = {}
+        # anonymisierter Spiegel: Text, abgedeckter Roh-Offset, gespeicherter Spiegel-Offset
+        self._masked: Dict[str, str] = {}
+        self._masked_raw_end: Dict[str, int] = {}
+        self._masked_saved: Dict[str, int] = {}
+        # werden nach jedem add_text mit (call_id, neue Textlänge) aufgerufen
+        self._listeners: List[Callable[[str, int], None]] = []
         if _PERSIST:
             _ensure_dir(_LIVE_DIR)
 
@@ -116,30 +128,78 @@ class _LiveStore:
                 "created_at": created_at,
                 "updated_at": now,
                 "saved_offset": saved_offset,
+                "audio_spans": self._spans.get(call_id) or row.get("audio_spans") or [],
             }
             _atomic_write_json(path, data)
 
     # -------- Public API --------
 
+    def add_listener(self, fn: Callable[[str, int], None]):
+        if fn not in self._listeners:
+            self._listeners.append(fn)
+
     async def set_ext_id(self, call_id: str, ext_id: str):
         self._ext[call_id] = ext_id
         # initiale Zeile (ohne Segment-Erhöhung)
         await self._write_one_row(call_id, ext_id, inc_segment=0)
 
-    def add_text(self, call_id: str, text: str):
-        """Append in Memory, dann EINZEILIG überschreiben (segments +1)."""
+    def add_text(self, call_id: str, text: str, span: Optional[Tuple[float, float]] = None):
+        """Append in Memory, dann EINZEILIG überschreiben (segments +1). span = (start_sec, end_sec) im Audio."""
         if not text:
             return
         buf = self._buf.get(call_id, "")
         self._buf[call_id] = (buf + (" " if buf else "") + text).strip()
+        if span is not None:
+            end = len(self._buf[call_id])
+            self._spans.setdefault(call_id, []).append(
+                [round(float(span[0]), 3), round(float(span[1]), 3), end - len(text.strip()), end])
         asyncio.create_task(self._write_one_row(call_id, self._ext.get(call_id), inc_segment=1))
+        for fn in self._listeners:
+            try:
+                fn(call_id, len(self._buf[call_id]))
+            except Exception:
+                pass
 
     def full_text(self, call_id: str) -> str:
         return self._buf.get(call_id, "")
 
+    def audio_spans(self, call_id: str) -> List[List[float]]:
+        """Bereits live transkribierte Audio-Abschnitte: [start_sec, end_sec, char_start, char_end]."""
+        return list(self._spans.get(call_id, []))
+
+    # -------- Anonymisierter Spiegel --------
+
+    def append_masked(self, call_id: str, masked: str, raw_end: int):
+        """Maskierten Text für Roh-Text bis raw_end anhängen (gleiche Verkettung wie add_text)."""
+        masked = (masked or "").strip()
+        if masked:
+            buf = self._masked.get(call_id, "")
+            self._masked[call_id] = buf + (" " if buf else "") + masked
+        self._masked_raw_end[call_id] = int(raw_end)
+
+    def masked_raw_end(self, call_id: str) -> int:
+        return self._masked_raw_end.get(call_id, 0)
+
+    def masked_text(self, call_id: str) -> str:
+        return self._masked.get(call_id, "")
+
+    def masked_since_saved(self, call_id: str) -> Tuple[str, int, int, int]:
+        """(maskiertes Delta, Spiegel-Start, Spiegel-Ende, abgedeckter Roh-Offset) seit dem letzten Snapshot."""
+        full = self._masked.get(call_id, "")
+        start = min(self._masked_saved.get(call_id, 0), len(full))
+        return full[start:], start, len(full), self.masked_raw_end(call_id)
+
+    def mark_masked_saved(self, call_id: str, masked_end: int, raw_end: int):
+        """Spiegel-Offset setzen und den Roh-saved_offset auf den abgedeckten Roh-Text nachziehen."""
+        self._masked_saved[call_id] = int(masked_end)
+        self.mark_saved(call_id, raw_end)
+
     async def replace_text(self, call_id: str, new_text: str):
-        """Hard-Set Text und überschreiben (segments nicht erhöhen)."""
+        """Hard-Set Text und überschreiben (segments nicht erhöhen). Der Spiegel wird neu aufgebaut."""
         self._buf[call_id] = (new_text or "").strip()
+        self._masked.pop(call_id, None)
+        self._masked_raw_end.pop(call_id, None)
+        self._masked_saved.pop(call_id, None)
         await self._write_one_row(call_id, self._ext.get(call_id), inc_segment=0, overwrite_text=self._buf[call_id])
 
     def delta_since_saved(self, call_id: str) -> Tuple[str, int, int]:
@@ -179,6 +239,10 @@ class _LiveStore:
         self._buf.pop(call_id, None)
         self._ext.pop(call_id, None)
         self._saved_offset.pop(call_id, None)
+        self._spans.pop(call_id, None)
+        self._masked.pop(call_id, None)
+        self._masked_raw_end.pop(call_id, None)
+        self._masked_saved.pop(call_id, None)
 
     async def mark_ended(self, call_id: str):
         """Nur updated_at anfassen und EINZEILIG schreiben (touch)."""
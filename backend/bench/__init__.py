@@ -0,0 +1,17 @@
+# bench/__init__.py
+# Benchmarks laufen offline: Pflicht-Settings mit Dummy-Werten vorbelegen,
+# damit `app` importierbar ist (aus backend/: python -m bench.<name>).
+import os
+import tempfile
+
+for _k, _v in {
+    "OPENAI_API_KEY": "bench",
+    "TELNYX_API_KEY": "bench",
+    "WS_BASE": "wss://localhost",
+    "PUBLIC_BASE": "http://localhost:8000",
+    "EXTERNAL_CALL_ID": "bench",
+    "AUDIO_DIR": os.path.join(tempfile.gettempdir(), "closepulse-bench-audio"),
+    # live_store-Dateien nicht ins Arbeitsverzeichnis schreiben
+    "LIVE_DIR": os.path.join(tempfile.gettempdir(), "closepulse-bench-live"),
+}.items():
+    os.environ.setdefault(_k, _v)
@@ -0,0 +1,73 @@
+# bench/analysis_scheduler.py
+"""
+Analyse-Aufrufe pro Call: ein analyze_fast pro Transkript-Chunk (alt) gegen AnalysisScheduler
+(entprellt, single-flight). Das LLM ist durch eine Attrappe mit fester Latenz ersetzt.
+Geprüft wird auch, dass nie ein älterer Stand nach einem neueren veröffentlicht wird.
+
+    python -m bench.analysis_scheduler [--minutes 2 --chunk-every 0.8 --llm-latency 1.2]
+"""
+import argparse
+import asyncio
+
+from app.services import analysis_scheduler as mod
+from app.services.analysis_scheduler import AnalysisScheduler
+
+
+async def _run(args):
+    latency = args.llm_latency
+    calls = 0
+
+    async def fake_stream(payload, call_id=None, timeout=12.0, local_first=True):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(latency)
+        yield {"type": "suggestion", "index": 0, "text": "…"}
+        yield {"type": "done", "suggestions": ["…"], "trafficLight": {"response": "yellow"}}
+
+    mod.stream_analyze_fast = fake_stream
+    sched = AnalysisScheduler(debounce=args.debounce, max_delay=args.max_delay, min_new_chars=20)
+    text = {"v": ""}
+    published = []
+
+    async def publish(cid, ev):
+        if ev["type"] == "done":
+            published.append(ev["offset"])
+
+    sched.register("c", get_text=lambda: text["v"], publish=publish)
+    n_chunks = int(args.minutes * 60 / args.chunk_every)
+    button_lat = []
+    for i in range(n_chunks):
+        await asyncio.sleep(args.chunk_every)
+        text["v"] += f" Satz {i} mit ein paar Worten."
+        sched.trigger("c")
+        if i % 25 == 24:  # ab und zu drückt der Agent den Button
+            t0 = asyncio.get_running_loop().time()
+            res = await sched.request("c")
+            assert res["offset"] >= len(text["v"]) - 40
+            button_lat.append(asyncio.get_running_loop().time() - t0)
+    await asyncio.sleep(args.max_delay + latency + 0.5)
+    stats = sched.close("c")
+
+    assert published == sorted(published), "älterer Stand nach neuerem veröffentlicht"
+    per_min = calls / args.minutes
+    print(f"{n_chunks} Chunks in {args.minutes} min, LLM-Latenz {latency}s")
+    print(f"  alt : {n_chunks} analyze-Aufrufe ({n_chunks / args.minutes:.0f}/min), Reihenfolge beliebig")
+    print(f"  neu : {calls} analyze-Aufrufe ({per_min:.0f}/min), {len(published)} veröffentlicht, "
+          f"letzter Offset {published[-1] if published else -1}/{len(text['v'])}")
+    if button_lat:
+        print(f"  Button: {len(button_lat)}x, max {max(button_lat):.2f}s")
+    print(f"  {stats}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=float, default=2.0)
+    ap.add_argument("--chunk-every", type=float, default=0.8)
+    ap.add_argument("--llm-latency", type=float, default=1.2)
+    ap.add_argument("--debounce", type=float, default=1.5)
+    ap.add_argument("--max-delay", type=float, default=6.0)
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# bench/asr_cache.py
+"""
+/suggest_audio auf einer wachsenden Aufnahme: Tail-Transkription über den AsrCache vs. jedes Mal alles.
+Synthetische Sprache (Rauschstöße mit Pausen), deterministisches LocalAsrBackend.
+
+    python -m bench.asr_cache [--minutes 10 --every 30]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("ASR_BACKEND", "local")
+
+import numpy as np
+
+from app.services.asr import transcribe_pcm_chunked
+from app.services.asr_cache import AsrCache
+from app.services.asr_scheduler import asr_scheduler
+
+RATE = 16000
+
+
+def _speech(sec: float, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    out, n = [], int(sec * RATE)
+    while sum(len(p) for p in out) < n:
+        out.append((rng.standard_normal(int(rng.uniform(0.8, 3.0) * RATE)) * 3000).astype(np.int16))
+        out.append(np.zeros(int(rng.uniform(0.3, 0.8) * RATE), dtype=np.int16))
+    return np.concatenate(out)[:n]
+
+
+async def _run(args):
+    audio = _speech(args.minutes * 60).tobytes()
+    cache = AsrCache(max_entries=4096)
+    presses = range(args.every, args.minutes * 60 + 1, args.every)
+    naive_sec = cached_sec = 0.0
+    naive_lat, cached_lat = [], []
+    for t in presses:
+        data = memoryview(audio)[: t * RATE * 2]
+        t0 = time.perf_counter()
+        await cache.transcribe_growing("call.wav", data, RATE)
+        cached_lat.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        await transcribe_pcm_chunked(np.frombuffer(data, dtype="<i2"), RATE, 120.0, 4)
+        naive_lat.append(time.perf_counter() - t0)
+        naive_sec += t
+    cached_sec = cache.stats()["audio_sec_asr"]
+    await asr_scheduler.close()
+    print(f"{len(naive_lat)} Klicks über {args.minutes} min")
+    print(f"  ASR-Audio: komplett {naive_sec:.0f}s, mit Cache {cached_sec:.0f}s ({cached_sec / naive_sec:.1%})")
+    print(f"  Latenz erster/letzter Klick: komplett {naive_lat[0]:.3f}s/{naive_lat[-1]:.3f}s, "
+          f"mit Cache {cached_lat[0]:.3f}s/{cached_lat[-1]:.3f}s")
+    print(f"  Cache: {cache.stats()}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, default=10)
+    ap.add_argument("--every", type=int, default=30, help="Sekunden zwischen zwei Klicks")
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# bench/asr_scheduler.py
+"""
+Offline-Lasttest des ASR-Schedulers mit dem deterministischen LocalAsrBackend:
+N Live-Calls (kurze Fenster, Live-Priorität) + M Hangup-Snapshots (lange Stücke, Batch) gleichzeitig,
+Provider-Limit mit 429/Retry-After simuliert.
+
+    python -m bench.asr_scheduler [--live-calls 40 --windows 10 --snapshots 20 --provider-limit 30]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.services.asr import pcm16_to_wav
+from app.services.asr_backends import LocalAsrBackend
+from app.services.asr_scheduler import AsrScheduler, PRIORITY_BATCH, PRIORITY_LIVE
+
+
+def _pct(xs, p):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p / 100.0 * len(xs)))] if xs else 0.0
+
+
+async def _run(args):
+    backend = LocalAsrBackend(base_latency=0.05, per_audio_sec=0.01, limit_per_sec=args.provider_limit)
+    sched = AsrScheduler(backend=backend, concurrency=args.concurrency, rate_per_sec=args.rate,
+                         burst=args.burst, max_retries=5)
+    await sched.start()
+    live_wav = pcm16_to_wav(b"\x00\x00" * 8000 * 3, 8000)  # 3 s Fenster
+    batch_wav = pcm16_to_wav(b"\x00\x00" * 8000 * 60, 8000)  # 60-s-Stück
+    lat = {"live": [], "batch": []}
+    errors = 0
+
+    async def one(kind, wav, prio, delay):
+        nonlocal errors
+        await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        try:
+            await sched.submit(wav, filename=kind, priority=prio)
+            lat[kind].append(time.perf_counter() - t0)
+        except Exception:
+            errors += 1
+
+    jobs = []
+    for c in range(args.live_calls):
+        for w in range(args.windows):
+            # Live-Fenster kommen über die Zeit verteilt (~alle 3 s pro Call)
+            jobs.append(one("live", live_wav, PRIORITY_LIVE, w * 3.0 + c * 0.07))
+    for s in range(args.snapshots):
+        jobs.append(one("batch", batch_wav, PRIORITY_BATCH, s * 0.01))
+    t0 = time.perf_counter()
+    await asyncio.gather(*jobs)
+    wall = time.perf_counter() - t0
+    await sched.close()
+
+    total = len(lat["live"]) + len(lat["batch"])
+    print(f"{total} Requests in {wall:.2f}s ({total / wall:.1f}/s), Fehler: {errors}")
+    for k in ("live", "batch"):
+        if lat[k]:
+            print(f"  {k:<5} n={len(lat[k]):<4} p50={statistics.median(lat[k]):.3f}s p95={_pct(lat[k], 95):.3f}s "
+                  f"max={max(lat[k]):.3f}s")
+    print(f"  scheduler: {sched.stats()}")
+    print(f"  provider: calls={backend.calls} 429={backend.rejected}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--live-calls", type=int, default=40)
+    ap.add_argument("--windows", type=int, default=10)
+    ap.add_argument("--snapshots", type=int, default=20)
+    ap.add_argument("--concurrency", type=int, default=8)
+    ap.add_argument("--rate", type=float, default=25.0)
+    ap.add_argument("--burst", type=int, default=10)
+    ap.add_argument("--provider-limit", type=float, default=30.0)
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
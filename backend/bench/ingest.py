@@ -0,0 +1,84 @@
+# bench/ingest.py
+"""
+/transcribe-Eingang: alter Weg (µ-law → PCM16 → 16-kHz-WAV beim Sender, Komplett-Read, WAV parsen,
+resamplen, neu verpacken) gegen AudioIngest (roher µ-law-/L16-Body, chunkweise dekodiert).
+Gezählt werden die pro Request geschriebenen Bytes (ohne HTTP/Multipart) und der Speicher-Peak.
+
+    python -m bench.ingest [--seconds 15 --chunk 4096 --runs 50]
+"""
+import argparse
+import time
+import tracemalloc
+import wave
+from io import BytesIO
+
+import numpy as np
+
+from app.services import mulaw
+from app.services.ingest import AudioIngest
+from app.services.resample import pcm_to_int16, resample_int16
+from app.services.wav_writer import wav_header
+
+
+def old_path(mu: bytes) -> tuple:
+    copied = 0
+    # Sender (telnyx.flush_chunk): µ-law → PCM16 → 16 kHz → WAV
+    pcm8 = mulaw.decode(mu)
+    x16 = resample_int16(np.frombuffer(pcm8, dtype=np.int16), 8000, 16000).tobytes()
+    upload = wav_header(len(x16), 16000) + x16
+    copied += len(pcm8) + 2 * len(x16) + len(upload)
+    # Empfänger (/transcribe): file.read() → WAV parsen → resamplen → padden → neues WAV
+    raw = bytes(upload)
+    with wave.open(BytesIO(raw), "rb") as r:
+        frames = r.readframes(r.getnframes())
+        sw, ch = r.getsampwidth(), r.getnchannels()
+    x = pcm_to_int16(frames, sw, ch)
+    pad = np.zeros(4000, dtype=np.int16)
+    body = np.concatenate((pad, x, pad))
+    pcm = body.tobytes()
+    out = wav_header(len(pcm), 16000) + pcm
+    copied += len(raw) + len(frames) + body.nbytes + len(pcm) + len(out)
+    return out, copied
+
+
+def new_path(mu: bytes, chunk: int) -> tuple:
+    ing = AudioIngest.for_content_type("audio/basic; rate=8000", size_hint=len(mu))
+    view = memoryview(mu)
+    for i in range(0, len(view), chunk):
+        ing.feed(view[i:i + chunk])
+    return ing.finish(), ing.bytes_copied
+
+
+def _measure(fn, runs):
+    tracemalloc.start()
+    out, copied = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return out, copied, peak, (time.perf_counter() - t0) / runs
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=15.0)
+    ap.add_argument("--chunk", type=int, default=4096)
+    ap.add_argument("--runs", type=int, default=50)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(7)
+    x = (rng.standard_normal(int(8000 * args.seconds)) * 3000).astype(np.int16)
+    mu = mulaw.encode(x.tobytes())
+
+    o_out, o_copied, o_peak, o_t = _measure(lambda: old_path(mu), args.runs)
+    n_out, n_copied, n_peak, n_t = _measure(lambda: new_path(mu, args.chunk), args.runs)
+    assert len(o_out) == len(n_out), (len(o_out), len(n_out))
+
+    print(f"{args.seconds:.0f}s µ-law ({len(mu)} B Body), Chunks à {args.chunk} B")
+    print(f"  alt : {o_copied:>9} B kopiert ({o_copied / len(mu):.1f}x Body), Peak {o_peak:>9} B, {o_t * 1e3:.2f} ms")
+    print(f"  neu : {n_copied:>9} B kopiert ({n_copied / len(mu):.1f}x Body), Peak {n_peak:>9} B, {n_t * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench/mulaw.py
+"""
+µ-law-Decoding bei 50 Paketen/s (20 ms, 160 B) × N parallelen Calls:
+alte NumPy-Bitarithmetik, audioop (falls vorhanden), Tabellen-Decode und decode_into.
+
+    python -m bench.mulaw [--calls 1 10 100 500]
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from app.services import mulaw
+
+PACKETS_PER_SEC = 50
+PACKET = 160
+
+
+def _numpy_bitops(ulaw_bytes: bytes) -> bytes:
+    # 1:1 der frühere telnyx.mu_law_to_linear16
+    u = np.frombuffer(ulaw_bytes, dtype=np.uint8).astype(np.int16)
+    u = ~u
+    mag = ((u & 0x0F) << 3) + 0x84
+    mag = (mag << ((u & 0x70) >> 4)).astype(np.int32)
+    sign = (u & 0x80) != 0
+    lin = (mag - 0x84)
+    lin = np.where(sign, -lin, lin).astype(np.int16)
+    return lin.tobytes()
+
+
+def _candidates():
+    out = {"numpy-bitops": _numpy_bitops, "table-decode": mulaw.decode}
+    try:
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            import audioop
+        out["audioop"] = lambda mu: audioop.ulaw2lin(mu, 2)
+    except ImportError:
+        pass
+    buf = np.empty(PACKET, dtype=np.int16)
+    out["table-decode_into"] = lambda mu: mulaw.decode_into(mu, buf)
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, nargs="+", default=[1, 10, 100, 500])
+    ap.add_argument("--seconds", type=float, default=1.0)
+    args = ap.parse_args()
+
+    packets = [os.urandom(PACKET) for _ in range(256)]
+    cands = _candidates()
+    print(f"{'calls':>6} | " + " | ".join(f"{n:>18}" for n in cands) + "   (CPU-% eines Kerns)")
+    for calls in args.calls:
+        n = int(calls * PACKETS_PER_SEC * args.seconds)
+        row = []
+        for fn in cands.values():
+            t0 = time.perf_counter()
+            for i in range(n):
+                fn(packets[i & 255])
+            dt = time.perf_counter() - t0
+            row.append(100.0 * dt / args.seconds)
+        print(f"{calls:>6} | " + " | ".join(f"{v:>17.2f}%" for v in row))
+    per_pkt = {}
+    for name, fn in cands.items():
+        t0 = time.perf_counter()
+        for i in range(20000):
+            fn(packets[i & 255])
+        per_pkt[name] = (time.perf_counter() - t0) / 20000 * 1e6
+    print("µs/Paket: " + ", ".join(f"{k}={v:.2f}" for k, v in per_pkt.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# bench/pii.py
+"""
+Lokale PII-Maskierung (app.services.pii) gegen das Testkorpus bench/pii_corpus.jsonl und Durchsatz
+auf einem langen Transkript. Namensdurchgang = "rules" (ohne LLM); das Korpus erwartet diese Ausgabe.
+Vorher lief für jeden Snapshot database_agent über den kompletten Text (ein LLM-Roundtrip, Sekunden).
+
+    python -m bench.pii [--minutes 60]
+"""
+import argparse
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from app.services.pii import anonymize_local
+
+CORPUS = os.path.join(os.path.dirname(__file__), "pii_corpus.jsonl")
+PLACEHOLDERS = ("[email]", "[telefon]", "[iban]", "[karte]", "[adresse]", "[name]")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, default=60)
+    args = ap.parse_args()
+    with open(CORPUS, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    exact, want, got, ok = 0, Counter(), Counter(), Counter()
+    for c in cases:
+        out, _ = anonymize_local(c["text"])
+        exact += out == c["expected"]
+        if out != c["expected"]:
+            print(f"  ✗ {c['text']!r}\n      erwartet {c['expected']!r}\n      bekommen {out!r}")
+        for ph in PLACEHOLDERS:
+            w, g = c["expected"].count(ph), out.count(ph)
+            want[ph] += w
+            got[ph] += g
+            ok[ph] += min(w, g)
+    print(f"Korpus: {exact}/{len(cases)} exakt")
+    for ph in PLACEHOLDERS:
+        p = ok[ph] / got[ph] if got[ph] else 1.0
+        r = ok[ph] / want[ph] if want[ph] else 1.0
+        print(f"  {ph:10s} erwartet {want[ph]:2d}  Precision {p:.2f}  Recall {r:.2f}")
+
+    # ~150 Wörter/min gesprochen, ab und zu PII
+    rng = random.Random(1)
+    sents = [c["text"] for c in cases if c["text"]]
+    filler = ["Ja, genau, das sehe ich auch so.", "Können Sie das bitte wiederholen?",
+              "Wir vergleichen die Tarife in Ihrer Region.", "Das wären rund zwanzig Euro weniger im Monat."]
+    parts, words = [], 0
+    while words < args.minutes * 150:
+        s = rng.choice(sents) if rng.random() < 0.1 else rng.choice(filler)
+        parts.append(s)
+        words += len(s.split())
+    text = " ".join(parts)
+    t0 = time.perf_counter()
+    out, counts = anonymize_local(text)
+    dt = time.perf_counter() - t0
+    print(f"{args.minutes} min Gespräch ({len(text) / 1e3:.0f}k Zeichen): {dt * 1e3:.1f} ms "
+          f"({len(text) / dt / 1e6:.1f} MB/s), {sum(counts.values())} Ersetzungen {dict(counts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# bench/pii_chunks.py
+"""
+LLM-Namensdurchgang auf langen Transkripten: ein Request für den ganzen Text (alt) gegen Stücke an
+Satzgrenzen, parallel (ANONYMIZE_CHUNK_CHARS / ANONYMIZE_CONCURRENCY, neu).
+database_agent ist eine Attrappe: Latenz = Grundlatenz + Ausgabelänge (tokengebunden), Kontextlimit,
+maskiert Namen aus einer Liste – aber nur dort, wo der Name "erkennbar" ist (erste Nennung im Stück),
+und verhält sich in einem Anteil der Läufe falsch (Fehler / Umformulierung / gekürzte Ausgabe).
+Geprüft wird: Nicht-PII-Text 1:1 erhalten, kein bekannter Name mehr im Klartext.
+
+    python -m bench.pii_chunks [--minutes 60 --bad 0.15]
+"""
+import argparse
+import asyncio
+import random
+import re
+import time
+
+from app import agents
+from app.config import settings
+from app.services.pii import anonymize_text
+
+NAMES = ["Wegele", "Schneider", "Yilmaz", "Kowalski"]
+FILLER = [
+    "Ja, das verstehe ich gut.", "Der Tarif kostet 39 Euro im Monat.", "Können Sie mir das nochmal erklären?",
+    "Wir haben da gerade ein Angebot mit 24 Monaten Laufzeit.", "Ich muss das mit meiner Frau besprechen.",
+    "Die Kündigungsfrist beträgt drei Monate.", "Das klingt erstmal vernünftig.",
+]
+
+
+class _Out:
+    def __init__(self, text):
+        self.final_output = text
+
+
+def transcript(minutes: int, rnd: random.Random) -> str:
+    out = []
+    for _ in range(minutes * 12):
+        s = rnd.choice(FILLER)
+        if rnd.random() < 0.15:
+            s = f"{rnd.choice(NAMES)} hat mich gestern deswegen angerufen."
+        out.append(s)
+    return " ".join(out)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, default=60)
+    ap.add_argument("--bad", type=float, default=0.15, help="Anteil fehlerhafter LLM-Läufe")
+    ap.add_argument("--base", type=float, default=0.3)
+    ap.add_argument("--per-kchar", type=float, default=0.25)
+    ap.add_argument("--context", type=int, default=24000, help="Kontextlimit der Attrappe (Zeichen)")
+    args = ap.parse_args()
+    rnd = random.Random(7)
+    calls = {"n": 0}
+
+    async def fake_run(agent, messages):
+        text = messages[0]["content"]
+        calls["n"] += 1
+        if len(text) > args.context:
+            raise RuntimeError("context length exceeded")
+        await asyncio.sleep(args.base + len(text) / 1000 * args.per_kchar)
+        r = rnd.random()
+        if r < args.bad / 3:
+            raise RuntimeError("upstream 500")
+        if r < args.bad * 2 / 3:
+            return _Out(text.replace("verstehe ich gut", "ist mir klar"))
+        if r < args.bad:
+            return _Out(text[: len(text) // 2])
+        # Name nur bei der ersten Nennung erkannt → spätere Nennungen hängen an der Konsistenz
+        for n in NAMES:
+            text = text.replace(n, "[name]", 1)
+        return _Out(f'"{text}"' if r > 0.95 else text)
+
+    agents.runner.run = fake_run
+    text = transcript(args.minutes, rnd)
+    expected = re.sub("|".join(NAMES), "[name]", text)
+    print(f"Transkript: {args.minutes} min, {len(text)} Zeichen; LLM-Attrappe {args.base}s + "
+          f"{args.per_kchar}s/1000 Zeichen, Kontext {args.context}, {args.bad:.0%} fehlerhaft")
+
+    for label, chunk in (("alt (1 Request)", 10 ** 9), ("neu (Stücke)", settings.ANONYMIZE_CHUNK_CHARS)):
+        settings.ANONYMIZE_CHUNK_CHARS = chunk
+        calls["n"] = 0
+        t0 = time.perf_counter()
+        out = asyncio.run(anonymize_text(text, "llm"))
+        dt = time.perf_counter() - t0
+        plain = sum(out.count(n) for n in NAMES)
+        strip = re.compile(r"\[name\]|" + "|".join(NAMES))
+        skeleton_ok = strip.sub("", out) == strip.sub("", text)
+        print(f"  {label:16s} {dt:6.2f}s  LLM-Läufe {calls['n']:3d}  exakt {out == expected!s:5s}  "
+              f"Nicht-PII 1:1 {skeleton_ok!s:5s}  Namen im Klartext {plain}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench/playbook.py
+"""
+Einwand-Erkennung pro Live-Segment: Aho–Corasick, segmentweise weitergefüttert (neu) gegen
+"alle Auslöser per `in` im kompletten, normalisierten Transkript suchen" (naheliegende Alternative).
+Gemessen wird die Zeit pro Segment über einen langen Call; beide müssen dieselben Einwände finden.
+
+    python -m bench.playbook [--segments 1500]
+"""
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from app.services.playbook import OBJECTIONS, objection_playbook
+
+FILLER = ["Also, es geht um Ihren Stromtarif.", "Ja, ich höre.", "Moment bitte, ich schaue kurz nach.",
+          "Wir vergleichen regionale Anbieter für Sie.", "Das wären etwa zwanzig Euro im Monat.",
+          "Der Preis betrug letztes Jahr mehr.", "Okay, und dann?"]
+OBJ = ["Ich habe keine Zeit!", "Kein Interesse, danke.", "Woher haben Sie meine Daten?",
+       "Das klingt nach Abzocke.", "Ich habe schon gewechselt.", "Ich kenne Sie nicht."]
+_NORM = re.compile(r"[^\w]+")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--segments", type=int, default=1500)
+    args = ap.parse_args()
+    rng = random.Random(5)
+    segs = [rng.choice(OBJ) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(args.segments)]
+    triggers = [(k, " " + t.rstrip("*")) for k, o in OBJECTIONS.items() for t in o["triggers"]]
+
+    m = objection_playbook.matcher
+    state, text, seen_ac, seen_naive = m.START, "", set(), set()
+    t_ac, t_naive = [], []
+    for i, seg in enumerate(segs):
+        text = (text + " " + seg).strip()
+        t0 = time.perf_counter()
+        state, found = m.feed(state, " " + seg + " ")
+        t_ac.append(time.perf_counter() - t0)
+        seen_ac.update((i, k) for k in found)
+
+        t0 = time.perf_counter()
+        norm = " " + _NORM.sub(" ", text.lower()) + " "
+        hits = {k for k, t in triggers if t in norm}
+        t_naive.append(time.perf_counter() - t0)
+        seen_naive.update((i, k) for k in hits)
+
+    kinds_naive = {k for _, k in seen_naive}
+    assert {k for _, k in seen_ac} == kinds_naive, "unterschiedliche Einwände erkannt"
+    for name, t in (("alt (ganzes Transkript)", t_naive), ("neu (Aho–Corasick)", t_ac)):
+        t = np.array(t) * 1e3
+        print(f"{name:24s}: Segment p50 {np.percentile(t, 50):.3f} ms, p99 {np.percentile(t, 99):.3f} ms, "
+              f"letztes {t[-1]:.3f} ms")
+    print(f"{args.segments} Segmente, {len(text)} Zeichen, {len(seen_ac)} Einwand-Treffer "
+          f"({len({k for _, k in seen_ac})} Arten) → Push sofort statt nach ~1–3 s LLM")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# bench/recording.py
+"""
+Peak-RSS beim Zugriff auf lange Aufnahmen: Komplett-Read (f.read + BytesIO + wave) gegen mmap-Recording.
+Jede Variante läuft in einem eigenen Prozess (ru_maxrss ist pro Prozess). Beim mmap zählen gelesene
+Dateiseiten mit zum RSS (Page-Cache, jederzeit verwerfbar) – daher zusätzlich der Heap-Peak (tracemalloc).
+Aufgaben je Variante: Dauer bestimmen, letzte 30 s als ASR-WAV bauen, Schnittpunkte über die ganze Aufnahme.
+
+    python -m bench.recording [--minutes 30]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from io import BytesIO
+
+import numpy as np
+
+
+def _make(path: str, minutes: int):
+    from app.services.wav_writer import wav_header
+    rate, n = 16000, minutes * 60 * 16000
+    with open(path, "wb") as f:
+        f.write(wav_header(2 * n, rate))
+        rng = np.random.default_rng(3)
+        for i in range(0, n, rate * 60):
+            f.write((rng.standard_normal(min(rate * 60, n - i)) * 2000).astype(np.int16).tobytes())
+
+
+def _old(path: str):
+    from app.services.asr import pcm16_to_wav
+    from app.services.vad import silence_cut_points
+    with open(path, "rb") as f:
+        wav_bytes = f.read()
+    with wave.open(BytesIO(wav_bytes), "rb") as r:
+        rate, frames = r.getframerate(), r.getnframes()
+        pcm = r.readframes(frames)
+    x = np.frombuffer(pcm, dtype="<i2")
+    pcm16_to_wav(x[-30 * rate:].tobytes(), rate)
+    silence_cut_points(x, rate, 120.0)
+
+
+def _new(path: str):
+    from app.services.asr import pcm16_to_wav
+    from app.services.recording import open_recording
+    from app.services.vad import silence_cut_points
+    rec = open_recording(path)
+    pcm16_to_wav(rec.last(30).tobytes(), rec.rate)
+    silence_cut_points(rec.samples(), rec.rate, 120.0)
+
+
+def _child(kind: str, path: str):
+    import bench  # noqa: F401  (Settings-Defaults)
+    import app.services.asr, app.services.recording, app.services.vad  # noqa: F401  (Importe nicht mitmessen)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    (_old if kind == "old" else _new)(path)
+    dt = time.perf_counter() - t0
+    heap = tracemalloc.get_traced_memory()[1]
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{kind}: +{(peak - base) / 1024:.0f} MB Peak-RSS, Heap-Peak {heap / 1e6:.0f} MB, {dt:.2f}s")
+
+
+def main():
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        _child(sys.argv[2], sys.argv[3])
+        return
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=int, default=30)
+    args = ap.parse_args()
+    path = os.path.join(tempfile.gettempdir(), "closepulse-bench-recording.wav")
+    _make(path, args.minutes)
+    print(f"{args.minutes} min @16 kHz = {os.path.getsize(path) / 1e6:.0f} MB")
+    try:
+        for kind in ("old", "new"):
+            subprocess.run([sys.executable, "-m", "bench.recording", "--child", kind, path], check=True)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# bench/snapshot_latency.py
+"""
+Button-Latenz von save_snapshot in Abhängigkeit davon, wie lange seit dem letzten Snapshot gesprochen wurde:
+Delta im Request anonymisieren (alt) gegen Hintergrund-Spiegel (LIVE_ANONYMIZE, neu).
+Der LLM-Namensdurchgang ist eine Attrappe: Latenz = Grundlatenz + Ausgabelänge (tokengebunden).
+Persistiert wird in eine temporäre SQLite-DB.
+
+    python -m bench.snapshot_latency [--base 0.3 --per-kchar 0.25]
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+
+DB = os.path.join(tempfile.gettempdir(), "closepulse-bench-snapshot.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB}"
+os.environ.setdefault("ANONYMIZE_NAME_PASS", "llm")
+
+from app import agents  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.db import init_models  # noqa: E402
+from app.services.live_anonymizer import live_anonymizer  # noqa: E402
+from app.services.snapshot import save_snapshot  # noqa: E402
+from app.state.live_store import live_store  # noqa: E402
+
+SEG = "Ja also ich wohne in der Goethestraße 5 und meine Nummer ist 0171 1234567, rufen Sie abends an."
+
+
+class _Out:
+    def __init__(self, text):
+        self.final_output = text
+
+
+async def _run(args):
+    async def fake_run(agent, messages):
+        text = messages[0]["content"]
+        await asyncio.sleep(args.base + len(text) / 1000 * args.per_kchar)
+        return _Out(text)
+
+    agents.runner.run = fake_run
+    if os.path.exists(DB):
+        os.remove(DB)
+    await init_models()
+    live_store.add_listener(live_anonymizer.on_text)
+
+    print(f"LLM-Attrappe: {args.base}s + {args.per_kchar}s/1000 Zeichen")
+    for mode in (False, True):
+        settings.LIVE_ANONYMIZE = mode
+        for minutes in (1, 5, 20):
+            cid = f"bench-{int(mode)}-{minutes}"
+            n = minutes * 150 * 6 // len(SEG.split()) // 6  # ~150 Wörter/min
+            live_anonymizer.open(cid)
+            for _ in range(n):
+                live_store.add_text(cid, SEG)
+                await asyncio.sleep(0.005)  # Segmente kommen verteilt an
+            # im echten Call läuft der Hintergrund während der Sprechzeit mit; hier zeitgerafft abwarten
+            deadline = time.perf_counter() + 30
+            while mode and live_store.masked_raw_end(cid) < len(live_store.full_text(cid)) \
+                    and time.perf_counter() < deadline:
+                await asyncio.sleep(0.05)
+            t0 = time.perf_counter()
+            chars = await save_snapshot(cid, reason="button")
+            dt = time.perf_counter() - t0
+            print(f"  {'neu' if mode else 'alt'}: {minutes:2d} min seit letztem Snapshot, {chars:6d} Zeichen "
+                  f"→ Button {dt * 1e3:7.1f} ms")
+            if mode:
+                st = live_anonymizer.stats(cid)
+                print(f"       Hintergrund: {st['mask_batches']} Maskier-Läufe für {st['raw_len']} Zeichen")
+            live_anonymizer.close(cid)
+            live_store.clear(cid)
+    await asyncio.sleep(0.2)  # ausstehende live_store-Schreibtasks abwarten
+    os.remove(DB)
+    shutil.rmtree(settings.LIVE_DIR, ignore_errors=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--base", type=float, default=0.3)
+    ap.add_argument("--per-kchar", type=float, default=0.25)
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# bench/suggestion_cache.py
+"""
+Wiederholte /suggest-Klicks ohne neue Sprache + typische Gesprächseröffnungen über mehrere Calls:
+jeder Aufruf ein LLM-Lauf (alt) gegen SuggestionCache. Das LLM ist eine Attrappe mit fester Latenz.
+
+    python -m bench.suggestion_cache [--calls 50 --clicks 6 --llm-latency 1.2]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.services.suggestion_cache import SuggestionCache
+
+OPENERS = ["Ich habe keine Zeit.", "Woher haben Sie meine Daten?", "Schicken Sie mir das per Mail.",
+           "Kein Interesse, danke.", "Was kostet das denn?"]
+
+
+async def _run(args):
+    cache = SuggestionCache(max_entries=1024, ttl=600, tail_chars=600)
+    rng = random.Random(7)
+    llm_calls = 0
+
+    async def fake_llm():
+        nonlocal llm_calls
+        llm_calls += 1
+        await asyncio.sleep(args.llm_latency)
+        return {"suggestions": ["a", "b", "c"], "trafficLight": "yellow"}
+
+    lat_hit, lat_miss, total = [], [], 0
+    for c in range(args.calls):
+        text = rng.choice(OPENERS)
+        for k in range(args.clicks):
+            if k and rng.random() < 0.3:  # manchmal kam neue Sprache dazu
+                text += f" Satz {c}.{k} mit ein paar Worten."
+            # Satzzeichen/Groß-Kleinschreibung variieren (ASR) → gleicher Schlüssel
+            variant = text.upper() if rng.random() < 0.2 else text.replace(".", "!")
+            payload = [{"role": "user", "content": variant}, {"role": "system", "content": f"Datum {c}"}]
+            t0 = time.perf_counter()
+            _, hit = await cache.get_or_run(cache.key("combo_agent", payload), fake_llm)
+            (lat_hit if hit else lat_miss).append(time.perf_counter() - t0)
+            total += 1
+
+    print(f"{args.calls} Calls × {args.clicks} Klicks = {total} Anfragen, LLM-Latenz {args.llm_latency}s")
+    print(f"  alt : {total} LLM-Läufe, ~{total * args.llm_latency:.0f}s Wartezeit")
+    print(f"  neu : {llm_calls} LLM-Läufe, ~{sum(lat_miss) + sum(lat_hit):.0f}s Wartezeit")
+    if lat_hit:
+        print(f"  Treffer: {len(lat_hit)}x, max {max(lat_hit) * 1e3:.3f} ms")
+    print(f"  {cache.stats()}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=50)
+    ap.add_argument("--clicks", type=int, default=6)
+    ap.add_argument("--llm-latency", type=float, default=0.05)
+    asyncio.run(_run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
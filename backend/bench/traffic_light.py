@@ -0,0 +1,90 @@
+# bench/traffic_light.py
+"""
+Lokale Sofort-Ampel: Latenz von classify() auf langen Live-Transkripten und Trefferquote auf
+Formulierungen, die keine Regel exakt trifft (nur das n-Gramm-Modell kann sie einordnen).
+Trainiert wird wie in Produktion über samples_from_messages() – hier auf synthetischen Message-Zeilen.
+
+    python -m bench.traffic_light [--calls 400 --runs 2000]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from app.services.traffic_light import LocalTrafficLight, samples_from_messages
+
+# (Satz, Label) – jeder Satz trifft eine Regel; der Kontext drumherum ist, was das Modell lernt
+LABELED = [
+    ("Das ist doch Abzocke, ich will nichts von Ihnen.", "red"),
+    ("Lassen Sie mich in Ruhe, ich will das nicht.", "red"),
+    ("Machen Sie Schluss, ich lege jetzt auf.", "red"),
+    ("Rufen Sie mich nie wieder an, das nervt.", "red"),
+    ("Streichen Sie meine Nummer, ich will nichts kaufen.", "red"),
+    ("Ich habe keine Zeit, ich bin gerade unterwegs.", "yellow"),
+    ("Kein Interesse, glaube ich, aber sagen Sie mal.", "yellow"),
+    ("Woher haben Sie meine Daten eigentlich?", "yellow"),
+    ("Ich habe schon gewechselt, letztes Jahr erst.", "yellow"),
+    ("Das muss ich mir noch überlegen, ich bin unsicher.", "yellow"),
+    ("Schicken Sie mir das per Mail, dann schaue ich mal.", "yellow"),
+    ("Rechnen Sie mir das bitte kurz durch, das wäre super.", "green"),
+    ("Klingt gut, wie viel kann ich sparen im Jahr?", "green"),
+    ("Einverstanden, das machen wir so, super.", "green"),
+    ("Meine Kundennummer ist hier, warten Sie kurz.", "green"),
+    ("Wie geht es dann weiter, das wäre super für mich.", "green"),
+]
+NEUTRAL = ["Guten Tag, hier ist der Energieservice.", "Es geht um Ihren Stromtarif.", "Hallo?",
+           "Moment, ich höre Sie schlecht.", "Ja, am Apparat.", "Wir vergleichen regionale Tarife."]
+# keine Regel passt → nur das Modell (oder der gelbe Default)
+HELDOUT = [
+    ("Ich will nichts von Ihnen, das nervt.", "red"),
+    ("Ich will nichts kaufen, lassen Sie das.", "red"),
+    ("Ich bin gerade unterwegs, schwierig.", "yellow"),
+    ("Da bin ich unsicher, sagen Sie mal mehr.", "yellow"),
+    ("Das wäre super, wie viel im Jahr?", "green"),
+    ("Super, warten Sie kurz, ich hole die Unterlagen.", "green"),
+]
+
+
+def _corpus(n_calls: int, rng: random.Random):
+    rows = []
+    for _ in range(n_calls):
+        sents = rng.sample(NEUTRAL, 3) + [s for s, _ in rng.sample(LABELED, 4)]
+        rng.shuffle(sents)
+        rows.append((" ".join(sents), {}))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=400)
+    ap.add_argument("--runs", type=int, default=2000)
+    args = ap.parse_args()
+    rng = random.Random(11)
+
+    clf = LocalTrafficLight(tail_chars=300, min_confidence=0.5)
+    t0 = time.perf_counter()
+    n = clf.train(samples_from_messages(_corpus(args.calls, rng)))
+    print(f"Training: {n} Paare aus {args.calls} Message-Zeilen in {time.perf_counter() - t0:.2f}s")
+
+    # Latenz auf einem langen Live-Transkript (classify schaut nur aufs Ende)
+    transcript = " ".join(rng.choice(NEUTRAL + [s for s, _ in LABELED + HELDOUT]) for _ in range(120))
+    ms = []
+    for i in range(args.runs):
+        ms.append(clf.classify(transcript[: len(transcript) - (i % 300)]).ms)
+    ms = np.array(ms)
+    print(f"classify() auf {len(transcript)} Zeichen: p50 {np.percentile(ms, 50):.3f} ms, "
+          f"p99 {np.percentile(ms, 99):.3f} ms, max {ms.max():.3f} ms  (LLM-Ampel: ~1–3 s)")
+    assert np.percentile(ms, 99) < 5.0
+
+    ok_model = ok_default = 0
+    for text, want in HELDOUT:
+        g = clf.classify(text)
+        ok_model += g.response == want
+        ok_default += want == "yellow"
+        print(f"  {want:6s} → {g.response:6s} ({g.source}, {g.confidence:.2f}, {g.ms:.2f} ms)  {text}")
+    print(f"Held-out ohne Regeltreffer: Modell {ok_model}/{len(HELDOUT)}, immer-gelb {ok_default}/{len(HELDOUT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench/vad_savings.py
+"""
+ASR-Ersparnis der VAD-Segmentierung gegenüber dem alten Flush (alle 16 KB PCM @8k = 1 s bzw. 50 Pakete)
+auf aufgezeichneten Calls.
+
+    python -m bench.vad_savings [--dir $AUDIO_DIR] [--min-asr-sec 0.8]
+"""
+import argparse
+import glob
+import os
+import time
+import wave
+
+from app.config import settings
+from app.services.resample import pcm_to_int16, resample_int16
+from app.services.vad import vad_from_settings
+
+FIXED_CHUNK_SEC = 1.0  # 8000 Samples * 2 B = 16 KB bzw. 50 × 20 ms
+PACKET = 160
+
+
+def _load_8k(path: str):
+    with wave.open(path, "rb") as r:
+        x = pcm_to_int16(r.readframes(r.getnframes()), r.getsampwidth(), r.getnchannels())
+        rate = r.getframerate()
+    return resample_int16(x, rate, 8000)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default=settings.AUDIO_DIR)
+    args = ap.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.dir, "*.wav")))
+    if not files:
+        print(f"keine WAVs in {args.dir}")
+        return
+
+    tot = {"audio": 0.0, "fixed_req": 0, "vad_req": 0, "vad_sec": 0.0, "cpu": 0.0}
+    print(f"{'file':<40} {'audio s':>8} {'fixed req':>9} {'vad req':>8} {'vad s':>8} {'saved s':>8}")
+    for path in files:
+        try:
+            x = _load_8k(path)
+        except Exception as e:
+            print(f"{os.path.basename(path):<40} skip ({e})")
+            continue
+        dur = len(x) / 8000.0
+        fixed_req = int(-(-dur // FIXED_CHUNK_SEC))
+
+        vad = vad_from_settings()
+        t0 = time.perf_counter()
+        segs = []
+        for i in range(0, len(x), PACKET):
+            segs += vad.feed(x[i:i + PACKET])
+        segs += vad.flush()
+        tot["cpu"] += time.perf_counter() - t0
+
+        vad_sec = sum(s.duration_sec for s in segs)
+        print(f"{os.path.basename(path)[:40]:<40} {dur:>8.1f} {fixed_req:>9d} {len(segs):>8d} {vad_sec:>8.1f} "
+              f"{dur - vad_sec:>8.1f}")
+        tot["audio"] += dur
+        tot["fixed_req"] += fixed_req
+        tot["vad_req"] += len(segs)
+        tot["vad_sec"] += vad_sec
+
+    if tot["audio"]:
+        print(f"\nSumme: {tot['audio']:.1f} s Audio | ASR-Requests {tot['fixed_req']} → {tot['vad_req']} "
+              f"({100.0 * (1 - tot['vad_req'] / max(1, tot['fixed_req'])):.0f}% weniger) | "
+              f"ASR-Sekunden {tot['audio']:.1f} → {tot['vad_sec']:.1f} "
+              f"({100.0 * (1 - tot['vad_sec'] / tot['audio']):.0f}% weniger) | "
+              f"VAD-CPU {1000.0 * tot['cpu'] / tot['audio']:.2f} ms pro Audio-Sekunde")
+
+
+if __name__ == "__main__":
+    main()
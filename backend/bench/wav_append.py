@@ -0,0 +1,80 @@
+# bench/wav_append.py
+"""
+Append-Kosten pro 20-ms-Chunk in Abhängigkeit von der Call-Länge:
+alter Rewrite-Pfad (lesen + komplett neu schreiben) vs. StreamingWavWriter.
+
+    python -m bench.wav_append [--minutes 60]
+"""
+import argparse
+import os
+import tempfile
+import time
+import wave
+
+from app.services.wav_writer import StreamingWavWriter
+
+CHUNK = b"\x01\x00" * 160  # 20 ms @ 8 kHz, 16 bit
+CHUNKS_PER_MIN = 50 * 60
+
+
+def _rewrite_append(path: str, pcm: bytes):
+    # 1:1 der frühere _append_wav8_mono
+    if not os.path.exists(path):
+        with wave.open(path, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(8000)
+            w.writeframes(pcm)
+        return
+    with wave.open(path, "rb") as r:
+        existing = r.readframes(r.getnframes())
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(existing)
+        w.writeframes(pcm)
+
+
+def _prefill(path: str, minutes: float):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(CHUNK * int(minutes * CHUNKS_PER_MIN))
+
+
+def _measure(append, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        append(CHUNK)
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--minutes", type=float, default=60.0)
+    ap.add_argument("--samples", type=int, default=200)
+    args = ap.parse_args()
+
+    points = [m for m in (0.1, 1, 5, 15, 30, 60, 120) if m <= args.minutes]
+    print(f"{'call length':>12} | {'rewrite µs/chunk':>17} | {'streaming µs/chunk':>19}")
+    with tempfile.TemporaryDirectory() as d:
+        for m in points:
+            p_old = os.path.join(d, f"old-{m}.wav")
+            p_new = os.path.join(d, f"new-{m}.wav")
+            _prefill(p_old, m)
+            _prefill(p_new, m)
+            # der alte Pfad wird bei langen Calls sehr teuer → weniger Stichproben
+            n_old = max(3, args.samples // max(1, int(m)))
+            old_us = _measure(lambda pcm: _rewrite_append(p_old, pcm), n_old)
+            w = StreamingWavWriter(p_new)
+            new_us = _measure(w.append, args.samples * 10)
+            w.close()
+            with wave.open(p_new, "rb") as r:
+                assert r.getnframes() == int(m * CHUNKS_PER_MIN) * 160 + args.samples * 10 * 160
+            print(f"{m:>10.1f}min | {old_us:>17.1f} | {new_us:>19.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, DateTime, JSON, func, Integer
+from sqlalchemy import String, Text, DateTime, JSON, func, Integer, Float
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
@@ -32,3 +32,18 @@ class LiveCall(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     meta: Mapped[dict] = mapped_column(JSON, default=dict)
+
+
+class PostCallJob(Base):
+    __tablename__ = "post_call_jobs"
+    # Idempotenz: höchstens EIN Nachbearbeitungs-Job pro Call (Webhook-Wiederholungen = No-op)
+    conversation_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    status: Mapped[str] = mapped_column(String(16), default="pending", index=True)  # pending|running|done|failed
+    reason: Mapped[str] = mapped_column(String(32), default="hangup")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    run_after: Mapped[float] = mapped_column(Float, default=0.0)  # Unix-Zeit, Backoff nach Fehlern
+    payload: Mapped[dict] = mapped_column(JSON, default=dict)  # Live-Text + Spans zum Hangup-Zeitpunkt
+    result_chars: Mapped[int] = mapped_column(Integer, default=0)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, default=None)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
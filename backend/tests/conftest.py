@@ -0,0 +1,19 @@
+# tests/conftest.py
+# Tests laufen offline: Pflicht-Settings mit Dummy-Werten vorbelegen, damit `app` importierbar ist
+# (aus backend/: python -m pytest tests).
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _k, _v in {
+    "OPENAI_API_KEY": "test",
+    "TELNYX_API_KEY": "test",
+    "WS_BASE": "wss://localhost",
+    "PUBLIC_BASE": "http://localhost:8000",
+    "EXTERNAL_CALL_ID": "test",
+    "AUDIO_DIR": os.path.join(tempfile.gettempdir(), "closepulse-test-audio"),
+    "LIVE_DIR": os.path.join(tempfile.gettempdir(), "closepulse-test-live"),
+}.items():
+    os.environ.setdefault(_k, _v)
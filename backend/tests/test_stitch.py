@@ -0,0 +1,69 @@
+# tests/test_stitch.py
+import pytest
+
+from app.services.stitch import TranscriptStitcher, find_overlap, merge_texts
+
+
+@pytest.mark.parametrize("left, right, want", [
+    # exakte Überlappung
+    ("Ich habe keine Zeit,", "keine Zeit, rufen Sie später an.", "Ich habe keine Zeit, rufen Sie später an."),
+    ("Woher haben Sie meine", "meine Daten?", "Woher haben Sie meine Daten?"),
+    # Groß/klein und Satzzeichen egal
+    ("Das ist mir zu teuer.", "zu Teuer, ehrlich gesagt.", "Das ist mir zu teuer. ehrlich gesagt."),
+    # Kantenwort links angeschnitten
+    ("Wir rechnen das kurz dur", "rechnen das kurz durch, passt das?", "Wir rechnen das kurz durch, passt das?"),
+    # Kantenwort rechts angeschnitten
+    ("Mein Tarif ist teuer", "ehm Tarif ist teuer geworden", "Mein Tarif ist teuer geworden"),
+    # keine Überlappung
+    ("Das ist alles.", "Neuer Satz hier.", "Das ist alles. Neuer Satz hier."),
+    # kurzes Einzelwort ist kein Überlappungsbeweis
+    ("Ja.", "Ja, gerne.", "Ja. Ja, gerne."),
+    ("Woher haben Sie", "Sie meine Daten?", "Woher haben Sie Sie meine Daten?"),
+])
+def test_merge_texts(left, right, want):
+    assert merge_texts(left, right) == want
+
+
+@pytest.mark.parametrize("left, right, want", [
+    ("", "Hallo zusammen.", "Hallo zusammen."),
+    ("Hallo zusammen.", "", "Hallo zusammen."),
+    ("   ", "...", "..."),
+    ("", "", ""),
+])
+def test_merge_texts_empty_side(left, right, want):
+    assert merge_texts(left, right) == want
+
+
+def test_find_overlap_nothing_on_empty_side():
+    assert find_overlap([], ["hallo"]) == (0, 0, 0)
+    assert find_overlap(["hallo"], []) == (0, 0, 0)
+
+
+def test_stitcher_drops_overlap_and_counts_duplicates():
+    st = TranscriptStitcher()
+    assert st.add("Ich habe keine Zeit,") == "Ich habe keine Zeit,"
+    assert st.add("Keine Zeit! Rufen Sie später an.") == "Rufen Sie später an."
+    assert st.dup_tokens == 2
+    assert st.text() == "Ich habe keine Zeit, Rufen Sie später an."
+
+
+def test_stitcher_cut_edge_word_keeps_left_version():
+    st = TranscriptStitcher()
+    st.add("Wir rechnen das kurz dur")
+    # ausgegebener Text wird nie umgeschrieben → angeschnittenes Wort bleibt, Gegenstück entfällt
+    assert st.add("rechnen das kurz durch, passt das?") == "passt das?"
+
+
+def test_stitcher_without_overlap_keeps_real_repetition():
+    st = TranscriptStitcher()
+    st.add("Sie haben also kein Interesse")
+    assert st.add("Kein Interesse, danke.", overlap=False) == "Kein Interesse, danke."
+    assert st.dup_tokens == 0
+
+
+def test_stitcher_empty_segments():
+    st = TranscriptStitcher()
+    assert st.add("") == ""
+    assert st.add(" ... ") == ""
+    assert st.add("Hallo.") == "Hallo."
+    assert st.text() == "Hallo."